@@ -6,10 +6,15 @@ import xml.etree.ElementTree
 import clc
 import os
 import sys
+import time
 
 
 class API():
-	
+
+	# Assumed lifetime of a v1 session cookie when saved to the token cache.  An expired
+	# cookie is detected (StatusCode 100) and replaced by a fresh login
+	COOKIE_LIFETIME = 3600
+
 	# requests module includes cacert.pem which is visible when run as installed module.
 	# pyinstall single-file deployment needs cacert.pem packaged along and referenced.
 	# This module proxies between the two based on whether the cacert.pem exists in
@@ -50,6 +55,12 @@ class API():
 			clc.v1.output.Status('ERROR',3,'V1 API key and password not provided')
 			raise(clc.APIV1NotEnabled)
 
+		if clc._TOKEN_CACHE:
+			data = clc._TOKEN_CACHE.Load(clc.defaults.ENDPOINT_URL_V1,clc.v1.V1_API_KEY,clc.v1.V1_API_PASSWD)
+			if data:
+				clc._LOGIN_COOKIE_V1 = requests.utils.cookiejar_from_dict(data['cookies'])
+				return
+
 		clc._LOGINS += 1
 
 		session = clc._REQUESTS_SESSION
@@ -64,6 +75,9 @@ class API():
 			if resp.attrib['StatusCode'] == '0':
 				if clc.args:  clc.v1.output.Status('SUCCESS',1,'Logged into v1 API')
 				clc._LOGIN_COOKIE_V1 = r.cookies
+				if clc._TOKEN_CACHE:
+					clc._TOKEN_CACHE.Save(clc.defaults.ENDPOINT_URL_V1,clc.v1.V1_API_KEY,clc.v1.V1_API_PASSWD,
+					                      {'cookies': requests.utils.dict_from_cookiejar(r.cookies)},time.time()+API.COOKIE_LIFETIME)
 			else:
 				if clc.args:  clc.v1.output.Status('ERROR',3,'Error logging into v1 API.  %s' % resp.attrib['Message'])
 				raise(Exception("Error logging into V1 API.  Status code %s. %s" % (resp.attrib['StatusCode'],resp.attrib['Message'])))
@@ -116,6 +130,7 @@ class API():
 			elif int(r.json()['StatusCode']) == 100 and recursion_cnt<2:  
 				# Not logged in - this is a transient failure
 				clc._LOGIN_COOKIE_V1 = False
+				if clc._TOKEN_CACHE:  clc._TOKEN_CACHE.Delete(clc.defaults.ENDPOINT_URL_V1,clc.v1.V1_API_KEY)
 				return(clc.v1.API.Call(method,url,payload,silent,hide_errors,recursion_cnt+1))
 			elif int(r.json()['StatusCode']) == 100:  
 				# Not logged in - this keeps recurring - bail
@@ -344,6 +344,7 @@ class Args:
 		parser.add_argument('--v1-api-passwd', metavar='PASSWORD', help='V1 API password')
 		parser.add_argument('--v2-api-username', metavar='USERNAME', help='V2 API username')
 		parser.add_argument('--v2-api-passwd', metavar='PASSWORD', help='V2 API password')
+		parser.add_argument('--token-cache', action="store_true", default=False, help='Reuse logins saved in an encrypted on-disk cache')
 		parser.add_argument('--async', action="store_true", dest='is_async', default=False, help='Return immediately after queueing long-running calls')
 		parser.add_argument('--quiet', '-q', action='count', help='Supress status output (repeat up to 2 times)')
 		parser.add_argument('--verbose', '-v', action='count', help='Increase verbosity')
@@ -384,6 +385,7 @@ class Args:
 			if config.has_option('global','v2_api_passwd'):  clc.v1.V2_API_PASSWD = config.get('global','v2_api_passwd')
 
 			if config.has_option('global','blueprint_ftp_url'):  clc._BLUEPRINT_FTP_URL = config.get('global','blueprint_ftp_url')
+			if config.has_option('global','token_cache') and config.getboolean('global','token_cache'):  self.args.token_cache = True
 
 
 	def MergeEnvironment(self):
@@ -398,6 +400,7 @@ class Args:
 		if self.args.v1_api_passwd:  clc.v1.V1_API_PASSWD = self.args.v1_api_passwd
 		if self.args.v2_api_username:  clc.v2.V2_API_USERNAME = self.args.v2_api_username
 		if self.args.v2_api_passwd:  clc.v2.V2_API_PASSWD = self.args.v2_api_passwd
+		if self.args.token_cache:  clc.SetTokenCache(clc.TokenCache())
 
 
 
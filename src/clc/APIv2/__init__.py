@@ -16,24 +16,34 @@ API Documentaton v2: https://t3n.zendesk.com/categories/20067994-API-v2-0-Beta-
 
 """
 from __future__ import print_function, absolute_import, unicode_literals
-import requests
 
+import time
 import clc.defaults
 
 from clc.APIv2.account import Account
 from clc.APIv2.group import Group
 from clc.APIv2.server import Servers, Server
 from clc.APIv2.public_ip import PublicIPs, PublicIP
-from clc.APIv2.disk import Disks, Disk
+from clc.APIv2.disk import Disks, Disk, DiskPlan
 from clc.APIv2.network import Networks, Network
 from clc.APIv2.template import Templates, Template
 from clc.APIv2.alert import Alerts, Alert
-from clc.APIv2.queue import Queue, Request, Requests
+from clc.APIv2.queue import Queue, Request, Requests, RequestSet
 from clc.APIv2.anti_affinity import AntiAffinity
 from clc.APIv2.datacenter import Datacenter
 from clc.APIv2.horizontal_autoscale import HorizontalAutoscalePolicy
-from clc.APIv2.api import API
+from clc.APIv2.inventory import Inventory
+from clc.APIv2.fleet import FleetTable
+from clc.APIv2.provision import ProvisioningPipeline
+from clc.APIv2.identity import IdentityMap
+from clc.APIv2.api import API, Credentials, GlobalCredentials
+from clc.APIv2.retry import RetryPolicy, RateLimiter
+from clc.APIv2.cache import ResponseCache
+from clc.APIv2.capability_cache import CapabilityCache
+from clc.APIv2.journal import Journal
 import clc.APIv2.time_utils
+import clc.APIv2.parallel
+import clc.APIv2.compact
 
 
 ####### module/object vars #######
@@ -43,6 +53,7 @@ V2_API_PASSWD = False
 _V2_ENABLED = False
 _LOGINS = 0
 _BLUEPRINT_FTP_URL = False
+_CREDENTIALS = GlobalCredentials()
 
 def SetCredentials(api_username,api_passwd):
 	"""Establish API username and password associated with APIv2 commands."""
@@ -52,6 +63,8 @@ def SetCredentials(api_username,api_passwd):
 	_V2_ENABLED = True
 	V2_API_USERNAME = api_username
 	V2_API_PASSWD = api_passwd
+	_CREDENTIALS.Invalidate()
+	IdentityMap.For().Clear()
 
 
 def get_session(username, password, default_endpoints=clc.defaults, cert=None):
@@ -64,29 +77,41 @@ def get_session(username, password, default_endpoints=clc.defaults, cert=None):
 	if cert is None:
 		cert = API._ResourcePath('clc/cacert.pem')
 
-	session = requests.Session()
+	session = clc._NewRequestsSession()
 
-	request = session.request(
-		"POST",
-		"{}/v2/authentication/login".format(default_endpoints.ENDPOINT_URL_V2),
-		data={"username": username, "password": password},
-		verify=cert)
+	data = None
+	if clc._TOKEN_CACHE:
+		data = clc._TOKEN_CACHE.Load(default_endpoints.ENDPOINT_URL_V2,username,password)
+		if data and data['expires']-Credentials.REFRESH_MARGIN <= time.time():  data = None
 
-	data = request.json()
+	if data is None:
+		request = session.request(
+			"POST",
+			"{}/v2/authentication/login".format(default_endpoints.ENDPOINT_URL_V2),
+			data={"username": username, "password": password},
+			verify=cert)
 
-	if request.status_code == 200:
-		token = data['bearerToken']
-		alias = data['accountAlias']
-		location = data['locationAlias']
-	elif request.status_code == 400:
-		raise Exception("Invalid V2 API login. {}".format(data['message']))
-	else:
-		raise Exception("Error logging into V2 API.  Response code {}. message {}"
-					    .format(request.status_code,data['message']))
+		data = request.json()
+
+		if request.status_code == 200:
+			if clc._TOKEN_CACHE:
+				clc._TOKEN_CACHE.Save(default_endpoints.ENDPOINT_URL_V2,username,password,data,
+				                      Credentials._TokenExpiry(data['bearerToken']))
+		elif request.status_code == 400:
+			raise Exception("Invalid V2 API login. {}".format(data['message']))
+		else:
+			raise Exception("Error logging into V2 API.  Response code {}. message {}"
+						    .format(request.status_code,data['message']))
+
+	token = data['bearerToken']
+	alias = data['accountAlias']
+	location = data['locationAlias']
 
 	return {'username': username,
 			'password': password,
 			'http_session': session,
 			'token': token,
 			'alias': alias,
-			'location': location}
+			'location': location,
+			'credentials': Credentials(username=username,password=password,token=token,alias=alias,
+			                           location=location,http_session=session)}
@@ -27,11 +27,13 @@ from __future__ import print_function, absolute_import, unicode_literals
 # TODO - delete account
 # TODO - list subaccounts
 
-import re
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 class Account(object):
 
+    _Key = AttributeResolver({'primary_datacenter': 'primaryDataCenter'})
+
     @staticmethod
     def GetAlias(session=None):
         """Return specified alias or if none the alias associated with the provided credentials.
@@ -77,9 +79,11 @@ class Account(object):
         self.data = clc.v2.API.Call('GET','accounts/%s' % (self.alias),{},session=session)
 
 
-    def ParentAccount(self):
+    def ParentAccount(self,cached=True):
         """Return the parent account object or None if at the root level for provided credentials.
 
+        The object is shared through the session's IdentityMap unless cached is False.
+
         # sub-account
         >>> clc.v2.Account(alias='KRAP').ParentAccount()
         <clc.APIv2.account.Account instance at 0x10b77ab90>
@@ -89,12 +93,16 @@ class Account(object):
         None
         """
 
-        return(Account(alias=self.data['parentAlias'], session=self.session))
+        alias = self.data['parentAlias']
+        return(clc.v2.IdentityMap.For(self.session).Resolve(Account,alias,alias,
+                                                             lambda: Account(alias=alias, session=self.session),cached))
 
 
-    def PrimaryDatacenter(self):
+    def PrimaryDatacenter(self,cached=True):
         """Returns the primary datacenter object associated with the account.
 
+        The object is shared through the session's IdentityMap unless cached is False.
+
         >>> clc.v2.Account(alias='BTDI').PrimaryDatacenter()
         <clc.APIv2.datacenter.Datacenter instance at 0x10a45ce18>
         >>> print _
@@ -102,12 +110,13 @@ class Account(object):
 
         """
 
-        return(clc.v2.Datacenter(alias=self.alias,location=self.data['primaryDataCenter'], session=self.session))
+        location = self.data['primaryDataCenter']
+        return(clc.v2.IdentityMap.For(self.session).Resolve(clc.v2.Datacenter,self.alias,location,
+                                                             lambda: clc.v2.Datacenter(alias=self.alias,location=location, session=self.session),cached))
 
 
     def __getattr__(self,var):
-        if var == "primary_datacenter":  key = "primaryDataCenter"
-        else:  key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+        key = Account._Key(var)
 
         if key in self.data:  return(self.data[key])
         else:  raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,key)))
@@ -0,0 +1,748 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio interface to the v2 API.
+
+Mirrors the blocking Account, Datacenter, Group, Servers, Server and Requests classes
+with coroutine based equivalents built on aiohttp.  Objects are created without any I/O
+and load themselves when awaited, so hundreds of calls can be fanned out from a single
+event loop without threads.
+
+Requires Python 3.5+ and the aiohttp package (pip install clc-sdk[aio]).  This module is
+not imported by clc.v2, import it explicitly:
+
+>>> import asyncio
+>>> import clc.APIv2.aio
+>>> async def main():
+...     group = await clc.v2.aio.Group("wa1-4416")
+...     servers = await group.Servers().Servers()
+...     await clc.v2.aio.API.Close()
+...     return(servers)
+>>> asyncio.get_event_loop().run_until_complete(main())
+[<clc.APIv2.aio.Server object at 0x1065b0d50>, <clc.APIv2.aio.Server object at 0x1065b0e50>]
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import ssl
+import json
+import time
+import asyncio
+import weakref
+import clc
+
+try:
+	import aiohttp
+except ImportError:
+	aiohttp = None
+
+
+class API(object):
+
+	# Maximum number of simultaneous connections per event loop
+	CONNECTION_LIMIT = 100
+
+	_http_sessions = weakref.WeakKeyDictionary()
+	_login_locks = weakref.WeakKeyDictionary()
+
+
+	@staticmethod
+	def _HTTPSession(session=None):
+		"""Return the aiohttp session bound to the running event loop."""
+
+		if session is not None:  return(session['http_session'])
+		if aiohttp is None:  raise(clc.CLCException("clc.v2.aio requires the aiohttp package"))
+
+		loop = asyncio.get_event_loop()
+		if loop not in API._http_sessions or API._http_sessions[loop].closed:
+			API._http_sessions[loop] = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=API.CONNECTION_LIMIT))
+
+		return(API._http_sessions[loop])
+
+
+	@staticmethod
+	def _SSL():
+		verify = clc.v2.API._ResourcePath('clc/cacert.pem')
+		if verify is True:  return(None)
+		elif not verify:  return(False)
+		else:  return(ssl.create_default_context(cafile=verify))
+
+
+	@staticmethod
+	async def Close(session=None):
+		"""Close the connection pool used by the running event loop (or by session)."""
+
+		if session is not None:
+			await session['http_session'].close()
+		else:
+			http_session = API._http_sessions.pop(asyncio.get_event_loop(),None)
+			if http_session is not None:  await http_session.close()
+
+
+	@staticmethod
+	async def _Login(session=None):
+		"""Login to retrieve bearer token and set default account and location aliases.
+
+		Populates the same Credentials object used by the blocking API.  Concurrent
+		callers on the same event loop wait on a single login request.
+		"""
+		credentials = clc.v2.API._Credentials(session)
+		username,password = credentials._UsernamePassword()
+		if not username or not password:
+			clc.v1.output.Status('ERROR',3,'V2 API username and password not provided')
+			raise(clc.APIV2NotEnabled)
+
+		loop = asyncio.get_event_loop()
+		if loop not in API._login_locks:  API._login_locks[loop] = asyncio.Lock()
+
+		async with API._login_locks[loop]:
+			if credentials.Valid() or credentials._LoadCached():  return
+
+			async with API._HTTPSession(session).post("%s/v2/%s" % (clc.defaults.ENDPOINT_URL_V2,"authentication/login"),
+			                                          json={"username": username, "password": password},
+			                                          ssl=API._SSL()) as r:
+				data = await r.json(content_type=None)
+
+			if r.status == 200:
+				credentials._SetLogin(data)
+			elif r.status == 400:
+				raise(Exception("Invalid V2 API login.  %s" % (data['message'])))
+			else:
+				raise(Exception("Error logging into V2 API.  Response code %s. message %s" % (r.status,data['message'])))
+
+
+	@staticmethod
+	async def Call(method,url,payload=None,session=None,debug=False):
+		"""Execute v2 API call.
+
+		Coroutine equivalent of clc.v2.API.Call.
+
+		:param url: URL paths associated with the API call
+		:param payload: dict containing all parameters to submit with POST call
+
+		:returns: decoded API json result
+		"""
+		credentials = clc.v2.API._Credentials(session)
+
+		if payload is None:  payload = {}
+
+		# If executing refs provided in API they are abs paths,
+		# Else refs we build in the sdk are relative
+		if url[0]=='/':  fq_url = "%s%s" % (clc.defaults.ENDPOINT_URL_V2,url)
+		else:  fq_url = "%s/v2/%s" % (clc.defaults.ENDPOINT_URL_V2,url)
+
+		if isinstance(payload, str):  content_type = "Application/json"
+		else:  content_type = "application/x-www-form-urlencoded"
+
+		if method=="GET":  kwargs = {'params': payload}
+		else:  kwargs = {'data': payload}
+
+		retry_policy = clc.v2.API._retry_policy
+		retried = False
+		attempt = 0
+		while True:
+			if not credentials.Valid():  await API._Login(session=session)
+			token = credentials.token
+			headers = {'Authorization': "Bearer %s" % token, 'content-type': content_type}
+
+			try:
+				async with API._HTTPSession(session).request(method,fq_url,headers=headers,ssl=API._SSL(),**kwargs) as r:
+					status = r.status
+					retry_after = r.headers.get('Retry-After')
+					text = await r.text()
+			except aiohttp.ClientConnectionError:
+				delay = retry_policy and retry_policy.Delay(method,attempt,connection_error=True)
+				if delay is None:  raise
+				await asyncio.sleep(delay)
+				attempt += 1
+				continue
+
+			# Token expired or revoked server side, login again and retry once
+			if status == 401 and not retried and credentials.Invalidate(token):
+				retried = True
+				continue
+
+			# Same RetryPolicy as the blocking API
+			if status>=300 and retry_policy:
+				delay = retry_policy.Delay(method,attempt,status=status,retry_after=retry_after)
+				if delay is not None:
+					await asyncio.sleep(delay)
+					attempt += 1
+					continue
+
+			break
+
+		if debug:
+			print('%s\n%s %s\n\n%s\n' % ('-----------REQUEST-----------',method,fq_url,payload))
+			print('%s\nstatus: %s\n\n%s' % ('-----------RESPONSE-----------',status,text))
+
+		if status>=200 and status<300:
+			try:
+				return(json.loads(text))
+			except:
+				return({})
+		else:
+			try:
+				response_json = json.loads(text)
+				e = clc.APIFailedResponse("Response code %s.  %s %s %s" % (status,response_json['message'],method,fq_url))
+			except:
+				response_json = {}
+				e = clc.APIFailedResponse("Response code %s. %s. %s %s" % (status,text,method,fq_url))
+			e.response_status_code = status
+			e.response_json = response_json
+			e.response_text = text
+			raise(e)
+
+
+async def get_session(username, password, default_endpoints=clc.defaults):
+	"""Start a session with the given parameters.
+
+	Coroutine equivalent of clc.v2.get_session.  The returned session owns its own
+	connection pool, release it with clc.v2.aio.API.Close(session=session).
+	"""
+	if aiohttp is None:  raise(clc.CLCException("clc.v2.aio requires the aiohttp package"))
+
+	http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=API.CONNECTION_LIMIT))
+
+	async with http_session.post("{}/v2/authentication/login".format(default_endpoints.ENDPOINT_URL_V2),
+	                             data={"username": username, "password": password},
+	                             ssl=API._SSL()) as r:
+		data = await r.json(content_type=None)
+
+	if r.status == 200:
+		token = data['bearerToken']
+		alias = data['accountAlias']
+		location = data['locationAlias']
+	else:
+		await http_session.close()
+		if r.status == 400:
+			raise Exception("Invalid V2 API login. {}".format(data['message']))
+		else:
+			raise Exception("Error logging into V2 API.  Response code {}. message {}".format(r.status,data['message']))
+
+	return {'username': username,
+			'password': password,
+			'http_session': http_session,
+			'token': token,
+			'alias': alias,
+			'location': location,
+			'credentials': clc.v2.Credentials(username=username,password=password,token=token,alias=alias,location=location)}
+
+
+
+class _Resource(object):
+	"""Await-to-load behavior shared by the async resource classes.
+
+	Attribute lookups on loaded objects are delegated to the __getattr__ of the
+	blocking class named by _sync.
+	"""
+
+	_sync = None
+
+
+	def __await__(self):
+		return(self._Load().__await__())
+
+
+	async def _Load(self):
+		if not self.alias:  self.alias = await Account.GetAlias(session=self.session)
+		if self.data is None:  await self.Refresh()
+
+		return(self)
+
+
+	def __getattr__(self,var):
+		if var[:2] == '__' or self._sync is None or self.__dict__.get('data') is None:
+			raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,var)))
+
+		return(self._sync.__getattr__(self,var))
+
+
+
+class Account(_Resource):
+
+	_sync = clc.APIv2.account.Account
+
+
+	@staticmethod
+	async def GetAlias(session=None):
+		"""Return specified alias or if none the alias associated with the provided credentials."""
+
+		if session is not None:  return(session['alias'])
+
+		if not clc.ALIAS:  await API._Login()
+		return(clc.ALIAS)
+
+
+	@staticmethod
+	async def GetLocation(session=None):
+		"""Return specified location or if none the default location associated with the provided credentials."""
+
+		if session is not None:  return(session['location'])
+
+		if not clc.LOCATION:  await API._Login()
+		return(clc.LOCATION)
+
+
+	def __init__(self,alias=None,account_obj=None,session=None):
+		"""Create account object.  Await it to load account details.
+
+		>>> await clc.v2.aio.Account()
+		<clc.APIv2.aio.Account object at 0x1065a2e60>
+
+		"""
+
+		self.alias = alias
+		self.data = account_obj
+		self.session = session
+
+
+	async def Refresh(self):
+		self.data = await API.Call('GET','accounts/%s' % (self.alias),{},session=self.session)
+
+		return(self)
+
+
+	def ParentAccount(self):
+		return(Account(alias=self.data['parentAlias'],session=self.session))
+
+
+	def PrimaryDatacenter(self):
+		return(Datacenter(alias=self.alias,location=self.data['primaryDataCenter'],session=self.session))
+
+
+	def __str__(self):
+		return(self.data['accountAlias'])
+
+
+
+class Datacenter(_Resource):
+
+	@staticmethod
+	async def Datacenters(alias=None,session=None):
+		"""Return all cloud locations available to the calling alias.
+
+		Each datacenter is loaded concurrently.
+
+		>>> await clc.v2.aio.Datacenter.Datacenters()
+		[<clc.APIv2.aio.Datacenter object at 0x101462fc8>, <clc.APIv2.aio.Datacenter object at 0x101464320>]
+
+		"""
+		if not alias:  alias = await Account.GetAlias(session=session)
+
+		r = await API.Call('GET','datacenters/%s' % alias,{},session=session)
+
+		return(list(await asyncio.gather(*[Datacenter(location=o['id'],name=o['name'],alias=alias,session=session) for o in r])))
+
+
+	def __init__(self,location=None,name=None,alias=None,session=None):
+		"""Create Datacenter object.  Await it to load datacenter details."""
+
+		self.deployment_capabilities = None
+		self.location = location
+		self.id = location
+		self.name = name
+		self.alias = alias
+		self.session = session
+		self.data = None
+
+
+	async def _Load(self):
+		if not self.location:  self.location = self.id = await Account.GetLocation(session=self.session)
+
+		return(await super(Datacenter,self)._Load())
+
+
+	async def Refresh(self):
+		self.data = await API.Call('GET','datacenters/%s/%s' % (self.alias,self.location),{'GroupLinks': 'true'},session=self.session)
+		self.name = self.data['name']
+		self.root_group_id = [obj['id'] for obj in self.data['links'] if obj['rel'] == "group"][0]
+		self.root_group_name = [obj['name'] for obj in self.data['links'] if obj['rel'] == "group"][0]
+
+		return(self)
+
+
+	def RootGroup(self):
+		return(Group(id=self.root_group_id,alias=self.alias,session=self.session))
+
+
+	async def Groups(self):
+		return((await self.RootGroup()).Subgroups())
+
+
+	async def DeploymentCapabilities(self,cached=True):
+		if not self.deployment_capabilities or not cached:
+			self.deployment_capabilities = await API.Call(
+				'GET',
+				'datacenters/%s/%s/deploymentCapabilities' % (self.alias,self.location),
+				session=self.session)
+
+		return(self.deployment_capabilities)
+
+
+	def __str__(self):
+		return(self.location)
+
+
+
+class Groups(clc.APIv2.group.Groups):
+
+	def __init__(self,groups_lst,alias,session=None):  # pylint: disable=super-init-not-called
+		self.session = session
+		self.alias = alias
+
+		self.groups = []
+		for group in groups_lst:
+			self.groups.append(Group(id=group['id'],alias=self.alias,group_obj=group,session=self.session))
+
+
+
+class Group(_Resource):
+
+	_sync = clc.APIv2.group.Group
+
+
+	def __init__(self,id,alias=None,group_obj=None,session=None):
+		"""Create Group object.  Await it to load group details.
+
+		>>> await clc.v2.aio.Group(id="wa1-1798")
+		<clc.APIv2.aio.Group object at 0x109188b90>
+
+		"""
+
+		self.id = id
+		self.alias = alias
+		self.data = group_obj
+		self.session = session
+		self.dirty = False
+
+
+	async def Refresh(self):
+		data = await API.Call('GET','groups/%s/%s' % (self.alias,self.id),session=self.session)
+		data['changeInfo']['createdDate'] = clc.v2.time_utils.ZuluTSToSeconds(data['changeInfo']['createdDate'])
+		data['changeInfo']['modifiedDate'] = clc.v2.time_utils.ZuluTSToSeconds(data['changeInfo']['modifiedDate'])
+
+		self.dirty = False
+		self.data = data
+
+		return(self)
+
+
+	async def Defaults(self,key):
+		if not hasattr(self,'defaults'):
+			self.defaults = await API.Call('GET','groups/%s/%s/defaults' % (self.alias,self.id),session=self.session)
+		try:
+			return(self.defaults[key]['value'])
+		except:
+			return(None)
+
+
+	def Subgroups(self):
+		return(Groups(alias=self.alias,groups_lst=self.data['groups'],session=self.session))
+
+
+	def Servers(self):
+		return(Servers(
+			alias=self.alias,
+			servers_lst=[obj['id'] for obj in self.data['links'] if obj['rel']=='server'],
+			session=self.session))
+
+
+	def Archive(self):  return(self.Servers().Archive())
+	def Pause(self):  return(self.Servers().Pause())
+	def ShutDown(self):  return(self.Servers().ShutDown())
+	def Reboot(self):  return(self.Servers().Reboot())
+	def Reset(self):  return(self.Servers().Reset())
+	def PowerOn(self):  return(self.Servers().PowerOn())
+	def PowerOff(self):  return(self.Servers().PowerOff())
+	def StartMaintenance(self):  return(self.Servers().StartMaintenance())
+	def StopMaintenance(self):  return(self.Servers().StopMaintenance())
+
+
+	async def Delete(self):
+		return(Requests(await API.Call('DELETE','groups/%s/%s' % (self.alias,self.id),{},session=self.session),
+		                alias=self.alias,session=self.session))
+
+
+	def Account(self):
+		return(Account(alias=self.alias,session=self.session))
+
+
+	def __str__(self):
+		return(self.data['name'])
+
+
+
+class Servers(object):
+
+	def __init__(self,servers_lst,alias=None,session=None):
+		"""Container class for one or more servers.
+
+		Server objects are loaded concurrently when Servers() is awaited.
+
+		"""
+
+		self.servers_lst = servers_lst
+		self.alias = alias
+		self.session = session
+
+
+	async def Servers(self,cached=True):
+		"""Returns list of loaded server objects, fetching all of them concurrently.
+
+		>>> await clc.v2.aio.Servers(["NY1BTDIPHYP0101","NY1BTDIWEB0101"]).Servers()
+		[<clc.APIv2.aio.Server object at 0x1065b0d50>, <clc.APIv2.aio.Server object at 0x1065b0e50>]
+
+		"""
+
+		if not hasattr(self,'_servers') or not cached:
+			if not self.alias:  self.alias = await Account.GetAlias(session=self.session)
+			self._servers = list(await asyncio.gather(*[Server(id=server,alias=self.alias,session=self.session) for server in self.servers_lst]))
+
+		return(self._servers)
+
+
+	async def _Operation(self,operation):
+		"""Execute specified operations task against one or more servers.
+
+		Returns a clc.v2.aio.Requests object.
+		"""
+
+		if not self.alias:  self.alias = await Account.GetAlias(session=self.session)
+
+		try:
+			r = await API.Call('POST','operations/%s/servers/%s' % (self.alias,operation),json.dumps(self.servers_lst),session=self.session)
+		except clc.APIFailedResponse as e:
+			# Most likely a queue add error presented as a 400.  Let Requests parse this
+			r = e.response_json
+
+		return(Requests(r,alias=self.alias,session=self.session))
+
+
+	def Archive(self):  return(self._Operation('archive'))
+	def Pause(self):  return(self._Operation('pause'))
+	def ShutDown(self):  return(self._Operation('shutDown'))
+	def Reboot(self):  return(self._Operation('reboot'))
+	def Reset(self):  return(self._Operation('reset'))
+	def PowerOn(self):  return(self._Operation('powerOn'))
+	def PowerOff(self):  return(self._Operation('powerOff'))
+	def StartMaintenance(self):  return(self._Operation('startMaintenance'))
+	def StopMaintenance(self):  return(self._Operation('stopMaintenance'))
+
+
+
+class Server(_Resource):
+
+	_sync = clc.APIv2.server.Server
+
+
+	def __init__(self,id,alias=None,server_obj=None,session=None):
+		"""Create Server object.  Await it to load server details.
+
+		>>> await clc.v2.aio.Server("CA3BTDICNTRLM01")
+		<clc.APIv2.aio.Server object at 0x10c28fe50>
+
+		"""
+
+		self.id = id
+		self.alias = alias
+		self.capabilities = None
+		self.dirty = False
+		self.data = server_obj
+		self.session = session
+
+
+	async def _Load(self):
+		try:
+			return(await super(Server,self)._Load())
+		except clc.APIFailedResponse as e:
+			if e.response_status_code==404:  raise(clc.CLCException("Server does not exist"))
+			else: raise(clc.CLCException("HTTP error: %s" % e.response_status_code))
+
+
+	async def Refresh(self):
+		self.data = clc.APIv2.server.Server._Normalize(
+			await API.Call('GET','servers/%s/%s' % (self.alias,self.id),{},session=self.session))
+		self.dirty = False
+
+		return(self)
+
+
+	def _Capabilities(self,cached=True):
+		if self.capabilities is None:  raise(AttributeError("Server capabilities not loaded, await LoadCapabilities() first"))
+
+		return(self.capabilities)
+
+
+	async def LoadCapabilities(self,cached=True):
+		if not self.capabilities or not cached:
+			self.capabilities = await API.Call('GET','servers/%s/%s/capabilities' % (self.alias,self.name),session=self.session)
+
+		return(self.capabilities)
+
+
+	def Account(self):
+		return(Account(alias=self.alias,session=self.session))
+
+
+	def Group(self):
+		return(Group(id=self.groupId,alias=self.alias,session=self.session))
+
+
+	async def Credentials(self):
+		return(await API.Call('GET','servers/%s/%s/credentials' % (self.alias,self.name),session=self.session))
+
+
+	def _Operation(self,operation):
+		return(Servers([self.id],alias=self.alias,session=self.session)._Operation(operation))
+
+
+	def Archive(self):  return(self._Operation('archive'))
+	def Pause(self):  return(self._Operation('pause'))
+	def ShutDown(self):  return(self._Operation('shutDown'))
+	def Reboot(self):  return(self._Operation('reboot'))
+	def Reset(self):  return(self._Operation('reset'))
+	def PowerOn(self):  return(self._Operation('powerOn'))
+	def PowerOff(self):  return(self._Operation('powerOff'))
+	def StartMaintenance(self):  return(self._Operation('startMaintenance'))
+	def StopMaintenance(self):  return(self._Operation('stopMaintenance'))
+
+
+	async def Delete(self):
+		return(Requests(await API.Call('DELETE','servers/%s/%s' % (self.alias,self.id),session=self.session),
+		                alias=self.alias,session=self.session))
+
+
+	def __str__(self):
+		return(self.data['name'])
+
+
+
+class Requests(clc.APIv2.queue.Requests):
+
+	def __init__(self,requests_lst,alias,session=None):
+		"""Create Requests object.
+
+		Parses the queue response exactly as clc.v2.Requests does but tracks
+		each operation with a clc.v2.aio.Request.
+
+		"""
+
+		super(Requests,self).__init__(requests_lst,alias=alias,session=session)
+
+		self.requests = [Request(r.id,alias=self.alias,request_obj=r.data,session=self.session,uri=getattr(r,'uri',None))
+		                 for r in self.requests]
+
+
+	def __add__(self,obj):
+		if isinstance(obj, int):  return(self)	# we get this with a sum() call - ignore the first argument
+		if not isinstance(obj,Requests):  raise(ArithmeticError("Cannot add blocking Requests to clc.v2.aio.Requests"))
+		if self.alias != obj.alias:  raise(ArithmeticError("Cannot add Requests operating on different aliases"))
+
+		new_obj = self.__class__([],alias=self.alias,session=self.session)
+		new_obj.requests = obj.requests+self.requests
+		new_obj.success_requests = obj.success_requests+self.success_requests
+		new_obj.error_requests = obj.error_requests+self.error_requests
+
+		return(new_obj)
+
+
+	def __radd__(self,obj):  return(self.__add__(obj))
+
+
+	async def WaitUntilComplete(self,poll_freq=2,timeout=None):
+		"""Poll until all request objects have completed.
+
+		Each pass polls every outstanding request concurrently.  Returns the number
+		of unsuccessful requests.
+
+		>>> await (await clc.v2.aio.Server("WA1BTDIKRT02").PowerOn()).WaitUntilComplete()
+		0
+
+		"""
+
+		start_time = time.time()
+		while len(self.requests):
+			statuses = await asyncio.gather(*[request.Status() for request in self.requests])
+
+			cur_requests = []
+			for request,status in zip(self.requests,statuses):
+				if status in ('notStarted','executing','resumed','queued','running'): cur_requests.append(request)
+				elif status == 'succeeded': self.success_requests.append(request)
+				elif status in ("failed", "unknown"): self.error_requests.append(request)
+
+			self.requests = cur_requests
+			if len(self.requests) > 0 and clc.v2.time_utils.TimeoutExpired(start_time, timeout):
+				raise clc.RequestTimeoutException('Timeout waiting for Requests: {0}'.format(self.requests[0].id),
+				                                  self.requests[0].data['status'])
+
+			if len(self.requests):  await asyncio.sleep(poll_freq)
+
+		return(len(self.error_requests))
+
+
+
+class Request(clc.APIv2.queue.Request):
+
+	def __init__(self,id,alias,request_obj=None,session=None,uri=None):  # pylint: disable=super-init-not-called
+		"""Create Request object.
+
+		uri is only supplied for v2-experimental operations.
+
+		"""
+
+		self.id = id
+		self.alias = alias
+		self.session = session
+		if uri:  self.uri = uri
+		else:  self.uri = 'operations/%s/status/%s' % (alias,id)
+
+		self.time_created = time.time()
+		self.time_executed = None
+		self.time_completed = None
+
+		if request_obj:  self.data = request_obj
+		else:  self.data = {'context_key': None, 'context_val': None}
+		self.data = dict(list({'status': None}.items()) + list(self.data.items()))
+
+
+	async def Status(self,cached=False):
+		if not cached or not self.data['status']:
+			try:
+				self.data['status'] = (await API.Call('GET',self.uri,{},session=self.session))['status']
+			except clc.APIFailedResponse as e:
+				if e.response_status_code == 500:  pass
+				else:  raise(e)
+		return(self.data['status'])
+
+
+	async def WaitUntilComplete(self,poll_freq=2,timeout=None):
+		"""Poll until status is completed.
+
+		Raises a clc.CLCException if the request fails.
+		"""
+		start_time = time.time()
+		while not self.time_completed:
+			status = await self.Status()
+			if status == 'executing':
+				if not self.time_executed:  self.time_executed = time.time()
+				if clc.v2.time_utils.TimeoutExpired(start_time, timeout):
+					raise clc.RequestTimeoutException('Timeout waiting for Request: {0}'.format(self.id), status)
+
+			elif status == 'succeeded':
+				self.time_completed = time.time()
+			elif status in ("failed", "unknown"):
+				self.time_completed = time.time()
+				raise(clc.CLCException("%s %s execution %s" % (self.context_key,self.context_val,status)))
+
+			if not self.time_completed:  await asyncio.sleep(poll_freq)
+
+
+	async def Server(self):
+		"""Return loaded server associated with this request."""
+
+		if self.context_key == 'newserver':
+			server_id = (await API.Call('GET',self.context_val,session=self.session))['id']
+			return(await Server(id=server_id,alias=self.alias,session=self.session))
+		elif self.context_key == 'server':
+			return(await Server(id=self.context_val,alias=self.alias,session=self.session))
+		else:  raise(clc.CLCException("%s object not server" % self.context_key))
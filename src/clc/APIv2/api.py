@@ -4,12 +4,51 @@ from __future__ import print_function, absolute_import, unicode_literals
 
 import os
 import sys
+import copy
+import json
+import time
+import base64
+import threading
 import clc
 import requests
 
+from clc.APIv2.retry import RetryPolicy
+from clc.APIv2.cache import ResponseCache
+
+
+class _Flight(object):
+	"""A GET in progress that identical concurrent calls wait on."""
+
+	def __init__(self):
+		self.waiters = 0
+		self.result = None
+		self.error = None
+		self._done = threading.Event()
+
+
+	def Finish(self,result=None,error=None):
+		# Waiters get their own copies of a private snapshot since callers normalize results in place
+		if self.waiters:  self.result = copy.deepcopy(result)
+		self.error = error
+		self._done.set()
+
+
+	def Wait(self):
+		self._done.wait()
+		if self.error is not None:  raise(self.error)
+		return(copy.deepcopy(self.result))
+
 
 class API(object):
 
+	_retry_policy = RetryPolicy()
+	_rate_limiter = None
+	_response_cache = None
+	_coalesce_gets = True
+	_in_flight = {}
+	_in_flight_lock = threading.Lock()
+
+
 	# requests module includes cacert.pem which is visible when run as installed module.
 	# pyinstall single-file deployment needs cacert.pem packaged along and referenced.
 	# This module proxies between the two based on whether the cacert.pem exists in
@@ -42,6 +81,46 @@ class API(object):
 			pass
 
 
+	@staticmethod
+	def SetRetryPolicy(policy):
+		"""Set the RetryPolicy applied to all v2 API calls.  None disables retries.
+
+		>>> clc.v2.API.SetRetryPolicy(clc.v2.RetryPolicy(retries=5))
+
+		"""
+		API._retry_policy = policy
+
+
+	@staticmethod
+	def SetRateLimiter(limiter):
+		"""Set the RateLimiter shared by all threads issuing v2 API calls.  None (the default) disables limiting.
+
+		>>> clc.v2.API.SetRateLimiter(clc.v2.RateLimiter(rate=10,burst=20))
+
+		"""
+		API._rate_limiter = limiter
+
+
+	@staticmethod
+	def SetResponseCache(cache):
+		"""Set the ResponseCache used for GET calls.  None (the default) disables caching.
+
+		>>> clc.v2.API.SetResponseCache(clc.v2.ResponseCache(ttl=30,ttls={'datacenters': 3600}))
+
+		"""
+		API._response_cache = cache
+
+
+	@staticmethod
+	def SetCoalesceGets(enabled):
+		"""Enable (the default) or disable sharing one response between identical concurrent GETs.
+
+		>>> clc.v2.API.SetCoalesceGets(False)
+
+		"""
+		API._coalesce_gets = enabled
+
+
 	@staticmethod
 	def _DebugRequest(request,response):
 		print('{}\n{}\n{}\n\n{}\n'.format(
@@ -60,79 +139,161 @@ class API(object):
 
 	@staticmethod
 	def _Login():
-		"""Login to retrieve bearer token and set default accoutn and location aliases."""
-		if not clc.v2.V2_API_USERNAME or not clc.v2.V2_API_PASSWD:
-			clc.v1.output.Status('ERROR',3,'V2 API username and password not provided')
-			raise(clc.APIV2NotEnabled)
+		"""Login to retrieve bearer token and set default accoutn and location aliases.
 
-		session = clc._REQUESTS_SESSION
-		session.headers['content-type'] = "application/json"
+		A valid login saved in the token cache is adopted instead, which sets the aliases too.
+		"""
+		credentials = clc.v2._CREDENTIALS
+		with credentials._lock:
+			if not credentials._LoadCached():  credentials.Login()
 
-		r = session.request("POST",
-                            "%s/v2/%s" % (clc.defaults.ENDPOINT_URL_V2,"authentication/login"),
-                            json={"username": clc.v2.V2_API_USERNAME, "password": clc.v2.V2_API_PASSWD},
-                            verify=API._ResourcePath('clc/cacert.pem'))
 
-		if r.status_code == 200:
-			clc._LOGIN_TOKEN_V2 = r.json()['bearerToken']
-			clc.ALIAS = r.json()['accountAlias']
-			clc.LOCATION = r.json()['locationAlias']
-		elif r.status_code == 400:
-			raise(Exception("Invalid V2 API login.  %s" % (r.json()['message'])))
-		else:
-			raise(Exception("Error logging into V2 API.  Response code %s. message %s" % (r.status_code,r.json()['message'])))
+	@staticmethod
+	def _Credentials(session=None):
+		"""Return the Credentials object backing the provided session or the global credentials."""
+		if session is None:  return(clc.v2._CREDENTIALS)
+
+		if 'credentials' not in session:
+			session.setdefault('credentials',Credentials(username=session.get('username'),password=session.get('password'),
+			                                             token=session.get('token'),alias=session.get('alias'),
+			                                             location=session.get('location'),http_session=session['http_session']))
+
+		return(session['credentials'])
 
 
 	@staticmethod
-	def Call(method,url,payload=None,session=None,debug=False):  # pylint: disable=too-many-branches
+	def _FQURL(url):
+		# If executing refs provided in API they are abs paths,
+		# Else refs we build in the sdk are relative
+		if url[0]=='/':  return("%s%s" % (clc.defaults.ENDPOINT_URL_V2,url))
+		else:  return("%s/v2/%s" % (clc.defaults.ENDPOINT_URL_V2,url))
+
+
+	@staticmethod
+	def Call(method,url,payload=None,session=None,debug=False):
 		"""Execute v2 API call.
 
+		Safe to invoke concurrently from multiple threads.  Headers are built per request
+		rather than set on the shared http session.  Identical GETs issued while one is
+		already in flight wait for and share its response rather than sending their own.
+
 		:param url: URL paths associated with the API call
 		:param payload: dict containing all parameters to submit with POST call
 
 		:returns: decoded API json result
 		"""
-		if session is not None:
-			token = session['token']
-			http_session = session['http_session']
+		if method!="GET" or debug or not API._coalesce_gets:  return(API._Send(method,url,payload,session,debug))
 
-		else:
-			if not clc._LOGIN_TOKEN_V2:
-				API._Login()
-			token = clc._LOGIN_TOKEN_V2
-			http_session = clc._REQUESTS_SESSION
+		key = ResponseCache.Key(API._FQURL(url),payload,session)
+		with API._in_flight_lock:
+			flight = API._in_flight.get(key)
+			leader = flight is None
+			if leader:  flight = API._in_flight[key] = _Flight()
+			else:  flight.waiters += 1
+
+		if not leader:  return(flight.Wait())
+
+		try:
+			result = API._Send(method,url,payload,session,debug)
+		except Exception as e:
+			flight.Finish(error=e)
+			raise
+		finally:
+			with API._in_flight_lock:  del API._in_flight[key]
+
+		flight.Finish(result=result)
+		return(result)
+
+
+	@staticmethod
+	def _Send(method,url,payload=None,session=None,debug=False):
+		if session is not None:  http_session = session['http_session']
+		else:  http_session = clc._REQUESTS_SESSION
+
+		credentials = API._Credentials(session)
 
 		if payload is None:
 		    payload = {}
 
-		# If executing refs provided in API they are abs paths,
-		# Else refs we build in the sdk are relative
-		if url[0]=='/':  fq_url = "%s%s" % (clc.defaults.ENDPOINT_URL_V2,url)
-		else:  fq_url = "%s/v2/%s" % (clc.defaults.ENDPOINT_URL_V2,url)
+		fq_url = API._FQURL(url)
 
-		http_session.headers.update({'Authorization': "Bearer %s" % token})
+		if isinstance(payload, str):  content_type = "Application/json" # added for server ops with str payload
+		else:  content_type = "application/x-www-form-urlencoded"
 
-		if isinstance(payload, str):  http_session.headers['content-type'] = "Application/json" # added for server ops with str payload
-		else:  http_session.headers['content-type'] = "application/x-www-form-urlencoded"
+		cache = API._response_cache
+		cache_entry = None
+		if cache is not None and method=="GET":
+			cache_key = cache.Key(fq_url,payload,session)
+			cache_entry = cache.Get(cache_key)
+			if cache_entry is not None and cache_entry.Fresh():  return(cache.Value(cache_entry))
+		elif cache is not None:
+			# Drop cached reads of the resource before writing so no thread sees them afterwards
+			cache.Invalidate(fq_url,payload)
 
-		if method=="GET":
-			r = http_session.request(method,fq_url,
-			                     params=payload,
-								 verify=API._ResourcePath('clc/cacert.pem'))
-		else:
-			r = http_session.request(method,fq_url,
-			                     data=payload,
-								 verify=API._ResourcePath('clc/cacert.pem'))
+		retried = False
+		attempt = 0
+		while True:
+			token = credentials.Token()
+			headers = {'Authorization': "Bearer %s" % token, 'content-type': content_type}
+			if cache_entry is not None:  headers.update(cache_entry.ConditionalHeaders())
+
+			if API._rate_limiter:  API._rate_limiter.Acquire(url)
+
+			try:
+				if method=="GET":
+					r = http_session.request(method,fq_url,
+					                     params=payload,
+					                     headers=headers,
+										 verify=API._ResourcePath('clc/cacert.pem'))
+				else:
+					r = http_session.request(method,fq_url,
+					                     data=payload,
+					                     headers=headers,
+										 verify=API._ResourcePath('clc/cacert.pem'))
+			except requests.exceptions.ConnectionError:
+				delay = API._retry_policy and API._retry_policy.Delay(method,attempt,connection_error=True)
+				if delay is None:  raise
+				time.sleep(delay)
+				attempt += 1
+				continue
+
+			# Token expired or revoked server side.  Login again and retry once, the
+			# way v1 retries on StatusCode 100
+			if r.status_code == 401 and not retried and credentials.Invalidate(token):
+				retried = True
+				continue
+
+			if r.status_code>=300 and API._retry_policy:
+				delay = API._retry_policy.Delay(method,attempt,status=r.status_code,retry_after=r.headers.get('Retry-After'))
+				if delay is not None:
+					# Throttled - hold back every thread calling this endpoint, not just this one
+					if r.status_code == 429 and API._rate_limiter:  API._rate_limiter.Pause(url,delay)
+					time.sleep(delay)
+					attempt += 1
+					continue
+
+			break
 
 		if debug:
-			API._DebugRequest(request=requests.Request(method,fq_url,data=payload,headers=http_session.headers).prepare(),
-			                  response=r)
+			API._DebugRequest(request=r.request,response=r)
+
+		if cache_entry is not None and r.status_code==304:
+			cache.Revalidated(cache_entry,fq_url)
+			return(cache.Value(cache_entry))
 
 		if r.status_code>=200 and r.status_code<300:
 			try:
-				return(r.json())
+				data = r.json()
 			except:
 				return({})
+
+			if cache is not None and method=="GET":
+				cache.Store(cache_key,fq_url,data,etag=r.headers.get('ETag'),last_modified=r.headers.get('Last-Modified'))
+			elif cache is not None:
+				# Again in case a concurrent read cached the old state mid-write
+				cache.Invalidate(fq_url,payload)
+
+			return(data)
 		else:
 			try:
 				e = clc.APIFailedResponse("Response code %s.  %s %s %s" %
@@ -150,3 +311,149 @@ class API(object):
 				e.response_json = {}	# or should this be None?
 				e.response_text = r.text
 				raise(e)
+
+
+
+class Credentials(object):
+	"""Bearer token, account alias and location for one set of v2 API credentials.
+
+	All state is guarded by a lock so one object can be shared by every thread issuing
+	calls.  Login is single-flight: threads that need a token while a login is underway
+	wait for that login rather than issuing their own.  Tokens are renewed once they
+	come within REFRESH_MARGIN seconds of expiring.
+	"""
+
+	# Assumed token lifetime when the expiry cannot be read from the token itself
+	TOKEN_LIFETIME = 14*24*3600
+	REFRESH_MARGIN = 600
+
+
+	def __init__(self,username=None,password=None,token=None,alias=None,location=None,http_session=None):
+		self.username = username
+		self.password = password
+		self.token = token
+		self.alias = alias
+		self.location = location
+		self.http_session = http_session
+
+		if token:  self.expires = Credentials._TokenExpiry(token)
+		else:  self.expires = None
+
+		self._lock = threading.RLock()
+
+
+	@staticmethod
+	def _TokenExpiry(token):
+		"""Return the POSIX expiry time of a bearer token.
+
+		Tokens are JWTs carrying an exp claim.  If it cannot be decoded fall back
+		to the documented token lifetime.
+		"""
+		try:
+			claims = token.split('.')[1]
+			claims += '=' * (-len(claims) % 4)
+			return(int(json.loads(base64.urlsafe_b64decode(claims.encode('ascii')).decode('utf-8'))['exp']))
+		except:
+			return(int(time.time())+Credentials.TOKEN_LIFETIME)
+
+
+	def _UsernamePassword(self):
+		return(self.username,self.password)
+
+
+	def _SetLogin(self,data):
+		"""Record a successful authentication/login response."""
+		with self._lock:
+			# expiry first so unlocked readers never pair the new token with a stale expiry
+			self.expires = Credentials._TokenExpiry(data['bearerToken'])
+			self.token = data['bearerToken']
+			self.alias = data['accountAlias']
+			self.location = data['locationAlias']
+
+
+	def Login(self):
+		"""Login to retrieve bearer token and set default account and location aliases."""
+		username,password = self._UsernamePassword()
+		if not username or not password:
+			clc.v1.output.Status('ERROR',3,'V2 API username and password not provided')
+			raise(clc.APIV2NotEnabled)
+
+		if self.http_session is not None:  http_session = self.http_session
+		else:  http_session = clc._REQUESTS_SESSION
+
+		with self._lock:
+			r = http_session.request("POST",
+			                         "%s/v2/%s" % (clc.defaults.ENDPOINT_URL_V2,"authentication/login"),
+			                         json={"username": username, "password": password},
+			                         verify=API._ResourcePath('clc/cacert.pem'))
+
+			if r.status_code == 200:
+				self._SetLogin(r.json())
+				if clc._TOKEN_CACHE:  clc._TOKEN_CACHE.Save(clc.defaults.ENDPOINT_URL_V2,username,password,r.json(),self.expires)
+			elif r.status_code == 400:
+				raise(Exception("Invalid V2 API login.  %s" % (r.json()['message'])))
+			else:
+				raise(Exception("Error logging into V2 API.  Response code %s. message %s" % (r.status_code,r.json()['message'])))
+
+
+	def _LoadCached(self):
+		"""Adopt a login saved by an earlier process in the token cache.  Returns True on success."""
+		username,password = self._UsernamePassword()
+		if not clc._TOKEN_CACHE or not username or not password:  return(False)
+
+		data = clc._TOKEN_CACHE.Load(clc.defaults.ENDPOINT_URL_V2,username,password)
+		if not data or data['expires']-Credentials.REFRESH_MARGIN <= time.time():  return(False)
+
+		with self._lock:
+			self._SetLogin(data)
+			self.expires = data['expires']
+
+		return(True)
+
+
+	def Valid(self):
+		"""Returns True if a token is held and is not about to expire."""
+		return(bool(self.token) and self.expires-Credentials.REFRESH_MARGIN > time.time())
+
+
+	def Token(self):
+		"""Return a valid bearer token, logging in first if necessary."""
+		if self.Valid():  return(self.token)
+
+		with self._lock:
+			# Another thread may have completed the login while we waited on the lock
+			if not self.Valid() and not self._LoadCached():  self.Login()
+			return(self.token)
+
+
+	def Invalidate(self,token=None):
+		"""Discard the bearer token so the next call logs in again.
+
+		If token is supplied it is only discarded if it is still the current token, so
+		many threads reporting the same rejected token cause a single new login.
+		Returns True if a subsequent login is possible.
+		"""
+		with self._lock:
+			if token is None or token == self.token:
+				# Don't let the next Token() pick the rejected token back up from the cache
+				if clc._TOKEN_CACHE and token is not None and self._UsernamePassword()[0]:
+					clc._TOKEN_CACHE.Delete(clc.defaults.ENDPOINT_URL_V2,self._UsernamePassword()[0])
+				self.token = None
+			return(all(self._UsernamePassword()))
+
+
+
+class GlobalCredentials(Credentials):
+	"""Credentials set module wide via clc.v2.SetCredentials.
+
+	Login also establishes the default clc.ALIAS and clc.LOCATION.
+	"""
+
+	def _UsernamePassword(self):
+		return(clc.v2.V2_API_USERNAME,clc.v2.V2_API_PASSWD)
+
+
+	def _SetLogin(self,data):
+		super(GlobalCredentials,self)._SetLogin(data)
+		clc.ALIAS = data['accountAlias']
+		clc.LOCATION = data['locationAlias']
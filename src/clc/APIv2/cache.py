@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Response cache applied to GET calls made through clc.v2.API.Call.
+
+Entries are keyed on url, query parameters and the calling session.  Each entry lives
+for the TTL configured for its endpoint (servers, groups, datacenters, ...) and the least
+recently used entries are evicted once the cache is full.  Expired entries which carried
+an ETag or Last-Modified header are revalidated with a conditional GET rather than
+refetched.  Any other method invalidates the cached entries for the resource it writes.
+
+>>> clc.v2.API.SetResponseCache(clc.v2.ResponseCache(ttl=30,ttls={'datacenters': 3600}))
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import re
+import copy
+import json
+import time
+import threading
+import collections
+
+from clc.APIv2.retry import RateLimiter
+
+
+class CacheEntry(object):
+
+	def __init__(self,path,value,expires,etag=None,last_modified=None):
+		self.path = path
+		self.value = value
+		self.expires = expires
+		self.etag = etag
+		self.last_modified = last_modified
+
+
+	def Fresh(self):  return(self.expires > time.time())
+	def Revalidatable(self):  return(bool(self.etag or self.last_modified))
+
+
+	def ConditionalHeaders(self):
+		"""Returns request headers asking the API to confirm this entry is still current."""
+
+		headers = {}
+		if self.etag:  headers['If-None-Match'] = self.etag
+		if self.last_modified:  headers['If-Modified-Since'] = self.last_modified
+
+		return(headers)
+
+
+
+class ResponseCache(object):
+
+	def __init__(self,ttl=30,ttls=None,max_entries=1024):
+		"""Create ResponseCache object.
+
+		ttl - default seconds a response is served from cache
+		ttls - dict mapping an endpoint name to its own ttl.  A ttl of 0 disables caching for the endpoint
+		max_entries - number of responses kept before the least recently used are evicted
+
+		Operation status and authentication calls are never cached unless explicitly
+		given a ttl, as pollers depend on seeing every change.
+
+		"""
+
+		self.ttl = ttl
+		self.ttls = {'operations': 0, 'authentication': 0}
+		self.ttls.update(ttls or {})
+		self.max_entries = max_entries
+		self.entries = collections.OrderedDict()
+
+		self._lock = threading.Lock()
+
+
+	@staticmethod
+	def _Path(fq_url):
+		"""Normalize an absolute API url to a lower case path such as /v2/servers/btdi/wa1btdix01."""
+		return(re.sub(r"^https?://[^/]+","",fq_url).rstrip('/').lower())
+
+
+	@staticmethod
+	def Key(fq_url,payload=None,session=None):
+		"""Return the cache key for a GET of fq_url with query parameters payload from session."""
+
+		if isinstance(payload,dict):  params = tuple(sorted((k,"%s" % v) for k,v in payload.items()))
+		else:  params = payload or None
+
+		if session is not None:  owner = (session.get('username'),session.get('alias'))
+		else:  owner = None
+
+		return((ResponseCache._Path(fq_url),params,owner))
+
+
+	def TTL(self,fq_url):
+		return(self.ttls.get(RateLimiter.Endpoint(ResponseCache._Path(fq_url)),self.ttl))
+
+
+	def Get(self,key):
+		"""Return the CacheEntry for key, fresh or awaiting revalidation, or None."""
+
+		with self._lock:
+			entry = self.entries.get(key)
+			if entry is None:  return(None)
+
+			if not entry.Fresh() and not entry.Revalidatable():
+				del self.entries[key]
+				return(None)
+
+			# Reinsert to mark as most recently used
+			self.entries[key] = self.entries.pop(key)
+			return(entry)
+
+
+	def Value(self,entry):
+		"""Return a private copy of a cached response.  Callers normalize responses in place."""
+		return(copy.deepcopy(entry.value))
+
+
+	def Store(self,key,fq_url,value,etag=None,last_modified=None):
+		ttl = self.TTL(fq_url)
+		if ttl <= 0:  return
+
+		with self._lock:
+			self.entries.pop(key,None)
+			self.entries[key] = CacheEntry(key[0],copy.deepcopy(value),time.time()+ttl,etag,last_modified)
+			while len(self.entries) > self.max_entries:  self.entries.popitem(last=False)
+
+
+	def Revalidated(self,entry,fq_url):
+		"""The API confirmed entry is unchanged (304).  Start a new TTL."""
+		entry.expires = time.time()+self.TTL(fq_url)
+
+
+	@staticmethod
+	def _AffectedPaths(fq_url,payload):
+		"""Return paths whose cached responses a write to fq_url may have changed.
+
+		Server operations name their targets in the payload rather than the url, e.g.
+		POST /v2/operations/btdi/servers/powerOn ["WA1BTDIX01"] changes /v2/servers/btdi/wa1btdix01.
+
+		"""
+
+		path = ResponseCache._Path(fq_url)
+		paths = [path]
+
+		m = re.match(r"^(/v2[^/]*)/operations/([^/]+)/servers/[^/]+$",path)
+		if m:
+			try:
+				ids = json.loads(payload)
+			except (TypeError,ValueError):
+				ids = []
+			paths += ["%s/servers/%s/%s" % (m.group(1),m.group(2),("%s" % id).lower()) for id in ids]
+
+		return(paths)
+
+
+	def Invalidate(self,fq_url,payload=None):
+		"""Drop entries for the written resource, its sub-resources and the collections containing it."""
+
+		paths = ResponseCache._AffectedPaths(fq_url,payload)
+
+		def _Affected(cached):
+			for path in paths:
+				if cached == path or cached.startswith(path+'/') or path.startswith(cached+'/'):  return(True)
+			return(False)
+
+		with self._lock:
+			for key in [key for key,entry in self.entries.items() if _Affected(entry.path)]:
+				del self.entries[key]
+
+
+	def Clear(self):
+		with self._lock:
+			self.entries.clear()
+
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache for datacenter capabilities.
+
+Deployment and bare metal capabilities (which also back Datacenter.Templates and
+Datacenter.Networks) are large and rarely change.  CapabilityCache keeps them in a SQLite
+database under the user cache directory so every process on a host shares one copy.
+
+Entries younger than refresh_age are served as is.  Entries between refresh_age and
+max_age are served immediately while a background thread fetches a fresh copy.  Older
+entries are refetched before returning.
+
+>>> clc.v2.Datacenter.SetCapabilityCache(clc.v2.CapabilityCache(max_age=7*24*3600,refresh_age=3600))
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+def _DefaultPath():
+	if os.name == 'nt':  base = os.environ.get('LOCALAPPDATA',os.path.expanduser('~'))
+	else:  base = os.environ.get('XDG_CACHE_HOME',os.path.join(os.path.expanduser('~'),'.cache'))
+
+	return(os.path.join(base,'clc','capabilities.sqlite'))
+
+
+class CapabilityCache(object):
+
+	def __init__(self,path=None,max_age=24*3600,refresh_age=3600):
+		"""Create CapabilityCache object.
+
+		path - SQLite database file, defaults to clc/capabilities.sqlite in the user cache directory
+		max_age - seconds after which an entry is refetched before being returned
+		refresh_age - seconds after which an entry is returned but refreshed in the background
+
+		"""
+
+		self.path = path or _DefaultPath()
+		self.max_age = max_age
+		self.refresh_age = refresh_age
+
+		self._refreshing = set()
+		self._lock = threading.Lock()
+
+		if not os.path.isdir(os.path.dirname(os.path.abspath(self.path))):
+			os.makedirs(os.path.dirname(os.path.abspath(self.path)))
+
+		db = self._Connect()
+		try:
+			with db:
+				db.execute("CREATE TABLE IF NOT EXISTS capabilities (key TEXT PRIMARY KEY, value TEXT, fetched REAL)")
+		finally:
+			db.close()
+
+
+	def _Connect(self):
+		# sqlite connections can't cross threads so each operation opens its own.  WAL lets
+		# readers in other processes carry on while one writes
+		db = sqlite3.connect(self.path,timeout=30)
+		try:
+			db.execute("PRAGMA journal_mode=WAL")
+		except sqlite3.OperationalError:
+			pass
+
+		return(db)
+
+
+	def Read(self,key):
+		"""Returns (value,fetched) for key or (None,None) if not cached."""
+
+		db = self._Connect()
+		try:
+			row = db.execute("SELECT value, fetched FROM capabilities WHERE key = ?",(key,)).fetchone()
+		finally:
+			db.close()
+
+		if row is None:  return((None,None))
+		else:  return((json.loads(row[0]),row[1]))
+
+
+	def Write(self,key,value):
+		db = self._Connect()
+		try:
+			with db:
+				db.execute("INSERT OR REPLACE INTO capabilities (key, value, fetched) VALUES (?, ?, ?)",(key,json.dumps(value),time.time()))
+		finally:
+			db.close()
+
+
+	def Delete(self,key=None):
+		"""Remove key, or every entry if key is None."""
+
+		db = self._Connect()
+		try:
+			with db:
+				if key is None:  db.execute("DELETE FROM capabilities")
+				else:  db.execute("DELETE FROM capabilities WHERE key = ?",(key,))
+		finally:
+			db.close()
+
+
+	def _Refresh(self,key,fetch):
+		try:
+			self.Write(key,fetch())
+		except Exception:
+			pass	# keep serving the stale copy, the next read past refresh_age tries again
+		finally:
+			with self._lock:  self._refreshing.discard(key)
+
+
+	def _RefreshInBackground(self,key,fetch):
+		with self._lock:
+			if key in self._refreshing:  return
+			self._refreshing.add(key)
+
+		t = threading.Thread(target=self._Refresh,args=(key,fetch))
+		t.daemon = True
+		t.start()
+
+		return(t)
+
+
+	def Get(self,key,fetch):
+		"""Return cached value for key, calling fetch() to populate or refresh it as needed.
+
+		>>> cache.Get('BTDI/WA1/deploymentCapabilities',lambda: clc.v2.API.Call('GET','datacenters/BTDI/WA1/deploymentCapabilities'))
+		{u'supportsPremiumStorage': True, u'templates': [...], ...}
+
+		"""
+
+		value,fetched = self.Read(key)
+		age = fetched is not None and time.time()-fetched
+
+		if fetched is None or age >= self.max_age:
+			value = fetch()
+			self.Write(key,value)
+		elif age >= self.refresh_age:
+			self._RefreshInBackground(key,fetch)
+
+		return(value)
+
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Compact read-only records of API objects.
+
+The full model classes keep a per-object __dict__ and the complete API payload, which
+adds up quickly when holding tens of thousands of servers in memory.  The records here
+use __slots__ and hold only the declared fields.  Low cardinality strings such as status,
+OS, location and type are interned so every record shares one copy.  The raw payload is
+only retained when keep_raw is set.
+
+Records are snapshots.  Use Handle() to get a full model object for making changes.
+
+>>> s = clc.v2.compact.Compact(clc.v2.Server("WA1BTDIX01"))
+>>> s.power_state, s.os, s.memory
+(u'started', u'ubuntu14_64Bit', 4)
+>>> s.Handle().PowerOff()
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import clc
+
+
+# Only low cardinality fields are interned, and the table stops growing once full so a long
+# running process can't accumulate every distinct value it has seen
+_STRINGS = {}
+_MAX_STRINGS = 4096
+
+
+def _Intern(value):
+	"""Return the shared copy of a string.  Works for py2 unicode where intern() does not."""
+
+	if value is None:  return(None)
+	if value in _STRINGS or len(_STRINGS) < _MAX_STRINGS:  return(_STRINGS.setdefault(value,value))
+	return(value)
+
+
+def _Tuple(value):
+	return(tuple(value or ()))
+
+
+def _Lookup(data,path):
+	for key in path:
+		if not isinstance(data,dict) or key not in data:  return(None)
+		data = data[key]
+
+	return(data)
+
+
+
+class _Record(object):
+
+	__slots__ = ('_raw',)
+
+	# (attribute, path of keys into the API payload, optional conversion)
+	FIELDS = ()
+
+
+	@classmethod
+	def From(cls,data,keep_raw=False,**extra):
+		"""Build a record from an API payload.  extra sets fields not found in the payload."""
+
+		obj = cls.__new__(cls)
+		for field in cls.FIELDS:
+			value = _Lookup(data,field[1])
+			if len(field)>2:  value = field[2](value)
+			setattr(obj,field[0],value)
+		for name,value in extra.items():  setattr(obj,name,value)
+		obj._raw = data if keep_raw else None
+
+		return(obj)
+
+
+	@property
+	def raw(self):
+		"""The API payload this record was built from.  Only kept when compacted with keep_raw=True."""
+
+		if self._raw is None:  raise(clc.CLCException("Raw payload not kept, compact with keep_raw=True"))
+		return(self._raw)
+
+
+	def ToDict(self):
+		return(dict((name,getattr(self,name)) for name in self.__slots__ if name != '_raw'))
+
+
+	def __str__(self):
+		return("%s" % self.id)
+
+
+	def __repr__(self):
+		return("<%s %s>" % (self.__class__.__name__,self))
+
+
+
+class CompactServer(_Record):
+
+	FIELDS = (('id',('id',)),
+	          ('name',('name',)),
+	          ('description',('description',)),
+	          ('group_id',('groupId',)),
+	          ('location_id',('locationId',),_Intern),
+	          ('os_type',('osType',),_Intern),
+	          ('os',('os',),_Intern),
+	          ('status',('status',),_Intern),
+	          ('type',('type',),_Intern),
+	          ('storage_type',('storageType',),_Intern),
+	          ('is_template',('isTemplate',)),
+	          ('power_state',('details','powerState'),_Intern),
+	          ('in_maintenance_mode',('details','inMaintenanceMode')),
+	          ('cpu',('details','cpu')),
+	          ('memory',('details','memoryGB')),
+	          ('storage',('details','storageGB')),
+	          ('host_name',('details','hostName')),
+	          ('created_date',('changeInfo','createdDate')),
+	          ('modified_date',('changeInfo','modifiedDate')),
+	          ('ip_addresses',('details','ipAddresses'),lambda ips: tuple(ip['internal'] for ip in ips or () if 'internal' in ip)))
+	__slots__ = tuple(f[0] for f in FIELDS) + ('alias',)
+
+
+	def Handle(self,session=None):
+		"""Return a lazy clc.v2.Server for this server.  No API call is made until it is used."""
+
+		return(clc.v2.Server(id=self.id,alias=self.alias,session=session,lazy=True))
+
+
+
+class CompactGroup(_Record):
+
+	FIELDS = (('id',('id',)),
+	          ('name',('name',)),
+	          ('description',('description',)),
+	          ('location_id',('locationId',),_Intern),
+	          ('type',('type',),_Intern),
+	          ('status',('status',),_Intern),
+	          ('parent_id',('links',),lambda links: next((l['id'] for l in links or () if l.get('rel')=='parentGroup'),None)),
+	          ('server_ids',('links',),lambda links: tuple(l['id'] for l in links or () if l.get('rel')=='server')),
+	          ('group_ids',('groups',),lambda groups: tuple(g['id'] for g in groups or ())))
+	__slots__ = tuple(f[0] for f in FIELDS) + ('alias',)
+
+
+	def Handle(self,session=None):
+		"""Return a clc.v2.Group for this group.  Loads current group data."""
+
+		return(clc.v2.Group(id=self.id,alias=self.alias,session=session))
+
+
+
+class CompactDisk(_Record):
+
+	FIELDS = (('id',('id',)),
+	          ('size',('sizeGB',)),
+	          ('partition_paths',('partitionPaths',),_Tuple))
+	__slots__ = tuple(f[0] for f in FIELDS) + ('server_id',)
+
+
+
+class CompactPort(_Record):
+
+	FIELDS = (('protocol',('protocol',),_Intern),
+	          ('port',('port',)),
+	          ('port_to',('portTo',)))
+	__slots__ = tuple(f[0] for f in FIELDS)
+
+
+	def __str__(self):
+		if self.port_to:  return("%s-%s/%s" % (self.port,self.port_to,self.protocol))
+		else:  return("%s/%s" % (self.port,self.protocol))
+
+
+
+class CompactPublicIP(_Record):
+
+	FIELDS = (('internal',('internalIPAddress',)),
+	          ('ports',('ports',),lambda ports: tuple(CompactPort.From(p) for p in ports or ())),
+	          ('source_restrictions',('sourceRestrictions',),lambda restrictions: tuple(r['cidr'] for r in restrictions or ())))
+	__slots__ = tuple(f[0] for f in FIELDS) + ('id','server_id')
+
+
+
+class CompactNetwork(_Record):
+
+	FIELDS = (('id',('id',)),
+	          ('name',('name',)),
+	          ('description',('description',)),
+	          ('cidr',('cidr',)),
+	          ('gateway',('gateway',)),
+	          ('netmask',('netmask',),_Intern),
+	          ('type',('type',),_Intern),
+	          ('vlan',('vlan',)))
+	__slots__ = tuple(f[0] for f in FIELDS) + ('alias',)
+
+
+
+class CompactRequest(_Record):
+
+	FIELDS = (('status',('status',),_Intern),
+	          ('context_key',('context_key',),_Intern),
+	          ('context_val',('context_val',)))
+	__slots__ = tuple(f[0] for f in FIELDS) + ('id','alias')
+
+
+
+def Compact(obj,keep_raw=False):
+	"""Return the compact record for a Server, Group, Disk, PublicIP, Port, Network or Request.
+
+	Only data already held by obj is used, no API calls are made except to load a lazy
+	Server.  A PublicIP whose details were never loaded has no ports or source restrictions.
+
+	>>> [clc.v2.compact.Compact(d) for d in clc.v2.Server("WA1BTDIX01").Disks().disks]
+	[<CompactDisk 0:0>, <CompactDisk 0:1>, <CompactDisk 0:2>]
+
+	"""
+
+	if isinstance(obj,clc.v2.Server):
+		return(CompactServer.From(obj.data,keep_raw,id=obj.id,alias=_Intern(obj.alias)))
+	elif isinstance(obj,clc.v2.Group):
+		return(CompactGroup.From(obj.data,keep_raw,id=obj.id,alias=_Intern(obj.alias)))
+	elif isinstance(obj,clc.v2.Disk):
+		return(CompactDisk.From(obj.data,keep_raw,server_id=obj.parent.server.id))
+	elif isinstance(obj,clc.v2.PublicIP):
+		# Once loaded, data holds Port and SourceRestriction objects in place of the API lists
+		data = obj.__dict__.get('data') or {}
+		record = CompactPublicIP.From({},id=obj.id,server_id=obj.parent.server.id,internal=obj.internal,
+		                              ports=tuple(Compact(port) for port in data.get('ports',())),
+		                              source_restrictions=tuple(r.cidr for r in data.get('source_restrictions',())))
+		if keep_raw and data:  record._raw = data
+		return(record)
+	elif isinstance(obj,clc.v2.public_ip.Port):
+		return(CompactPort.From(obj.ToDict()))
+	elif isinstance(obj,clc.v2.Network):
+		return(CompactNetwork.From(obj.data,keep_raw,id=obj.id,alias=_Intern(obj.alias)))
+	elif isinstance(obj,clc.v2.Request):
+		return(CompactRequest.From(obj.data,keep_raw,id=obj.id,alias=_Intern(obj.alias)))
+
+	raise(clc.CLCException("Cannot compact %s objects" % obj.__class__.__name__))
+
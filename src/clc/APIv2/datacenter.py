@@ -19,11 +19,28 @@ from __future__ import print_function, absolute_import, unicode_literals
 # TODO - init link to billing, statistics, scheduled activities
 # TODO - accounts link?
 
-import re
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 class Datacenter(object):  # pylint: disable=too-many-instance-attributes
 
+	_capability_cache = None
+	_Key = AttributeResolver()
+
+
+	@staticmethod
+	def SetCapabilityCache(cache):
+		"""Set the CapabilityCache shared by all Datacenter objects.  None (the default) disables it.
+
+		Capabilities back Templates(), Networks() and BareMetalCapabilities() so
+		with a cache set new processes don't refetch them.
+
+		>>> clc.v2.Datacenter.SetCapabilityCache(clc.v2.CapabilityCache())
+
+		"""
+		Datacenter._capability_cache = cache
+
+
 	@staticmethod
 	def Datacenters(alias=None, session=None):
 		"""Return all cloud locations available to the calling alias.
@@ -92,6 +109,25 @@ class Datacenter(object):  # pylint: disable=too-many-instance-attributes
 		return(clc.v2.Group(id=self.root_group_id,alias=self.alias,session=self.session))
 
 
+	def Walk(self,workers=None,max_depth=None):
+		"""Iterate over every group in this datacenter breadth-first from the root group.
+
+		See Group.Walk for details.
+
+		>>> for depth,group,servers in clc.v2.Datacenter().Walk(workers=16):
+		...     servers.PowerOn()
+
+		"""
+
+		return(self.RootGroup().Walk(workers=workers,max_depth=max_depth))
+
+
+	def Fleet(self,workers=None):
+		"""Returns a clc.v2.FleetTable of every server in this datacenter.  See Group.Fleet."""
+
+		return(self.RootGroup().Fleet(workers=workers))
+
+
 	def Groups(self):
 		"""Returns groups object rooted at this datacenter.
 
@@ -104,12 +140,26 @@ class Datacenter(object):  # pylint: disable=too-many-instance-attributes
 		return(self.RootGroup().Subgroups())
 
 
+	def _Capabilities(self,kind,cached=True):
+		"""Fetch a capabilities document, through the persistent capability cache if one is set."""
+
+		fetch = lambda: clc.v2.API.Call('GET','datacenters/%s/%s/%s' % (self.alias,self.location,kind),session=self.session)
+
+		cache = Datacenter._capability_cache
+		if cache is None:  return(fetch())
+
+		key = '%s/%s/%s' % (self.alias.upper(),self.location.upper(),kind)
+		if cached:  return(cache.Get(key,fetch))
+
+		value = fetch()
+		cache.Write(key,value)
+
+		return(value)
+
+
 	def _DeploymentCapabilities(self,cached=True):
 		if not self.deployment_capabilities or not cached:
-			self.deployment_capabilities = clc.v2.API.Call(
-				'GET',
-				'datacenters/%s/%s/deploymentCapabilities' % (self.alias,self.location),
-				session=self.session)
+			self.deployment_capabilities = self._Capabilities('deploymentCapabilities',cached)
 
 		return(self.deployment_capabilities)
 
@@ -117,10 +167,7 @@ class Datacenter(object):  # pylint: disable=too-many-instance-attributes
 	def BareMetalCapabilities(self,cached=True):
 		if self._DeploymentCapabilities()['supportsBareMetalServers']:
 			if not self.baremetal_capabilities or not cached:
-				self.baremetal_capabilities = clc.v2.API.Call(
-					'GET',
-					'datacenters/%s/%s/bareMetalCapabilities' % (self.alias,self.location),
-					session=self.session)
+				self.baremetal_capabilities = self._Capabilities('bareMetalCapabilities',cached)
 
 		return(self.baremetal_capabilities)
 
@@ -137,7 +184,7 @@ class Datacenter(object):  # pylint: disable=too-many-instance-attributes
 
 
 	def __getattr__(self,var):
-		key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+		key = Datacenter._Key(var)
 
 		if key in ("supportsPremiumStorage","supportsSharedLoadBalancer"):  return(self._DeploymentCapabilities()[key])
 		else:  raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,var)))
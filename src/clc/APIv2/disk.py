@@ -3,6 +3,14 @@ Disk related functions.
 
 Disks object variables:
 
+	disks.disks - list of Disk objects
+
+DiskPlan object variables:
+
+	plan.disks - Disks object the plan applies to
+	plan.disk_set - planned disk set as sent to the API
+	plan.requests - Requests queued by the last commit
+
 Disk object variables:
 
 	disk.id
@@ -13,10 +21,9 @@ Disk object variables:
 from __future__ import print_function, absolute_import, unicode_literals
 
 
-import re
-import time
 import json
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 
 class Disks(object):
@@ -48,13 +55,34 @@ class Disks(object):
 
 		results = []
 		for disk in self.disks:
-			if disk.id.lower().find(key.lower()) != -1:  results.append(disk)
+			if disk.id is not None and disk.id.lower().find(key.lower()) != -1:  results.append(disk)
 			# TODO - search in list to match partial mount points
 			elif key.lower() in disk.partition_paths:  results.append(disk)
 
 		return(results)
 
 
+	def Refresh(self):
+		"""Reload the server's disks, replacing any added disks whose id is not yet known.
+
+		Raises clc.CLCException, leaving the disks unchanged, if the server doesn't report
+		the added disks yet.  Wait for the requests which added them to complete first.
+
+		>>> clc.v2.Server("WA1BTDIX01").Disks().Refresh()
+
+		"""
+
+		known = set(o.id for o in self.disks if o.id is not None)
+		pending = len([o for o in self.disks if o.id is None])
+
+		self.server.Refresh()
+		disks_lst = self.server.data['details']['disks']
+		if len([o for o in disks_lst if o['id'] not in known]) < pending:
+			raise(clc.CLCException("Server %s does not report the %s added disk(s) yet, wait for the add to complete" % (self.server.id,pending)))
+
+		self.disks = [Disk(id=disk['id'],parent=self,disk_obj=disk,session=self.session) for disk in disks_lst]
+
+
 	def Add(self,size,path=None,type="partitioned"):
 		"""Add new disk.
 
@@ -70,26 +98,184 @@ class Disks(object):
 
 		"""
 
+		self.size = size
+		return(self.Plan().Add(size,path,type).Commit())
+
+
+	def Plan(self):
+		"""Returns a DiskPlan staging disk changes to send in a single API call.
+
+		Used as a context manager the plan is committed when the block exits and
+		discarded if it raises.  Disks added by an earlier commit have no id until the
+		server is reloaded, so the disks are refreshed first in that case.  Wait for the
+		earlier requests to complete before planning further changes.
+
+		>>> with clc.v2.Server("WA1BTDIX01").Disks().Plan() as plan:
+		...     plan.Add(100,"/data1").Add(100,"/data2").Grow("/",60)
+		>>> plan.requests.WaitUntilComplete()
+		0
+
+		"""
+
+		return(DiskPlan(self))
+
+
+
+class DiskPlan(object):
+
+	# Local validation limits in GB.  The API enforces the authoritative limits
+	MAX_DISK_SIZE = 1024
+	MAX_TOTAL_SIZE = 4096
+
+
+	@staticmethod
+	def CommitAll(plans,workers=None):
+		"""Commit plans for many servers concurrently, one API call per server.
+
+		Plans are committed by up to workers threads (default clc.v2.parallel.WORKERS).
+		Returns the combined Requests, or None if no plan had changes.  The first failure
+		is raised once every commit has finished.
+
+		>>> plans = clc.v2.Servers(["WA1BTDIX01","WA1BTDIX02"]).DiskPlans()
+		>>> for plan in plans:  plan.Add(100,"/data")
+		>>> clc.v2.DiskPlan.CommitAll(plans).WaitUntilComplete()
+		0
+
+		"""
+
+		results = clc.v2.parallel.Map(lambda plan: plan.Commit(),plans,workers)
+
+		errors = [e for _,e in results if e is not None]
+		if errors:  raise(errors[0])
+
+		requests = [r for r,_ in results if r is not None]
+		if requests:  return(clc.v2.RequestSet(requests))
+
+
+	def __init__(self,disks):
+		"""Create DiskPlan object.  Use Disks.Plan() to get one."""
+
+		self.disks = disks
+		self.disk_set = [{'diskId': o.id, 'sizeGB': o.size} for o in disks.disks]
+		self.added = []
+		self.requests = None
+		self.changed = False
+
+		self._Sync()
+
+
+	def _Sync(self):
+		# Disks added by an earlier commit are placeholders without an id.  The disk set replaces
+		# every disk, so reload them rather than send placeholder ids or leave the new disks out
+		if self.changed or not [o for o in self.disks.disks if o.id is None]:  return
+
+		self.disks.Refresh()
+		self.disk_set = [{'diskId': o.id, 'sizeGB': o.size} for o in self.disks.disks]
+
+
+	def _Find(self,key):
+		disk = self.disks.Get(key)
+		if disk is None:  raise(clc.CLCException("Disk %s not found" % key))
+
+		for entry in self.disk_set:
+			if entry.get('diskId') == disk.id:  return(entry)
+
+		raise(clc.CLCException("Disk %s is deleted in this plan" % key))
+
+
+	def _Validate(self,disk_set):
+		for entry in disk_set:
+			if entry['sizeGB']>DiskPlan.MAX_DISK_SIZE:  raise(clc.CLCException("Cannot grow disk beyond %sGB" % DiskPlan.MAX_DISK_SIZE))
+		if sum(entry['sizeGB'] for entry in disk_set)>DiskPlan.MAX_TOTAL_SIZE:
+			raise(clc.CLCException("Total disk size cannot exceed %sGB" % DiskPlan.MAX_TOTAL_SIZE))
+
+
+	def Add(self,size,path=None,type="partitioned"):
+		"""Stage a new disk.  Returns the plan so calls can be chained."""
+
 		if type=="partitioned" and not path:  raise(clc.CLCException("Must specify path to mount new disk"))
-		# TODO - Raise exception if too many disks
-		# TODO - Raise exception if too much total size (4TB standard, 1TB HS)
+		self._Sync()
 
-		disk_set = [{'diskId': o.id, 'sizeGB': o.size} for o in self.disks]
-		disk_set.append({'sizeGB': size, 'type': type, 'path': path})
-		self.disks.append(Disk(id=int(time.time()),parent=self,disk_obj={'sizeGB': size,'partitionPaths': [path]},session=self.session))
+		entry = {'sizeGB': size, 'type': type, 'path': path}
+		self._Validate(self.disk_set+[entry])
 
-		self.size = size
-		self.server.dirty = True
-		return(clc.v2.Requests(clc.v2.API.Call('PATCH','servers/%s/%s' % (self.server.alias,self.server.id),
-		                                       json.dumps([{"op": "set", "member": "disks", "value": disk_set}]),
-											   session=self.session),
-							   alias=self.server.alias,
-							   session=self.session))
+		self.disk_set.append(entry)
+		self.added.append(entry)
+		self.changed = True
+
+		return(self)
+
+
+	def Grow(self,key,size):
+		"""Stage growing the disk with id or mount point key.  Returns the plan."""
+
+		self._Sync()
+		entry = self._Find(key)
+		if size<=entry['sizeGB']:  raise(clc.CLCException("New size must exceed current disk size"))
+		self._Validate([dict(o,sizeGB=size) if o is entry else o for o in self.disk_set])
+
+		entry['sizeGB'] = size
+		self.changed = True
+
+		return(self)
+
+
+	def Delete(self,key):
+		"""Stage deleting the disk with id or mount point key.  Returns the plan."""
+
+		self._Sync()
+		entry = self._Find(key)
+		self.disk_set = [o for o in self.disk_set if o is not entry]
+		self.changed = True
+
+		return(self)
+
+
+	def Commit(self):
+		"""Send the planned disk set in one PATCH and update the local Disks to match.
+
+		Returns the queued Requests, or None if nothing was staged.
+
+		"""
+
+		if not self.changed:  return(self.requests)
+
+		server = self.disks.server
+		server.dirty = True
+		self.requests = clc.v2.Requests(clc.v2.API.Call('PATCH','servers/%s/%s' % (server.alias,server.id),
+		                                                json.dumps([{"op": "set", "member": "disks", "value": self.disk_set}]),
+		                                                session=self.disks.session),
+		                                alias=server.alias,
+		                                session=self.disks.session)
+
+		# Mirror the submitted plan locally until the server is refreshed.  Added disks get no id
+		# since the API assigns it, they are reloaded before the next plan is built
+		sizes = dict((o['diskId'],o['sizeGB']) for o in self.disk_set if 'diskId' in o)
+		self.disks.disks = [o for o in self.disks.disks if o.id in sizes]
+		for disk in self.disks.disks:  disk.size = sizes[disk.id]
+		for entry in self.added:
+			self.disks.disks.append(Disk(id=None,parent=self.disks,disk_obj={'sizeGB': entry['sizeGB'],'partitionPaths': [entry['path']]},session=self.disks.session))
+
+		self.disk_set = [{'diskId': o.id, 'sizeGB': o.size} for o in self.disks.disks if o.id is not None]
+		self.added = []
+		self.changed = False
+
+		return(self.requests)
+
+
+	def __enter__(self):
+		return(self)
+
+
+	def __exit__(self,exc_type,exc_value,traceback):
+		if exc_type is None:  self.Commit()
 
 
 
 class Disk(object):
 
+	_Key = AttributeResolver()
+
 	def __init__(self,id,parent,disk_obj=None,session=None):
 		"""Create Disk object."""
 
@@ -110,20 +296,7 @@ class Disk(object):
 
 		"""
 
-		if size>1024:  raise(clc.CLCException("Cannot grow disk beyond 1024GB"))
-		if size<=self.size:  raise(clc.CLCException("New size must exceed current disk size"))
-		# TODO - Raise exception if too much total size (4TB standard, 1TB HS)
-
-
-		disk_set = [{'diskId': o.id, 'sizeGB': o.size} for o in self.parent.disks if o!=self]
-		self.size = size
-		disk_set.append({'diskId': self.id, 'sizeGB': self.size})
-		self.parent.server.dirty = True
-		return(clc.v2.Requests(clc.v2.API.Call('PATCH','servers/%s/%s' % (self.parent.server.alias,self.parent.server.id),
-		                                       json.dumps([{"op": "set", "member": "disks", "value": disk_set}]),
-											   session=self.session),
-							   alias=self.parent.server.alias,
-							   session=self.session))
+		return(self.parent.Plan().Grow(self.id,size).Commit())
 
 
 	def Delete(self):
@@ -136,18 +309,11 @@ class Disk(object):
 
 		"""
 
-		disk_set = [{'diskId': o.id, 'sizeGB': o.size} for o in self.parent.disks if o!=self]
-		self.parent.disks = [o for o in self.parent.disks if o!=self]
-		self.parent.server.dirty = True
-		return(clc.v2.Requests(clc.v2.API.Call('PATCH','servers/%s/%s' % (self.parent.server.alias,self.parent.server.id),
-		                                       json.dumps([{"op": "set", "member": "disks", "value": disk_set}]),
-											   session=self.session),
-							   alias=self.parent.server.alias,
-							   session=self.session))
+		return(self.parent.Plan().Delete(self.id).Commit())
 
 
 	def __getattr__(self,var):
-		key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+		key = Disk._Key(var)
 
 		if key in self.data:  return(self.data[key])
 		else:  raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,key)))
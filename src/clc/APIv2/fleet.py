@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar table of server capacity for reporting.
+
+A FleetTable holds one column per field rather than one object per server, so filters
+and aggregates over an entire fleet are single array operations instead of a Python
+loop calling __getattr__ on every server.  String columns (power state, status, location,
+group) are dictionary encoded as integer codes into a list of distinct values.
+
+Columns are NumPy arrays when NumPy is installed (pip install clc-sdk[fleet]).  Without it
+the same API runs on array.array columns in pure Python, which is correct but slower.
+
+Columns:
+
+	id - server id
+	cpu, memory, storage - cpu count, memory GB, storage GB
+	power_state, status, location, group_id - dictionary encoded strings
+	created_date, modified_date - POSIX time, nan if unknown
+
+>>> fleet = clc.v2.Group("wa1-4416").Fleet()
+>>> fleet.Where(power_state='started',cpu__ge=4).Sum('memory')
+1024.0
+>>> fleet.GroupBy('location')
+{u'WA1': {'count': 1998, 'cpu': 4102.0, 'memory': 8210.0, 'storage': 61500.0}}
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import array
+import operator
+import clc
+from clc.APIv2.compact import CompactServer
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+_NAN = float('nan')
+
+_OPERATORS = {
+	'eq': operator.eq,
+	'ne': operator.ne,
+	'gt': operator.gt,
+	'ge': operator.ge,
+	'lt': operator.lt,
+	'le': operator.le,
+}
+
+
+def _Floats(values):
+	if numpy is not None:  return(numpy.array(values,dtype=numpy.float64))
+	else:  return(array.array('d',values))
+
+
+def _Objects(values):
+	if numpy is not None:  return(numpy.array(values,dtype=object))
+	else:  return(list(values))
+
+
+def _Codes(values):
+	if numpy is not None:  return(numpy.array(values,dtype=numpy.int32))
+	else:  return(array.array('i',values))
+
+
+def _Take(column,mask):
+	"""Return the rows of column where mask is true."""
+
+	if numpy is not None:  return(column[mask])
+	elif isinstance(column,array.array):  return(array.array(column.typecode,[v for v,m in zip(column,mask) if m]))
+	else:  return([v for v,m in zip(column,mask) if m])
+
+
+def _Number(value):
+	if value is None:  return(_NAN)
+	return(float(value))
+
+
+def _Timestamp(value):
+	# Loaded Server objects hold POSIX seconds, raw API payloads ISO 8601 Zulu strings
+	try:
+		return(_Number(value))
+	except ValueError:
+		return(float(clc.v2.time_utils.ZuluTSToSeconds(value)))
+
+
+
+class FleetTable(object):
+
+	NUMERIC = ('cpu','memory','storage','created_date','modified_date')
+	CATEGORICAL = ('power_state','status','location','group_id')
+
+
+	@staticmethod
+	def _Row(server):
+		"""Extract (id, numeric values, categorical values) from a Server, CompactServer or server API dict."""
+
+		if isinstance(server,dict):  data = server
+		elif isinstance(server,CompactServer):
+			d = server.ToDict()
+			return((d['id'],
+			        [_Timestamp(d.get(name)) if name.endswith('_date') else _Number(d.get(name)) for name in FleetTable.NUMERIC],
+			        [d.get('location_id') if name=='location' else d.get(name) for name in FleetTable.CATEGORICAL]))
+		else:  data = server.data
+
+		details = data.get('details') or {}
+		change_info = data.get('changeInfo') or {}
+		memory = details.get('memoryGB')
+		if memory is None and details.get('memoryMB') is not None:  memory = details['memoryMB'] // 1024
+
+		return((data.get('id',getattr(server,'id',None)),
+		        [_Number(details.get('cpu')),_Number(memory),_Number(details.get('storageGB')),
+		         _Timestamp(change_info.get('createdDate')),_Timestamp(change_info.get('modifiedDate'))],
+		        [details.get('powerState'),data.get('status'),data.get('locationId'),data.get('groupId')]))
+
+
+	@staticmethod
+	def FromServers(servers):
+		"""Build a FleetTable from Server objects, CompactServer records or server API dicts.
+
+		Servers must already be loaded.  Timestamps may be POSIX seconds, as Server
+		objects hold them, or the ISO 8601 strings found in raw API payloads.
+
+		>>> clc.v2.FleetTable.FromServers(clc.v2.Servers(["WA1BTDIX01","WA1BTDIX02"]).Servers())
+		<clc.APIv2.fleet.FleetTable object at 0x10c28fe50>
+
+		"""
+
+		ids = []
+		numeric = [[] for _ in FleetTable.NUMERIC]
+		codes = [[] for _ in FleetTable.CATEGORICAL]
+		categories = [[] for _ in FleetTable.CATEGORICAL]
+		lookup = [{} for _ in FleetTable.CATEGORICAL]
+
+		for server in servers:
+			id,values,strings = FleetTable._Row(server)
+			ids.append(id)
+			for column,value in zip(numeric,values):  column.append(value)
+			for i,value in enumerate(strings):
+				if value not in lookup[i]:
+					lookup[i][value] = len(categories[i])
+					categories[i].append(value)
+				codes[i].append(lookup[i][value])
+
+		columns = dict(zip(FleetTable.NUMERIC,[_Floats(c) for c in numeric]))
+		columns.update(zip(FleetTable.CATEGORICAL,[_Codes(c) for c in codes]))
+
+		return(FleetTable(_Objects(ids),columns,dict(zip(FleetTable.CATEGORICAL,categories))))
+
+
+	def __init__(self,ids,columns,categories):
+		"""Create FleetTable object.  Use FleetTable.FromServers or a Fleet() method to build one."""
+
+		self.ids = ids
+		self.columns = columns
+		self.categories = categories
+
+
+	def __len__(self):
+		return(len(self.ids))
+
+
+	def __getitem__(self,name):
+		"""Return a column.  Dictionary encoded columns are decoded to a list of values."""
+
+		if name == 'id':  return(self.ids)
+		elif name in self.categories:  return([self.categories[name][code] for code in self.columns[name]])
+		elif name in self.columns:  return(self.columns[name])
+		else:  raise(clc.CLCException("Unknown column %s" % name))
+
+
+	def _Mask(self,name,op,value):
+		if name in self.categories:
+			# Compare integer codes rather than strings.  Values not in the table match nothing
+			lookup = dict((v,i) for i,v in enumerate(self.categories[name]))
+			if op == 'in':  value = [lookup[v] for v in value if v in lookup]
+			elif op in ('eq','ne'):  value = lookup.get(value,-1)
+			else:  raise(clc.CLCException("Only eq, ne and in apply to column %s" % name))
+		elif name == 'id':
+			column = self.ids
+			if op == 'in':  return([v in value for v in column])
+			return([_OPERATORS[op](v,value) for v in column])
+		elif name not in self.columns:  raise(clc.CLCException("Unknown column %s" % name))
+
+		column = self.columns[name]
+
+		if op == 'in':
+			if numpy is not None:  return(numpy.isin(column,list(value)))
+			value = set(value)
+			return([v in value for v in column])
+		elif op not in _OPERATORS:  raise(clc.CLCException("Unknown operator %s" % op))
+		elif numpy is not None:  return(_OPERATORS[op](column,value))
+		else:  return([_OPERATORS[op](v,value) for v in column])
+
+
+	def Where(self,**criteria):
+		"""Return a FleetTable of the rows matching every criterion.
+
+		Criteria are column=value or column__op=value where op is one of eq, ne, gt, ge,
+		lt, le or in.  Comparing with nan is always false, so rows with an unknown value
+		never match an ordering criterion.
+
+		>>> fleet.Where(location__in=('WA1','CA3'),power_state='started',memory__gt=8)
+
+		"""
+
+		mask = None
+		for key,value in criteria.items():
+			name,_,op = key.partition('__')
+			m = self._Mask(name,op or 'eq',value)
+			if mask is None:  mask = m
+			elif numpy is not None:  mask = numpy.logical_and(mask,m)
+			else:  mask = [a and b for a,b in zip(mask,m)]
+
+		if mask is None:  return(self)
+		if numpy is not None:  mask = numpy.asarray(mask,dtype=bool)
+
+		return(FleetTable(_Take(self.ids,mask),
+		                  dict((name,_Take(column,mask)) for name,column in self.columns.items()),
+		                  self.categories))
+
+
+	def Sum(self,name):
+		"""Return the total of a numeric column, skipping unknown values."""
+
+		if name not in FleetTable.NUMERIC:  raise(clc.CLCException("Cannot sum column %s" % name))
+
+		if numpy is not None:  return(float(numpy.nansum(self.columns[name])))
+		else:  return(float(sum(v for v in self.columns[name] if v == v)))
+
+
+	def GroupBy(self,by,columns=('cpu','memory','storage')):
+		"""Return dict of each value of a dictionary encoded column to its row count and column totals.
+
+		>>> fleet.GroupBy('power_state',columns=('memory',))
+		{u'started': {'count': 1870, 'memory': 7800.0}, u'stopped': {'count': 128, 'memory': 410.0}}
+
+		"""
+
+		if by not in self.categories:  raise(clc.CLCException("Cannot group by column %s" % by))
+		for name in columns:
+			if name not in FleetTable.NUMERIC:  raise(clc.CLCException("Cannot sum column %s" % name))
+
+		categories = self.categories[by]
+		codes = self.columns[by]
+
+		if numpy is not None:
+			totals = {'count': numpy.bincount(codes,minlength=len(categories))}
+			for name in columns:
+				totals[name] = numpy.bincount(codes,weights=numpy.nan_to_num(self.columns[name]),minlength=len(categories))
+		else:
+			totals = dict((name,[0.0]*len(categories)) for name in columns)
+			totals['count'] = [0]*len(categories)
+			for row,code in enumerate(codes):
+				totals['count'][code] += 1
+				for name in columns:
+					value = self.columns[name][row]
+					if value == value:  totals[name][code] += value
+
+		groups = {}
+		for code,value in enumerate(categories):
+			if not totals['count'][code]:  continue
+			groups[value] = dict((name,float(total[code])) for name,total in totals.items())
+			groups[value]['count'] = int(totals['count'][code])
+
+		return(groups)
+
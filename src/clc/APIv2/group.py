@@ -46,8 +46,10 @@ from __future__ import print_function, absolute_import, unicode_literals
 # TODO - Update Get in templates, etc. to raise error on failure
 
 
-import re
+import collections
+import concurrent.futures
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 
 class Groups(object):
@@ -101,6 +103,8 @@ class Groups(object):
 
 class Group(object):
 
+	_Key = AttributeResolver()
+
 	@staticmethod
 	def GetAll(root_group_id,alias=None,session=None):
 		"""Gets a list of groups within a given account.
@@ -141,7 +145,7 @@ class Group(object):
 
 
 	def __getattr__(self,var):
-		key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+		key = Group._Key(var)
 
 		if key in self.data:  return(self.data[key])
 		elif key in self.data['changeInfo']:  return(self.data['changeInfo'][key])
@@ -192,6 +196,71 @@ class Group(object):
 		return(Groups(alias=self.alias,groups_lst=self.data['groups'],session=self.session))
 
 
+	def Walk(self,workers=None,max_depth=None):
+		"""Iterate over this group and every descendant group breadth-first.
+
+		Yields (depth,group,servers) tuples where depth is 0 for this group and servers
+		is the group's Servers object.  Descendant groups are fetched by up to workers
+		threads (default clc.v2.parallel.WORKERS) and each is yielded as soon as it
+		arrives, so order within a level is not fixed.  max_depth limits how far below
+		this group the walk descends.
+
+		>>> for depth,group,servers in clc.v2.Group("wa1-4416").Walk():
+		...     print("  "*depth,group,len(servers.servers_lst))
+		 WA1 Hardware 0
+		   Default Group 12
+		   Archive 3
+		     Ansible Managed Servers 2
+
+		"""
+
+		if not workers:  workers = clc.v2.parallel.WORKERS
+
+		pending = collections.deque()
+		if max_depth is None or max_depth > 0:  pending.extend([(1,obj['id']) for obj in self.data['groups']])
+
+		yield((0,self,self.Servers()))
+
+		running = {}
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+		try:
+			while pending or running:
+				while pending and len(running) < workers:
+					depth,id = pending.popleft()
+					running[executor.submit(Group,id=id,alias=self.alias,session=self.session)] = depth
+
+				done,_ = concurrent.futures.wait(running,return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					depth = running.pop(future)
+					group = future.result()
+					if max_depth is None or depth < max_depth:
+						pending.extend([(depth+1,obj['id']) for obj in group.data['groups']])
+
+					yield((depth,group,group.Servers()))
+		finally:
+			# Caller may stop iterating early or a fetch may fail.  Don't wait on outstanding work
+			for future in running:  future.cancel()
+			executor.shutdown(wait=False)
+
+
+	def Fleet(self,workers=None,max_depth=None):
+		"""Returns a clc.v2.FleetTable of every server in this group and its descendants.
+
+		Groups are crawled as in Walk and server details fetched by up to workers threads.
+		Servers which cannot be loaded are left out.
+
+		>>> clc.v2.Group("wa1-4416").Fleet().Where(power_state='stopped').GroupBy('group_id')
+		{u'wa1-4417': {'count': 3, 'cpu': 6.0, 'memory': 12.0, 'storage': 96.0}}
+
+		"""
+
+		server_ids = []
+		for depth,group,servers in self.Walk(workers=workers,max_depth=max_depth):
+			server_ids += servers.servers_lst
+
+		return(clc.v2.Servers(server_ids,alias=self.alias,session=self.session).Fleet(workers=workers))
+
+
 	def HorizontalAutoscale(self):
 		group_policy = clc.v2.API.Call(
 			'GET',
@@ -295,9 +364,11 @@ class Group(object):
 			session=self.session))
 
 
-	def Account(self):
+	def Account(self,cached=True):
 		"""Return account object.
 
+		The object is shared through the session's IdentityMap unless cached is False.
+
 		>>> clc.v2.Group(alias="BTDI",id="wa1-837").Account()
 		<clc.APIv2.account.Account instance at 0x108789878>
 		>>> print _
@@ -305,7 +376,8 @@ class Group(object):
 
 		"""
 
-		return(clc.v2.Account(alias=self.alias,session=self.session))
+		return(clc.v2.IdentityMap.For(self.session).Resolve(clc.v2.Account,self.alias,self.alias,
+		                                                     lambda: clc.v2.Account(alias=self.alias,session=self.session),cached))
 
 
 	def __str__(self):
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Identity map of loaded API objects.
+
+Navigation methods such as Server.Group(), Server.Account() and Request.Server() resolve
+through the identity map of their session, so every path to a given account, group,
+datacenter or server returns the same object and it is fetched once.  Objects are held
+by weak reference and drop out of the map once nothing else uses them.
+
+>>> clc.v2.Server("WA1BTDIX01").Group() is clc.v2.Server("WA1BTDIX02").Group()
+True
+>>> clc.v2.IdentityMap.For().Refresh(clc.v2.Group)
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import weakref
+import threading
+
+
+class IdentityMap(object):
+
+	@staticmethod
+	def For(session=None):
+		"""Return the identity map for a session, or the global map when session is None."""
+
+		if session is None:  return(_GLOBAL)
+
+		if 'identity_map' not in session:  session.setdefault('identity_map',IdentityMap())
+		return(session['identity_map'])
+
+
+	def __init__(self):
+		self.objects = weakref.WeakValueDictionary()
+		self._lock = threading.Lock()
+
+
+	@staticmethod
+	def Key(cls,alias,id):
+		return((cls.__name__,("%s" % alias).upper(),("%s" % id).upper()))
+
+
+	def Get(self,cls,alias,id,create):
+		"""Return the mapped object of type cls, calling create() to build it if not mapped.
+
+		create runs outside the lock so unrelated lookups are not held up by its API call.
+		If two threads race to create the same object the first one stored wins.
+
+		"""
+
+		key = IdentityMap.Key(cls,alias,id)
+
+		with self._lock:
+			obj = self.objects.get(key)
+		if obj is not None:  return(obj)
+
+		obj = create()
+		with self._lock:
+			return(self.objects.setdefault(key,obj))
+
+
+	def Resolve(self,cls,alias,id,create,cached=True):
+		"""Return the mapped object as Get does.  If cached is False always create a new
+		object and map it in place of any existing one.
+
+		"""
+
+		if cached:  return(self.Get(cls,alias,id,create))
+
+		obj = create()
+		with self._lock:
+			self.objects[IdentityMap.Key(cls,alias,id)] = obj
+
+		return(obj)
+
+
+	def _Matches(self,cls=None,alias=None,id=None):
+		with self._lock:
+			items = list(self.objects.items())
+
+		for key,obj in items:
+			if cls is not None and key[0] != cls.__name__:  continue
+			if alias is not None and key[1] != ("%s" % alias).upper():  continue
+			if id is not None and key[2] != ("%s" % id).upper():  continue
+			yield((key,obj))
+
+
+	def Invalidate(self,cls=None,alias=None,id=None):
+		"""Forget mapped objects matching every given criterion so the next lookup rebuilds them.
+
+		>>> clc.v2.IdentityMap.For().Invalidate(clc.v2.Server,id="WA1BTDIX01")
+
+		"""
+
+		for key,obj in list(self._Matches(cls,alias,id)):
+			with self._lock:
+				if self.objects.get(key) is obj:  del self.objects[key]
+
+
+	def Refresh(self,cls=None,alias=None,id=None):
+		"""Reload mapped objects matching every given criterion in place.  Objects without Refresh() are invalidated."""
+
+		for key,obj in list(self._Matches(cls,alias,id)):
+			if hasattr(obj.__class__,'Refresh'):  obj.Refresh()
+			else:  self.Invalidate(obj.__class__,key[1],key[2])
+
+
+	def Clear(self):
+		with self._lock:
+			self.objects.clear()
+
+
+_GLOBAL = IdentityMap()
+
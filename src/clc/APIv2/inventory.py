@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Account wide inventory.
+
+Builds an in-memory, indexed model of every datacenter, group, server, disk, public IP
+and network in an account.  Datacenters are crawled concurrently and each one fans out
+its group and server fetches, so a snapshot costs roughly as long as the largest
+datacenter rather than the sum of all of them.
+
+Inventory object variables:
+
+	inventory.alias
+	inventory.timestamp - POSIX time the snapshot was started
+	inventory.datacenters - dict of location to Datacenter
+	inventory.groups - dict of group id to Group
+	inventory.servers - dict of server id to Server
+	inventory.disks - dict of (server id,disk id) to Disk
+	inventory.public_ips - dict of public IP address to PublicIP
+	inventory.networks - dict of network id to Network
+	inventory.errors - dict of location, group id or server id to the exception raised loading it
+
+Inventory indexes:
+
+	inventory.datacenter_groups - dict of location to list of group ids
+	inventory.group_datacenter - dict of group id to location
+	inventory.group_servers - dict of group id to list of server ids
+	inventory.server_group - dict of server id to group id
+	inventory.group_parent - dict of group id to parent group id (None for root groups)
+
+With compact=True groups, servers, disks, public IPs and networks are held as the
+slotted records from clc.v2.compact rather than full model objects, cutting memory use
+for large accounts.  Each datacenter's full objects are dropped once it is merged.
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import time
+import clc
+from clc.APIv2.compact import Compact
+
+
+class Inventory(object):
+
+	@staticmethod
+	def Snapshot(alias=None,locations=None,workers=None,session=None,compact=False,keep_raw=False):
+		"""Return an Inventory of every datacenter available to the account.
+
+		Each datacenter is crawled in its own thread.  Within a datacenter up to workers
+		threads (default clc.v2.parallel.WORKERS) walk the group tree and fetch server
+		details.  locations optionally restricts the snapshot to a list of datacenters.
+
+		compact stores compact records in place of model objects, keep_raw also retains
+		each record's API payload.
+
+		Failures are recorded in inventory.errors rather than raised so one unreachable
+		datacenter or deleted server does not discard the rest of the snapshot.
+
+		>>> inv = clc.v2.Inventory.Snapshot()
+		>>> len(inv.servers), len(inv.groups), inv.errors
+		(2114, 187, {})
+		>>> [str(inv.servers[id]) for id in inv.group_servers[inv.Group("Default Group","WA1").id]]
+		['WA1BTDIX01', 'WA1BTDIX02']
+
+		"""
+
+		inventory = Inventory(alias=alias,session=session,compact=compact,keep_raw=keep_raw)
+
+		if not locations:
+			locations = [r['id'] for r in clc.v2.API.Call('GET','datacenters/%s' % inventory.alias,{},session=session)]
+
+		results = clc.v2.parallel.Map(lambda location: inventory._Crawl(location,workers),locations,len(locations))
+
+		for location,(crawl,e) in zip(locations,results):
+			if e is not None:  inventory.errors[location] = e
+			else:  inventory._Merge(*crawl)
+
+		return(inventory)
+
+
+	def __init__(self,alias=None,session=None,compact=False,keep_raw=False):
+		"""Create an empty Inventory object.  Use Inventory.Snapshot to populate one."""
+
+		self.session = session
+		self.compact = compact
+		self.keep_raw = keep_raw
+		if alias:  self.alias = alias
+		else:  self.alias = clc.v2.Account.GetAlias(session=self.session)
+
+		self.timestamp = time.time()
+		self.datacenters = {}
+		self.groups = {}
+		self.servers = {}
+		self.disks = {}
+		self.public_ips = {}
+		self.networks = {}
+		self.errors = {}
+
+		self.datacenter_groups = {}
+		self.group_datacenter = {}
+		self.group_servers = {}
+		self.server_group = {}
+		self.group_parent = {}
+
+
+	def _Crawl(self,location,workers):
+		"""Load one datacenter.  Runs in a worker thread and touches no shared state."""
+
+		datacenter = clc.v2.Datacenter(location=location,alias=self.alias,session=self.session)
+
+		groups = []
+		server_ids = []
+		for depth,group,servers in datacenter.Walk(workers=workers):
+			groups.append(group)
+			server_ids += servers.servers_lst
+
+		errors = {}
+		servers = clc.v2.Servers(server_ids,alias=self.alias,session=self.session)
+		loaded = servers.Servers(workers=workers,raise_errors=False)
+		errors.update(servers.errors)
+
+		try:
+			networks = datacenter.Networks(forced_load=True).networks
+		except clc.CLCException as e:
+			networks = []
+			errors[location] = e
+
+		return((datacenter,groups,loaded,networks,errors))
+
+
+	def _Record(self,obj):
+		if self.compact:  return(Compact(obj,self.keep_raw))
+		else:  return(obj)
+
+
+	def _Merge(self,datacenter,groups,servers,networks,errors):
+		"""Add one crawled datacenter to the inventory and its indexes."""
+
+		self.datacenters[datacenter.location] = datacenter
+		self.datacenter_groups[datacenter.location] = []
+		self.errors.update(errors)
+
+		for group in groups:
+			self.groups[group.id] = self._Record(group)
+			self.datacenter_groups[datacenter.location].append(group.id)
+			self.group_datacenter[group.id] = datacenter.location
+			self.group_servers[group.id] = [obj['id'] for obj in group.data['links'] if obj['rel']=='server']
+			self.group_parent.setdefault(group.id,None)
+			for obj in group.data['groups']:  self.group_parent[obj['id']] = group.id
+			for server_id in self.group_servers[group.id]:  self.server_group[server_id] = group.id
+
+		for server in servers:
+			self.servers[server.id] = self._Record(server)
+			for disk in server.Disks().disks:  self.disks[(server.id,disk.id)] = self._Record(disk)
+			for public_ip in server.PublicIPs().public_ips:  self.public_ips[public_ip.id] = self._Record(public_ip)
+
+		for network in networks:
+			self.networks[network.id] = self._Record(network)
+
+
+	def Group(self,key,location=None):
+		"""Return first group whose id or name matches key, optionally within one datacenter.
+
+		>>> clc.v2.Inventory.Snapshot().Group("Default Group","WA1")
+		<clc.APIv2.group.Group object at 0x1065e5250>
+
+		"""
+
+		for id,group in self.groups.items():
+			if location and self.group_datacenter[id].lower() != location.lower():  continue
+			if id.lower() == key.lower() or group.name.lower() == key.lower():  return(group)
+
+		raise(clc.CLCException("Group not found"))	# No Match
+
+
+	def Fleet(self):
+		"""Returns a clc.v2.FleetTable of every server in the inventory.
+
+		>>> clc.v2.Inventory.Snapshot(compact=True).Fleet().GroupBy('location',columns=('cpu',))
+		{u'WA1': {'count': 1998, 'cpu': 4102.0}, u'CA3': {'count': 116, 'cpu': 240.0}}
+
+		"""
+
+		return(clc.v2.FleetTable.FromServers(self.servers.values()))
+
+
+	def DatacenterServers(self,location):
+		"""Return list of Server objects loaded from the given datacenter.
+
+		>>> clc.v2.Inventory.Snapshot().DatacenterServers("WA1")
+		[<clc.APIv2.server.Server object at 0x1065b0d50>, <clc.APIv2.server.Server object at 0x1065b0e50>]
+
+		"""
+
+		return([self.servers[server_id] for group_id in self.datacenter_groups.get(location,[])
+		                                for server_id in self.group_servers[group_id] if server_id in self.servers])
+
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Durable journal of queued operations.
+
+Queued operations otherwise exist only in memory in Request objects, so a process which
+dies while waiting on them loses track of its work.  A Journal records each queued
+operation (id, alias, context and status with timestamps) in a SQLite database as soon
+as it is queued and again every time its status changes.  A new process reattaches
+with Requests.Resume and polls only the operations which had not finished.
+
+>>> clc.v2.Requests.SetJournal(clc.v2.Journal("/var/lib/builds/operations.sqlite"))
+>>> clc.v2.ProvisioningPipeline(...)		# crashes part way through
+
+>>> requests = clc.v2.Requests.Resume(clc.v2.Journal("/var/lib/builds/operations.sqlite"))
+>>> requests.WaitUntilComplete()
+0
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import time
+import sqlite3
+
+
+def _DefaultPath():
+	if os.name == 'nt':  base = os.environ.get('LOCALAPPDATA',os.path.expanduser('~'))
+	else:  base = os.environ.get('XDG_DATA_HOME',os.path.join(os.path.expanduser('~'),'.local','share'))
+
+	return(os.path.join(base,'clc','operations.sqlite'))
+
+
+class Journal(object):
+
+	COMPLETED = ('succeeded','failed','unknown')
+
+	COLUMNS = ('id','alias','context_key','context_val','status','time_created','time_executed','time_completed','time_updated')
+
+
+	def __init__(self,path=None):
+		"""Create Journal object.
+
+		path - SQLite database file, defaults to clc/operations.sqlite in the user data directory
+
+		"""
+
+		self.path = path or _DefaultPath()
+
+		if not os.path.isdir(os.path.dirname(os.path.abspath(self.path))):
+			os.makedirs(os.path.dirname(os.path.abspath(self.path)))
+
+		db = self._Connect()
+		try:
+			with db:
+				db.execute("CREATE TABLE IF NOT EXISTS operations (id TEXT PRIMARY KEY, alias TEXT, context_key TEXT, "
+				           "context_val TEXT, status TEXT, time_created REAL, time_executed REAL, time_completed REAL, "
+				           "time_updated REAL)")
+		finally:
+			db.close()
+
+
+	def _Connect(self):
+		# Status changes are recorded from polling threads and sqlite connections can't cross
+		# threads, so each operation opens its own like CapabilityCache
+		db = sqlite3.connect(self.path,timeout=30)
+		try:
+			db.execute("PRAGMA journal_mode=WAL")
+		except sqlite3.OperationalError:
+			pass
+
+		return(db)
+
+
+	def Record(self,request):
+		"""Write the current state of request, attaching the journal so later status changes are recorded too."""
+
+		request.journal = self
+
+		now = time.time()
+		status = request.data.get('status')
+		if status in Journal.COMPLETED:  time_completed = request.time_completed or now
+		else:  time_completed = request.time_completed
+
+		db = self._Connect()
+		try:
+			with db:
+				db.execute("INSERT OR REPLACE INTO operations (%s) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)" % ', '.join(Journal.COLUMNS),
+				           (request.id,request.alias,request.data.get('context_key'),request.data.get('context_val'),status,
+				            request.time_created,request.time_executed,time_completed,now))
+		finally:
+			db.close()
+
+
+	def Entries(self,pending=None):
+		"""Returns list of dicts, one per journaled operation, oldest first.
+
+		If pending is True only operations not yet completed are returned, if False only completed ones.
+
+		"""
+
+		query = "SELECT %s FROM operations" % ', '.join(Journal.COLUMNS)
+		if pending is True:  query += " WHERE status IS NULL OR status NOT IN (?, ?, ?)"
+		elif pending is False:  query += " WHERE status IN (?, ?, ?)"
+		query += " ORDER BY time_created, id"
+
+		db = self._Connect()
+		try:
+			if pending is None:  rows = db.execute(query).fetchall()
+			else:  rows = db.execute(query,Journal.COMPLETED).fetchall()
+		finally:
+			db.close()
+
+		return([dict(zip(Journal.COLUMNS,row)) for row in rows])
+
+
+	def Purge(self,age=0):
+		"""Remove completed operations which finished more than age seconds ago."""
+
+		db = self._Connect()
+		try:
+			with db:
+				db.execute("DELETE FROM operations WHERE status IN (?, ?, ?) AND time_completed <= ?",
+				           Journal.COMPLETED+(time.time()-age,))
+		finally:
+			db.close()
+
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Attribute name mapping shared by the v2 model classes.
+
+Models expose API fields as snake_case attributes (server.power_state) while the API
+returns camelCase keys (powerState).  Each model class holds an AttributeResolver which
+converts a name once and remembers the result, so repeated attribute access is a single
+dict lookup rather than a regex substitution.
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import re
+
+
+_SNAKE = re.compile("_(.)")
+
+
+def CamelCase(name):
+	"""Convert a snake_case attribute name to the API's camelCase key.
+
+	>>> clc.v2.naming.CamelCase('power_state')
+	'powerState'
+
+	"""
+
+	return(_SNAKE.sub(lambda pat: pat.group(1).upper(),name))
+
+
+class AttributeResolver(object):
+
+	def __init__(self,overrides=None):
+		"""Create AttributeResolver object.
+
+		overrides maps attribute names to keys which don't follow the camelCase rule,
+		e.g. {'memory': 'memoryGB'}.
+
+		"""
+
+		self.keys = dict(overrides or {})
+
+
+	def __call__(self,name):
+		try:
+			return(self.keys[name])
+		except KeyError:
+			# Races only repeat the conversion, both threads store the same value
+			key = self.keys[name] = CamelCase(name)
+			return(key)
+
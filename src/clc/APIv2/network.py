@@ -29,8 +29,8 @@ from __future__ import print_function, absolute_import, unicode_literals
 # TODO - filter NW by alias?
 
 
-import re
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 class Networks(object):
 
@@ -79,6 +79,8 @@ class Networks(object):
 
 class Network(object):
 
+	_Key = AttributeResolver()
+
 	def __init__(self,id,alias=None,network_obj=None,session=None):
 		"""Create Network object."""
 
@@ -169,7 +171,7 @@ class Network(object):
 
 
 	def __getattr__(self,var):
-		key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+		key = Network._Key(var)
 
 		if key in self.data:  return(self.data[key])
 		else:  raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,key)))
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Thread pool helpers used to fan out independent API calls.
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import concurrent.futures
+
+
+# Default number of worker threads for bulk operations
+WORKERS = 8
+
+
+def Map(function,items,workers=None):
+	"""Apply function to every item using up to workers threads.
+
+	Returns a list of (result,exception) tuples in the same order as items.  Exceptions
+	raised by function are captured so one failure does not abandon the other items.
+
+	>>> clc.v2.parallel.Map(lambda id: clc.v2.Server(id),["WA1BTDIX01","WA1BTDIX02"])
+	[(<clc.APIv2.server.Server object at 0x10c28fe50>, None), (None, CLCException('Server does not exist',))]
+
+	"""
+
+	items = list(items)
+	if not workers:  workers = WORKERS
+
+	def _Call(item):
+		try:
+			return((function(item),None))
+		except Exception as e:
+			return((None,e))
+
+	if workers <= 1 or len(items) <= 1:  return([_Call(item) for item in items])
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=min(workers,len(items))) as executor:
+		return(list(executor.map(_Call,items)))
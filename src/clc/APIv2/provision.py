@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent server provisioning.
+
+A ProvisioningPipeline resolves everything the servers it builds have in common once (group
+cpu/memory/network/DNS defaults and the template) and then submits Server.Create calls
+concurrently.  Each build is followed through the queue by the shared Poller and servers
+are yielded as soon as they come up, while new creates are started to keep up to
+max_in_flight builds running.
+
+>>> pipeline = clc.v2.ProvisioningPipeline(name="web",template="UBUNTU-14-64-TEMPLATE",group_id="wa1-4416",max_in_flight=20)
+>>> for index,server,error in pipeline.Run(count=200):
+...     if error:  print("build %s failed: %s" % (index,error))
+...     else:  print(server.id)
+WA1BTDIWEB12
+WA1BTDIWEB07
+...
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import concurrent.futures
+import clc
+
+
+class ProvisioningPipeline(object):
+
+	def __init__(self,template=None,group_id=None,network_id=None,cpu=None,memory=None,alias=None,
+	             max_in_flight=10,workers=None,session=None,**create_args):
+		"""Create ProvisioningPipeline object.
+
+		Accepts the same arguments as Server.Create.  cpu, memory, network_id, template and
+		DNS servers not given are taken from the group defaults.  template may be a template
+		id or part of a template name, it is matched against the datacenter's templates.
+
+		max_in_flight limits how many servers are being created or built at once, workers
+		(default clc.v2.parallel.WORKERS) how many API calls are made at once.
+
+		"""
+
+		self.session = session
+		self.max_in_flight = max_in_flight
+		self.workers = workers or clc.v2.parallel.WORKERS
+
+		if alias:  self.alias = alias
+		else:  self.alias = clc.v2.Account.GetAlias(session=self.session)
+
+		if not group_id:  raise(clc.CLCException("group_id is required"))
+
+		self.create_args = dict(create_args,template=template,group_id=group_id,network_id=network_id,
+		                        cpu=cpu,memory=memory,alias=self.alias,session=self.session)
+		self._Resolve()
+
+
+	def _Resolve(self):
+		"""Fill in defaults from the group and resolve the template, once for every server built."""
+
+		args = self.create_args
+		if args.get('type','standard').lower() == 'baremetal':
+			if not args['network_id'] or not args['template']:  raise(clc.CLCException("network_id and template are required"))
+			return
+
+		group = clc.v2.Group(id=args['group_id'],alias=self.alias,session=self.session)
+
+		for key,default in (('cpu','cpu'),('memory','memoryGB'),('network_id','networkId'),('template','templateName'),
+		                    ('primary_dns','primaryDns'),('secondary_dns','secondaryDns')):
+			if not args.get(key):  args[key] = group.Defaults(default)
+
+		for key in ('cpu','memory','network_id','template'):
+			if not args[key]:  raise(clc.CLCException("No %s given or defined in group defaults" % key))
+
+		templates = clc.v2.Datacenter(location=group.location_id,alias=self.alias,session=self.session).Templates()
+		template = templates.Get(args['template']) or (templates.Search(args['template']) or [None])[0]
+		if template is None:  raise(clc.CLCException("Template %s not found" % args['template']))
+		args['template'] = template.id
+
+
+	def _Create(self,overrides):
+		return(clc.v2.Server.Create(**dict(self.create_args,**overrides)))
+
+
+	def Run(self,count=None,servers=None):
+		"""Build servers, yielding (index,server,error) tuples as each build finishes.
+
+		Either count (default 1) servers are built from the pipeline arguments, or one server for each
+		dict in servers which override pipeline arguments (e.g. name, ip_address).  index is
+		the position of the server being built.  server is a lazy clc.v2.Server, or None if
+		its create or build failed in which case error holds the exception.
+
+		Results arrive in completion order.  Stopping iteration early stops submitting new
+		creates, builds already queued carry on.
+
+		"""
+
+		if servers is None:  servers = [{}]*(count if count is not None else 1)
+
+		pending = list(enumerate(servers))
+		pending.reverse()
+		futures = {}
+		in_flight = 0
+
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+		try:
+			while pending or futures:
+				while pending and in_flight < self.max_in_flight:
+					index,overrides = pending.pop()
+					futures[executor.submit(self._Create,overrides)] = ('create',index)
+					in_flight += 1
+
+				done,_ = concurrent.futures.wait(list(futures),return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					stage,index = futures.pop(future)
+					try:
+						result = future.result()
+					except Exception as e:
+						in_flight -= 1
+						yield((index,None,e))
+						continue
+
+					if stage == 'create':
+						if not result.requests:
+							in_flight -= 1
+							yield((index,None,clc.CLCException("Server create was not queued")))
+						else:
+							# Follow the build with the shared Poller rather than a thread per server
+							futures[result.requests[0].AsFuture()] = ('build',index)
+					elif stage == 'build':
+						futures[executor.submit(result.Server,True)] = ('server',index)
+					else:
+						in_flight -= 1
+						yield((index,result,None))
+		finally:
+			for future in futures:  future.cancel()
+			executor.shutdown(wait=False)
+
@@ -11,6 +11,7 @@ PublicIP object variables:
 	public_ip.public
 	public_ip.internal
 	public_ip.ports - list of port/protocol dicts
+	public_ip.changes - PublicIPChanges edit session the IP belongs to, or None
 
 Port object variables:
 
@@ -31,12 +32,11 @@ from __future__ import print_function, absolute_import, unicode_literals
 # TODO - PublicIPs search by port and source restriction
 # TODO - Access PublicIPs by index - map directly to public_ips.public_ipds list
 # TODO - wait on request and ID/store assigned public IP
-# TODO - optional param to not call PublicIP.Update() with port/src changes so they can be batched
 
 
-import re
 import json
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 
 class PublicIPs(object):
@@ -109,9 +109,24 @@ class PublicIPs(object):
 		                       alias=self.server.alias,session=self.session))
 
 
+	def Edit(self):
+		"""Returns a PublicIPChanges edit session over every public IP of the server.
+
+		See PublicIP.Edit.  Only IPs whose rules changed are updated on commit.
+
+		>>> with clc.v2.Server("WA1BTDIX01").PublicIPs().Edit() as edit:
+		...     for public_ip in edit.public_ips:  public_ip.AddPort(protocol='TCP',port='443')
+
+		"""
+
+		return(PublicIPChanges(self.public_ips))
+
+
 
 class PublicIP(object):
 
+	_Key = AttributeResolver({'source_restrictions': 'source_restrictions'})
+
 	def __init__(self,id,parent,public_ip_obj=None,session=None):
 		"""Create PublicIP object."""
 
@@ -120,6 +135,7 @@ class PublicIP(object):
 		self.parent = parent
 		self.data = None
 		self.session = session
+		self.changes = None
 
 
 	def _Load(self,cached=True):
@@ -160,22 +176,53 @@ class PublicIP(object):
 							   session=self.session))
 
 
+	def _Rules(self):
+		return({'ports': [o.ToDict() for o in self.ports],
+		        'sourceRestrictions': [o.ToDict() for o in self.source_restrictions]})
+
+
+	def _Put(self):
+		return(clc.v2.Requests(clc.v2.API.Call('PUT','servers/%s/%s/publicIPAddresses/%s' % (self.parent.server.alias,self.parent.server.id,self.id),
+						                       json.dumps(self._Rules()),
+											   session=self.session),
+							   alias=self.parent.server.alias,
+							   session=self.session))
+
+
 	def Update(self):
 		"""Commit  current PublicIP definition to cloud.
 
 		Usually called by the class to commit changes to port and source restriction policies.
+		Within an edit session nothing is sent and None is returned, the session commits instead.
 
 		>>> clc.v2.Server("WA1BTDIX01").PublicIPs().public_ips[0].Update().WaitUntilComplete()
 		0
 
 		"""
 
-		return(clc.v2.Requests(clc.v2.API.Call('PUT','servers/%s/%s/publicIPAddresses/%s' % (self.parent.server.alias,self.parent.server.id,self.id),
-						                       json.dumps({'ports': [o.ToDict() for o in self.ports],
-											               'sourceRestrictions': [o.ToDict() for o in self.source_restrictions] }),
-											   session=self.session),
-							   alias=self.parent.server.alias,
-							   session=self.session))
+		if self.changes is not None:  return(None)
+
+		return(self._Put())
+
+
+	def Edit(self):
+		"""Returns a PublicIPChanges edit session for this public IP.
+
+		Within the session AddPort(s), AddSourceRestriction(s), Port.Delete and
+		SourceRestriction.Delete only change the rules in memory.  When the block exits
+		the rules are sent in a single update, skipped if they end up unchanged.  If the
+		block raises the rules are rolled back.  The queued requests are in edit.requests.
+
+		>>> with clc.v2.Server("WA1BTDIX01").PublicIPs().public_ips[0].Edit() as edit:
+		...     for port in edit.public_ips[0].ports:
+		...         if port.port == 21:  port.Delete()
+		...     edit.public_ips[0].AddPorts([{'protocol': 'TCP', 'port': '22'},{'protocol': 'TCP', 'port': '443'}])
+		>>> edit.requests.WaitUntilComplete()
+		0
+
+		"""
+
+		return(PublicIPChanges([self]))
 
 
 	def AddPort(self,protocol,port,port_to=None):
@@ -246,8 +293,7 @@ class PublicIP(object):
 
 
 	def __getattr__(self,var):
-		if var in ('source_restrictions',):  key = var
-		elif var[0] != "_": key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+		if var[0] != "_": key = PublicIP._Key(var)
 		else:  key = var
 
 		if not self.data: self._Load()
@@ -261,6 +307,85 @@ class PublicIP(object):
 
 
 
+class PublicIPChanges(object):
+
+	def __init__(self,public_ips):
+		"""Create PublicIPChanges object.  Use PublicIP.Edit() or PublicIPs.Edit() to get one."""
+
+		self.public_ips = list(public_ips)
+		self.committed = {}
+		self.requests = None
+
+
+	@staticmethod
+	def _Canonical(rules):
+		"""Rule order has no effect so compare rule sets ignoring it."""
+
+		return(dict((key,sorted(json.dumps(o,sort_keys=True) for o in value)) for key,value in rules.items()))
+
+
+	def Begin(self):
+		"""Load each IP's rules, note them as committed and start deferring updates."""
+
+		for public_ip in self.public_ips:
+			if public_ip.changes is not None:  raise(clc.CLCException("Public IP %s is already being edited" % public_ip.id))
+
+		# Load every IP before deferring any so a failed load leaves none stuck in this session
+		for public_ip in self.public_ips:
+			public_ip._Load()
+			self.committed[public_ip.id] = public_ip._Rules()
+
+		for public_ip in self.public_ips:  public_ip.changes = self
+
+
+	def Commit(self):
+		"""Send one update for each IP whose rules differ from those last committed.
+
+		Returns the queued Requests, or None if no IP changed.  If an update fails the
+		Requests already queued by this commit are kept in self.requests before the error
+		is raised, and the IPs not yet sent keep their uncommitted changes.
+
+		"""
+
+		requests = None
+		for public_ip in self.public_ips:
+			rules = public_ip._Rules()
+			if PublicIPChanges._Canonical(rules) == PublicIPChanges._Canonical(self.committed[public_ip.id]):  continue
+
+			if requests is None:  requests = self.requests = clc.v2.RequestSet(session=self.public_ips[0].session)
+			requests.Add(public_ip._Put())
+			self.committed[public_ip.id] = rules
+
+		return(self.requests)
+
+
+	def Rollback(self):
+		"""Restore each IP's rules to those last committed."""
+
+		for public_ip in self.public_ips:
+			rules = self.committed[public_ip.id]
+			public_ip.ports = [Port(public_ip,o['protocol'],o['port'],o.get('portTo')) for o in rules['ports']]
+			public_ip.source_restrictions = [SourceRestriction(public_ip,o['cidr']) for o in rules['sourceRestrictions']]
+
+
+	def End(self):
+		for public_ip in self.public_ips:  public_ip.changes = None
+
+
+	def __enter__(self):
+		self.Begin()
+		return(self)
+
+
+	def __exit__(self,exc_type,exc_value,traceback):
+		try:
+			if exc_type is None:  self.Commit()
+			else:  self.Rollback()
+		finally:
+			self.End()
+
+
+
 class Port(object):
 
 	def __init__(self,public_ip,protocol,port,port_to=None):
@@ -28,9 +28,17 @@ from __future__ import print_function, absolute_import, unicode_literals
 
 import re
 import time
+import heapq
+import logging
+import itertools
+import threading
+import concurrent.futures
 import clc
 
 
+log = logging.getLogger(__name__)
+
+
 class Queue(object):  # pylint: disable=too-few-public-methods
 	pass
 
@@ -38,6 +46,43 @@ class Queue(object):  # pylint: disable=too-few-public-methods
 
 class Requests(object):
 
+	_journal = None
+
+
+	@staticmethod
+	def SetJournal(journal):
+		"""Set the Journal every newly queued request is recorded in.  None (the default) disables it.
+
+		>>> clc.v2.Requests.SetJournal(clc.v2.Journal("/var/lib/builds/operations.sqlite"))
+
+		"""
+		Requests._journal = journal
+
+
+	@staticmethod
+	def Resume(journal,session=None):
+		"""Returns RequestSet of the journaled operations which had not completed.
+
+		Used by a new process to pick up operations queued by one which exited before they
+		finished.  Their status keeps being recorded in journal.
+
+		>>> clc.v2.Requests.Resume(clc.v2.Journal("/var/lib/builds/operations.sqlite")).WaitUntilComplete()
+		0
+
+		"""
+
+		requests = RequestSet(session=session)
+		for entry in journal.Entries(pending=True):
+			request = Request(entry['id'],alias=entry['alias'],session=session,
+			                  request_obj={'context_key': entry['context_key'], 'context_val': entry['context_val'], 'status': entry['status']})
+			request.time_created = entry['time_created']
+			request.time_executed = entry['time_executed']
+			request.journal = journal
+			requests.Add(request)
+
+		return(requests)
+
+
 	def __init__(self,requests_lst,alias=None,session=None):  # pylint: disable=too-many-branches
 		"""Create Requests object.
 
@@ -101,30 +146,33 @@ class Requests(object):
 					#        entire process
 					raise(clc.CLCException("%s '%s' not added to queue: %s" % (context_key,context_val,r['errorMessage'])))
 
+		if Requests._journal is not None:
+			# v2-experimental requests carry no alias to poll them by later
+			for request in self.requests:
+				if not isinstance(request,Requestv2Experimental):  Requests._journal.Record(request)
+
 
 	def __add__(self,obj):
 		if isinstance(obj, int):  return(self)	# we get this with a sum() call - ignore the first argument
-		if self.alias != obj.alias:  raise(ArithmeticError("Cannot add Requests operating on different aliases"))
+		# Subclasses such as clc.v2.aio.Requests poll differently and merge themselves
+		if type(obj) not in (Requests,RequestSet) and isinstance(obj,Requests):  return(NotImplemented)
 
-		new_obj = Requests([],alias=self.alias,session=self.session)
-		new_obj.requests = obj.requests+self.requests
-		new_obj.success_requests = obj.success_requests+self.success_requests
-		new_obj.error_requests = obj.error_requests+self.error_requests
-
-		return(new_obj)
+		return(RequestSet([obj,self],session=self.session))
 
 
 	def __radd__(self,obj):  return(self.__add__(obj))
 
 
-	def WaitUntilComplete(self,poll_freq=2,timeout=None):
+	def WaitUntilComplete(self,poll_freq=2,timeout=None,workers=8,max_poll_freq=30):
 		"""Poll until all request objects have completed.
 
 		If status is 'notStarted' or 'executing' continue polling.
 		If status is 'succeeded' then success
 		Else log as error
 
-		poll_freq option is in seconds
+		Outstanding requests are polled concurrently by up to workers threads.  poll_freq is
+		the initial poll interval in seconds for each request, it backs off towards max_poll_freq
+		the longer a request stays pending.  Returns as soon as the last request completes.
 
 		Returns an Int the number of unsuccessful requests.  This behavior is subject to change.
 
@@ -133,31 +181,301 @@ class Requests(object):
 
 		"""
 
-		start_time = time.time()
-		while len(self.requests):
-			cur_requests = []
-			for request in self.requests:
-				status = request.Status()
-				if status in ('notStarted','executing','resumed','queued','running'): cur_requests.append(request)
-				elif status == 'succeeded': self.success_requests.append(request)
-				elif status in ("failed", "unknown"): self.error_requests.append(request)
+		completed = set()
+
+		def _Completed(request,status,error):
+			if error:  raise(error)
 
-			self.requests = cur_requests
-			if len(self.requests) > 0 and clc.v2.time_utils.TimeoutExpired(start_time, timeout):
-				raise clc.RequestTimeoutException('Timeout waiting for Requests: {0}'.format(self.requests[0].id),
-				                                  self.requests[0].Status())
+			completed.add(request)
+			if status == 'succeeded': self.success_requests.append(request)
+			elif status in ("failed", "unknown"): self.error_requests.append(request)
 
-			time.sleep(poll_freq)	# alternately - sleep for the delta between start time and 2s
+		poller = Poller(workers=workers,poll_freq=poll_freq,max_poll_freq=max_poll_freq)
+		for request in self.requests:  poller.Add(request,_Completed)
+
+		try:
+			poller.Run(timeout=timeout)
+		finally:
+			self.requests = [request for request in self.requests if request not in completed]
 
 		# Is this the best approach?  Non-zero indicates some error.  Exception seems the wrong approach for
 		# a partial failure
 		return(len(self.error_requests))
 
 
+	def AsFutures(self):
+		"""Returns a list of concurrent.futures.Future objects, one per outstanding request.
+
+		See Request.AsFuture.  Futures from unrelated operations can be combined with
+		concurrent.futures.wait or as_completed.
+
+		>>> futures = clc.v2.Server("WA1BTDIX01").PowerOn().AsFutures() + clc.v2.Server("WA1BTDIX02").CreateSnapshot().AsFutures()
+		>>> for future in concurrent.futures.as_completed(futures):  print(future.result())
+		wa1-12345
+		wa1-12346
+
+		"""
+
+		return([request.AsFuture() for request in self.requests])
+
+
+
+class RequestSet(Requests):
+	"""Mutable collection of requests which may span accounts.
+
+	Merging is done in place in time linear in the requests added, and a request already
+	in the set (by operation id) is not added again.  Prefer building one RequestSet over
+	sum() of many Requests, which copies every list on each addition.
+
+	>>> requests = clc.v2.RequestSet()
+	>>> for server in servers:  requests += server.PowerOn()
+	>>> requests.WaitUntilComplete()
+	0
+
+	"""
+
+	def __init__(self,requests_lst=(),alias=None,session=None):  # pylint: disable=super-init-not-called
+		"""Create RequestSet object from Request, Requests or RequestSet objects."""
+
+		self.session = session
+		self.requests = []
+		self.success_requests = []
+		self.error_requests = []
+		self.aliases = set()
+		if alias:  self.aliases.add(alias)
+		self._ids = set()
+
+		for obj in requests_lst:  self.Add(obj)
+
+
+	@property
+	def alias(self):
+		"""The account alias of every request in the set, or None if they span accounts."""
+
+		if len(self.aliases) == 1:  return(list(self.aliases)[0])
+		return(None)
+
+
+	def _Add(self,request,requests_lst):
+		if request.id in self._ids:  return
+
+		self._ids.add(request.id)
+		requests_lst.append(request)
+
+		alias = getattr(request,'alias',None)
+		if alias:  self.aliases.add(alias)
+
+
+	def Add(self,obj):
+		"""Add a Request or every request of a Requests object.  Returns self."""
+
+		if obj is None or isinstance(obj,int):  return(self)
+
+		if isinstance(obj,Requests):
+			for request in obj.requests:  self._Add(request,self.requests)
+			for request in obj.success_requests:  self._Add(request,self.success_requests)
+			for request in obj.error_requests:  self._Add(request,self.error_requests)
+		else:
+			self._Add(obj,self.requests)
+
+		return(self)
+
+
+	def __iadd__(self,obj):  return(self.Add(obj))
+
+
+	def __add__(self,obj):
+		if isinstance(obj, int):  return(self)
+		if type(obj) not in (Requests,RequestSet) and isinstance(obj,Requests):  return(NotImplemented)
+
+		return(RequestSet([self,obj],session=self.session))
+
+
+	def __iter__(self):
+		return(iter(self.requests+self.success_requests+self.error_requests))
+
+
+	def Get(self,id):
+		"""Return the request with the given operation id, or None."""
+
+		for request in self:
+			if request.id == id:  return(request)
+
+
+	def ByStatus(self):
+		"""Returns dict of last known status to list of requests.  No status calls are made."""
+
+		index = {}
+		for request in self:  index.setdefault(request.data.get('status'),[]).append(request)
+
+		return(index)
+
+
+	def ByContext(self):
+		"""Returns dict of (context_key,context_val) to list of requests, e.g. ('server','WA1BTDIX01')."""
+
+		index = {}
+		for request in self:  index.setdefault((request.data.get('context_key'),request.data.get('context_val')),[]).append(request)
+
+		return(index)
+
+
+	def ByAlias(self):
+		"""Returns dict of account alias to a RequestSet of that account's requests.
+
+		>>> for alias,requests in (clc.v2.Server("WA1BTDIX01").PowerOn() + clc.v2.Server("WA1KRAPX01").PowerOn()).ByAlias().items():
+		...     print(alias,requests.WaitUntilComplete())
+		BTDI 0
+		KRAP 0
+
+		"""
+
+		index = {}
+		for request in self:
+			alias = getattr(request,'alias',None)
+			if alias not in index:  index[alias] = RequestSet(alias=alias,session=self.session)
+			index[alias].Add(request)
+
+		return(index)
+
+
+
+class Poller(object):
+	"""Concurrently polls the status of many queued requests.
+
+	Each request is polled on its own schedule.  The interval starts at poll_freq and grows
+	by backoff every time the request is found still pending, capped at max_poll_freq, so
+	quick operations are noticed promptly while long running builds generate little load.
+	Status calls are issued from a bounded pool of worker threads.
+
+	"""
+
+	PENDING = ('notStarted','executing','resumed','queued','running',None)
+
+	_shared = None
+	_shared_thread = None
+	_shared_lock = threading.Lock()
+
+
+	@staticmethod
+	def Shared():
+		"""Return the process wide Poller, starting its background thread on first use.
+
+		A new Poller replaces the shared one if its thread has died.
+
+		"""
+
+		with Poller._shared_lock:
+			if Poller._shared is None or not Poller._shared_thread.is_alive():
+				Poller._shared = Poller()
+				Poller._shared_thread = threading.Thread(target=Poller._shared.Run,kwargs={'forever': True},name='clc-queue-poller')
+				Poller._shared_thread.daemon = True
+				Poller._shared_thread.start()
+
+			return(Poller._shared)
+
+
+	def __init__(self,workers=8,poll_freq=2,max_poll_freq=30,backoff=1.5):
+		self.workers = workers
+		self.poll_freq = poll_freq
+		self.max_poll_freq = max(poll_freq,max_poll_freq)
+		self.backoff = backoff
+
+		self._schedule = []	# heap of (due time, sequence, request, interval, callback, cancelled)
+		self._sequence = itertools.count()
+		self._cv = threading.Condition()
+
+
+	def Add(self,request,callback,cancelled=None):
+		"""Start polling request.
+
+		callback(request,status,error) is called from the polling thread once the request
+		leaves the pending states, or with error set if its status could not be retrieved.
+		If cancelled is given the request is dropped, without calling callback, as soon as
+		cancelled() returns True.
+
+		"""
+
+		with self._cv:
+			heapq.heappush(self._schedule,(time.time(),next(self._sequence),request,self.poll_freq,callback,cancelled))
+			self._cv.notify()
+
+
+	def _Callback(self,callback,request,status,error,forever):
+		try:
+			callback(request,status,error)
+		except Exception:
+			# A callback raising must not stop the shared poller following everyone else's requests
+			if not forever:  raise
+			log.exception("Callback for request %s failed",request.id)
+
+
+	def Run(self,timeout=None,forever=False):
+		"""Poll until every added request has completed.
+
+		If forever is set keep waiting for new requests instead of returning.
+		Raises clc.RequestTimeoutException if requests are still pending after timeout seconds.
+
+		"""
+
+		start_time = time.time()
+		in_flight = {}
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+			while True:
+				with self._cv:
+					now = time.time()
+					while self._schedule and self._schedule[0][0] <= now and len(in_flight) < self.workers:
+						_,_,request,interval,callback,cancelled = heapq.heappop(self._schedule)
+						if cancelled is not None and cancelled():  continue
+						in_flight[executor.submit(request.Status)] = (request,interval,callback,cancelled)
+
+					if not in_flight and not self._schedule:
+						if not forever:  return
+						self._cv.wait()
+						continue
+
+					# With every worker busy nothing more can be submitted, so block until one finishes
+					# rather than spin on requests which are already due
+					if self._schedule and len(in_flight) < self.workers:  wait = max(0,self._schedule[0][0]-now)
+					else:  wait = None
+
+				if clc.v2.time_utils.TimeoutExpired(start_time, timeout):
+					if in_flight:  request = list(in_flight.values())[0][0]
+					else:  request = self._schedule[0][2]
+					raise clc.RequestTimeoutException('Timeout waiting for Requests: {0}'.format(request.id),
+					                                  request.data['status'])
+				if timeout:
+					remaining = max(0,start_time+timeout-time.time())
+					if wait is None or wait > remaining:  wait = remaining
+
+				if not in_flight:
+					with self._cv:  self._cv.wait(wait)
+					continue
+
+				done,_ = concurrent.futures.wait(list(in_flight),timeout=wait,return_when=concurrent.futures.FIRST_COMPLETED)
+				for future in done:
+					request,interval,callback,cancelled = in_flight.pop(future)
+					try:
+						status = future.result()
+					except Exception as e:
+						self._Callback(callback,request,None,e,forever)
+						continue
+
+					if status in Poller.PENDING:
+						with self._cv:
+							heapq.heappush(self._schedule,(time.time()+interval,next(self._sequence),request,
+							                               min(self.max_poll_freq,interval*self.backoff),callback,cancelled))
+					else:
+						self._Callback(callback,request,status,None,forever)
+
+
 
 class Request(object):
 	"""This is the current prod incantation for requests. """
 
+	journal = None
+
 	def __init__(self,id,alias=None,request_obj=None,session=None):
 		"""Create Request object.
 
@@ -187,11 +505,13 @@ class Request(object):
 
 	def Status(self,cached=False):
 		if not cached or not self.data['status']:
+			status = self.data['status']
 			try:
 				self.data['status'] = clc.v2.API.Call('GET','operations/%s/status/%s' % (self.alias,self.id),{},session=self.session)['status']
 			except clc.APIFailedResponse as e:
 				if e.response_status_code == 500:  pass
 				else:  raise(e)
+			if self.journal is not None and self.data['status'] != status:  self.journal.Record(self)
 		return(self.data['status'])
 
 
@@ -220,12 +540,50 @@ class Request(object):
 				self.time_completed = time.time()
 				raise(clc.CLCException("%s %s execution %s" % (self.context_key,self.context_val,status)))
 
-			time.sleep(poll_freq)
+			if not self.time_completed:  time.sleep(poll_freq)
+
+
+	def AsFuture(self):
+		"""Returns a concurrent.futures.Future resolved once this request completes.
+
+		The request is followed by the shared background Poller so any number of futures
+		cost no extra threads.  On success the future result is this Request object, if
+		the operation fails the future raises clc.CLCException.  Cancelling the future
+		stops polling the request.
+
+		>>> future = clc.v2.Server("WA1BTDIX01").Disks().Add(size=20,path=None,type="raw").requests[0].AsFuture()
+		>>> future.add_done_callback(lambda f: print("disk added"))
+		>>> future.result()
+		<clc.APIv2.queue.Request object at 0x1095a8390>
+
+		"""
+
+		future = concurrent.futures.Future()
 
+		def _Completed(request,status,error):
+			if not future.set_running_or_notify_cancel():  return
 
-	def Server(self):
+			if error:
+				future.set_exception(error)
+			elif status == 'succeeded':
+				request.time_completed = time.time()
+				future.set_result(request)
+			else:
+				request.time_completed = time.time()
+				future.set_exception(clc.CLCException("%s %s execution %s" % (request.context_key,request.context_val,status)))
+
+		Poller.Shared().Add(self,_Completed,future.cancelled)
+
+		return(future)
+
+
+	def Server(self,lazy=False,cached=True):
 		"""Return server associated with this request.
 
+		If lazy is set the returned Server is a handle which defers fetching its
+		details until first accessed.  The object is shared through the session's
+		IdentityMap unless cached is False.
+
 		>>> d = clc.v2.Datacenter()
 		>>> q = clc.v2.Server.Create(name="api2",cpu=1,memory=1,group_id=d.Groups().Get("Default Group").id,template=d.Templates().Search("centos-6-64")[0].id,network_id=d.Networks().networks[0].id,ttl=4000)
 		>>> q.WaitUntilComplete()
@@ -238,11 +596,13 @@ class Request(object):
 		"""
 		if self.context_key == 'newserver':
 			server_id = clc.v2.API.Call('GET', self.context_val,session=self.session)['id']
-			return(clc.v2.Server(id=server_id,alias=self.alias,session=self.session))
 		elif self.context_key == 'server':
-			return(clc.v2.Server(id=self.context_val,alias=self.alias,session=self.session))
+			server_id = self.context_val
 		else:  raise(clc.CLCException("%s object not server" % self.context_key))
 
+		return(clc.v2.IdentityMap.For(self.session).Resolve(clc.v2.Server,self.alias,server_id,
+		                                                     lambda: clc.v2.Server(id=server_id,alias=self.alias,session=self.session,lazy=lazy),cached))
+
 
 	def __str__(self):
 		return(self.id)
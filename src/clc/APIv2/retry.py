@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Retry and rate limit policies applied by clc.v2.API.Call.
+
+A RetryPolicy decides whether a failed call is retried and how long to back off first.
+A RateLimiter is a set of token buckets, one per API endpoint, shared by every thread
+issuing calls so bursts are smoothed out before they reach the API.
+
+>>> clc.v2.API.SetRetryPolicy(clc.v2.RetryPolicy(retries=5,backoff=1))
+>>> clc.v2.API.SetRateLimiter(clc.v2.RateLimiter(rate=10,endpoints={'operations': 2}))
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import re
+import time
+import random
+import calendar
+import threading
+import email.utils
+
+
+class RetryPolicy(object):
+
+	def __init__(self,retries=3,backoff=0.5,max_backoff=30,status_codes=(429,502,503,504),
+	             methods=('GET','HEAD','OPTIONS','PUT','DELETE'),always_retry_status_codes=(429,)):
+		"""Create RetryPolicy object.
+
+		retries - maximum number of retries after the initial attempt
+		backoff - base delay in seconds, doubled with each attempt
+		max_backoff - cap in seconds on any single delay
+		status_codes - HTTP statuses that are retried
+		methods - idempotent methods that are retried on any status in status_codes or on a connection error
+		always_retry_status_codes - statuses retried for every method since the API did not act on the request
+
+		Delays use full jitter (a random value between zero and the exponential
+		backoff) unless the response carries a Retry-After header.
+
+		"""
+
+		self.retries = retries
+		self.backoff = backoff
+		self.max_backoff = max_backoff
+		self.status_codes = status_codes
+		self.methods = methods
+		self.always_retry_status_codes = always_retry_status_codes
+
+
+	@staticmethod
+	def _RetryAfter(retry_after):
+		"""Returns seconds to wait from a Retry-After header in either delta-seconds or HTTP-date form."""
+		try:
+			return(max(0,float(retry_after)))
+		except (TypeError,ValueError):
+			pass
+
+		try:
+			return(max(0,calendar.timegm(email.utils.parsedate(retry_after))-time.time()))
+		except:
+			return(None)
+
+
+	def Delay(self,method,attempt,status=None,retry_after=None,connection_error=False):
+		"""Returns seconds to wait before retrying, or None if the call should not be retried.
+
+		attempt is the number of retries already made.
+
+		>>> clc.v2.RetryPolicy().Delay('GET',0,status=503)
+		0.3119
+		>>> clc.v2.RetryPolicy().Delay('POST',0,status=503)
+		None
+
+		"""
+
+		if attempt >= self.retries:  return(None)
+
+		if connection_error:  retryable = method in self.methods
+		elif status in self.always_retry_status_codes:  retryable = True
+		else:  retryable = status in self.status_codes and method in self.methods
+		if not retryable:  return(None)
+
+		if retry_after is not None:
+			delay = RetryPolicy._RetryAfter(retry_after)
+			if delay is not None:  return(min(delay,self.max_backoff))
+
+		return(random.uniform(0,min(self.max_backoff,self.backoff*2**attempt)))
+
+
+
+class TokenBucket(object):
+
+	def __init__(self,rate,burst=None):
+		"""Create TokenBucket allowing rate calls per second with bursts of up to burst calls."""
+
+		self.rate = float(rate)
+		self.capacity = float(burst or max(1,rate))
+		self.tokens = self.capacity
+		self.timestamp = time.time()
+		self.paused_until = 0
+
+		self._lock = threading.Lock()
+
+
+	def Acquire(self):
+		"""Block until a token is available then consume it."""
+
+		while True:
+			with self._lock:
+				now = time.time()
+				self.tokens = min(self.capacity,self.tokens+(now-self.timestamp)*self.rate)
+				self.timestamp = now
+
+				if now >= self.paused_until and self.tokens >= 1:
+					self.tokens -= 1
+					return
+
+				wait = max(self.paused_until-now,(1-self.tokens)/self.rate)
+
+			time.sleep(wait)
+
+
+	def Pause(self,seconds):
+		"""Hold back all callers for the given number of seconds (e.g. after a 429)."""
+
+		with self._lock:
+			self.paused_until = max(self.paused_until,time.time()+seconds)
+			self.tokens = 0
+
+
+
+class RateLimiter(object):
+
+	def __init__(self,rate=10,burst=None,endpoints=None):
+		"""Create RateLimiter object.
+
+		rate and burst apply to each endpoint independently.  endpoints optionally maps
+		an endpoint name to its own rate, or to a (rate,burst) tuple.
+
+		Endpoints are the first path component following the API version, e.g.
+		servers, groups, operations or datacenters.
+
+		"""
+
+		self.rate = rate
+		self.burst = burst
+		self.endpoints = endpoints or {}
+		self.buckets = {}
+
+		self._lock = threading.Lock()
+
+
+	@staticmethod
+	def Endpoint(url):
+		"""Return the endpoint name for a relative or absolute API url.
+
+		>>> clc.v2.RateLimiter.Endpoint('/v2-experimental/networks/BTDI/WA1')
+		'networks'
+
+		"""
+
+		m = re.match(r"(?:https?://[^/]+)?/?(?:v2[^/]*/)?([^/?]+)",url)
+		if m:  return(m.group(1))
+		else:  return(url)
+
+
+	def _Bucket(self,url):
+		endpoint = RateLimiter.Endpoint(url)
+
+		with self._lock:
+			if endpoint not in self.buckets:
+				limit = self.endpoints.get(endpoint,(self.rate,self.burst))
+				if isinstance(limit,tuple):  self.buckets[endpoint] = TokenBucket(*limit)
+				else:  self.buckets[endpoint] = TokenBucket(limit)
+
+			return(self.buckets[endpoint])
+
+
+	def Acquire(self,url):  self._Bucket(url).Acquire()
+	def Pause(self,url,seconds):  self._Bucket(url).Pause(seconds)
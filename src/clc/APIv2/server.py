@@ -64,10 +64,14 @@ import re
 import json
 import time
 import clc
+from clc.APIv2.naming import AttributeResolver
 
 
 class Servers(object):
 
+	# Most servers sent in one bulk operation call
+	OPERATION_CHUNK_SIZE = 100
+
 	def __init__(self,servers_lst,alias=None,session=None):
 		"""Container class for one or more servers.
 
@@ -85,76 +89,232 @@ class Servers(object):
 		else:  self.alias = clc.v2.Account.GetAlias(session=self.session)
 
 		self.servers_lst = servers_lst
+		self.errors = {}
+		self.operation_errors = {}
 
 
-	def Servers(self,cached=True):
+	def Servers(self,cached=True,workers=None,raise_errors=True,lazy=False):
 		"""Returns list of server objects, populates if necessary.
 
+		If lazy is set the list holds Server handles which fetch their details only when
+		first accessed, so no API calls are made here.
+
+		Server details are fetched concurrently by up to workers threads (default
+		clc.v2.parallel.WORKERS).  If raise_errors is False servers which cannot be loaded
+		are left out of the list and reported in self.errors, a dict of server id to
+		exception.  Otherwise the first failure is raised once all fetches finish.
+
 		>>> clc.v2.Servers(["NY1BTDIPHYP0101","NY1BTDIWEB0101"]).Servers()
 		[<clc.APIv2.server.Server object at 0x1065b0d50>, <clc.APIv2.server.Server object at 0x1065b0e50>]
 		>>> print _[0]
 		NY1BTDIPHYP0101
 
+		>>> s = clc.v2.Group("wa1-4416").Servers()
+		>>> len(s.Servers(workers=32,raise_errors=False)), s.errors
+		(1998, {'WA1BTDIWEB0107': CLCException('Server does not exist',), 'WA1BTDIWEB0112': CLCException('HTTP error: 503',)})
+
 		"""
 
+		if lazy:
+			return([Server(id=id,alias=self.alias,session=self.session,lazy=True) for id in self.servers_lst])
+
 		if not hasattr(self,'_servers') or not cached:
-			self._servers = []
-			for server in self.servers_lst:
-				self._servers.append(Server(id=server,alias=self.alias,session=self.session))
+			results = clc.v2.parallel.Map(lambda id: Server(id=id,alias=self.alias,session=self.session),self.servers_lst,workers)
+
+			self.errors = dict([(id,e) for id,(server,e) in zip(self.servers_lst,results) if e is not None])
+			if self.errors and raise_errors:  raise([e for _,e in results if e is not None][0])
+
+			self._servers = [server for server,e in results if e is None]
 
 		return(self._servers)
 
 
+	def Fleet(self,workers=None):
+		"""Returns a clc.v2.FleetTable of these servers for vectorized filtering and totals.
+
+		Servers which cannot be loaded are left out and reported in self.errors.
+
+		>>> clc.v2.Servers(["NY1BTDIPHYP0101","NY1BTDIWEB0101"]).Fleet().Sum('memory')
+		12.0
+
+		"""
+
+		return(clc.v2.FleetTable.FromServers(self.Servers(workers=workers,raise_errors=False)))
+
+
+	def DiskPlans(self,workers=None):
+		"""Returns a list of DiskPlan objects, one per server, for use with DiskPlan.CommitAll.
+
+		>>> plans = clc.v2.Servers(["WA1BTDIX01","WA1BTDIX02"]).DiskPlans()
+		>>> for plan in plans:  plan.Grow("/",60)
+		>>> clc.v2.DiskPlan.CommitAll(plans).WaitUntilComplete()
+		0
+
+		"""
+
+		return([server.Disks().Plan() for server in self.Servers(workers=workers)])
+
+
 	def __getattr__(self,key):
 		if key == 'servers':  return(self.Servers())
 		else:  raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,key)))
 
 
-	def _Operation(self,operation):
+	def _OperationChunk(self,operation,servers_lst):
+		"""Execute operation against one chunk of servers.  Returns (Requests or None, dict of server id to exception)."""
+
+		try:
+			response = clc.v2.API.Call('POST','operations/%s/servers/%s' % (self.alias,operation),
+			                           json.dumps(servers_lst),
+			                           session=self.session)
+		except clc.APIFailedResponse as e:
+			# Most likely a queue add error presented as a 400.  Let Requests parse this.  If
+			# the body couldn't be parsed (e.g. an HTML 502 page) fail the whole chunk
+			if not getattr(e,'response_json',None):  raise(e)
+			response = e.response_json
+
+		if not isinstance(response,list):
+			return((clc.v2.Requests(response,alias=self.alias,session=self.session),{}))
+
+		# Parse each server's entry separately so one server which could not be queued
+		# doesn't lose track of the others which were
+		requests = []
+		errors = {}
+		for r in response:
+			try:
+				requests.append(clc.v2.Requests([r],alias=self.alias,session=self.session))
+			except Exception as e:
+				errors[r.get('server')] = e
+
+		if len(requests)>1:  return((clc.v2.RequestSet(requests,alias=self.alias,session=self.session),errors))
+		elif requests:  return((requests[0],errors))
+		else:  return((None,errors))
+
+
+	def _Operation(self,operation,chunk_size=None,workers=None):
 		"""Execute specified operations task against one or more servers.
 
 		Returns a clc.v2.Requests object.  If error due to server(s) already being in
 		the requested state this is not raised as an error at this level.
 
+		Duplicate server ids are dropped and the rest are sent in chunks of up to chunk_size
+		(default Servers.OPERATION_CHUNK_SIZE) by up to workers threads (default
+		clc.v2.parallel.WORKERS).  Servers or chunks which could not be queued are reported
+		in self.operation_errors, a dict of server id to exception, and the Requests for the
+		rest are returned.  An exception is raised only if nothing could be queued.
+
 		>>> clc.v2.Servers(["NY1BTDIPHYP0101","NY1BTDIWEB0101"]).Pause()
 		<clc.APIv2.queue.Requests object at 0x105fea7d0>
 		>>> _.WaitUntilComplete()
 		0
 
+		>>> s = clc.v2.Group("wa1-4416").Servers()
+		>>> s.Reboot(chunk_size=50,workers=4).WaitUntilComplete(), s.operation_errors
+		(0, {'WA1BTDIWEB0107': CLCException("server 'WA1BTDIWEB0107' not added to queue: ...",)})
+
 		"""
 
-		try:
-			return(clc.v2.Requests(clc.v2.API.Call('POST','operations/%s/servers/%s' % (self.alias,operation),
-			                                       json.dumps(self.servers_lst),
-												   session=self.session),
-								   alias=self.alias,session=self.session))
-		except clc.APIFailedResponse as e:
-			# Most likely a queue add error presented as a 400.  Let Requests parse this
-			return(clc.v2.Requests(e.response_json,alias=self.alias,session=self.session))
+		if not chunk_size:  chunk_size = Servers.OPERATION_CHUNK_SIZE
 
+		seen = set()
+		servers_lst = []
+		for id in self.servers_lst:
+			if ("%s" % id).upper() in seen:  continue
+			seen.add(("%s" % id).upper())
+			servers_lst.append(id)
 
-	def Archive(self):  return(self._Operation('archive'))
-	def Pause(self):  return(self._Operation('pause'))
-	def ShutDown(self):  return(self._Operation('shutDown'))
-	def Reboot(self):  return(self._Operation('reboot'))
-	def Reset(self):  return(self._Operation('reset'))
-	def PowerOn(self):  return(self._Operation('powerOn'))
-	def PowerOff(self):  return(self._Operation('powerOff'))
-	def StartMaintenance(self):  return(self._Operation('startMaintenance'))
-	def StopMaintenance(self):  return(self._Operation('stopMaintenance'))
+		chunks = [servers_lst[i:i+chunk_size] for i in range(0,len(servers_lst),chunk_size)] or [[]]
+		results = clc.v2.parallel.Map(lambda chunk: self._OperationChunk(operation,chunk),chunks,workers)
+
+		self.operation_errors = {}
+		requests = []
+		for chunk,(result,e) in zip(chunks,results):
+			if e is not None:
+				for id in chunk:  self.operation_errors[id] = e
+				continue
+
+			chunk_requests,chunk_errors = result
+			self.operation_errors.update(chunk_errors)
+			if chunk_requests is not None:  requests.append(chunk_requests)
+
+		if not requests:
+			if self.operation_errors:  raise(list(self.operation_errors.values())[0])
+			return(clc.v2.Requests([],alias=self.alias,session=self.session))
+		elif len(requests)>1:  return(clc.v2.RequestSet(requests,alias=self.alias,session=self.session))
+		else:  return(requests[0])
+
+
+	def Archive(self,chunk_size=None,workers=None):  return(self._Operation('archive',chunk_size,workers))
+	def Pause(self,chunk_size=None,workers=None):  return(self._Operation('pause',chunk_size,workers))
+	def ShutDown(self,chunk_size=None,workers=None):  return(self._Operation('shutDown',chunk_size,workers))
+	def Reboot(self,chunk_size=None,workers=None):  return(self._Operation('reboot',chunk_size,workers))
+	def Reset(self,chunk_size=None,workers=None):  return(self._Operation('reset',chunk_size,workers))
+	def PowerOn(self,chunk_size=None,workers=None):  return(self._Operation('powerOn',chunk_size,workers))
+	def PowerOff(self,chunk_size=None,workers=None):  return(self._Operation('powerOff',chunk_size,workers))
+	def StartMaintenance(self,chunk_size=None,workers=None):  return(self._Operation('startMaintenance',chunk_size,workers))
+	def StopMaintenance(self,chunk_size=None,workers=None):  return(self._Operation('stopMaintenance',chunk_size,workers))
+
+
+
+class ServerChanges(object):
+
+	def __init__(self,server):
+		"""Create ServerChanges object.  Use Server.Edit() to get one."""
+
+		self.server = server
+		self.operations = []
+		self.requests = None
+
+
+	def Change(self,cpu=None,memory=None,description=None,group_id=None):
+		"""Stage changes to send on Commit.  A later change to a field replaces an earlier one."""
+
+		for operation in Server._ChangeOperations(cpu,memory,description,group_id):
+			self.operations = [o for o in self.operations if o['member']!=operation['member']]
+			self.operations.append(operation)
+
+		return(self)
+
+
+	def SetCPU(self,value):  return(self.Change(cpu=value))
+	def SetMemory(self,value):  return(self.Change(memory=value))
+	def SetDescription(self,value):  return(self.Change(description=value))
+	def SetGroup(self,group_id):  return(self.Change(group_id=group_id))
+
+
+	def Commit(self):
+		"""Send all staged changes as one PATCH.  Returns the queued Requests, or None if nothing was staged."""
+
+		if self.operations:
+			self.requests = self.server._Patch(self.operations)
+			self.operations = []
+
+		return(self.requests)
+
+
+	def __enter__(self):
+		return(self)
+
+
+	def __exit__(self,exc_type,exc_value,traceback):
+		if exc_type is None:  self.Commit()
+		else:  self.operations = []
 
 
 
 class Server(object):  # pylint: disable=too-many-instance-attributes
 
+	_Key = AttributeResolver({'memory': 'memoryGB', 'storage': 'storageGB', 'secondary_ip_addresses': 'secondaryIPAddresses'})
 
-	def __init__(self,id,alias=None,server_obj=None,session=None):
+
+	def __init__(self,id,alias=None,server_obj=None,session=None,lazy=False):
 		"""Create Server object.
 
 		http://www.centurylinkcloud.com/api-docs/v2#servers-get-server
 
 		#If parameters are populated then create object location.
 		#Else if only id is supplied issue a Get Policy call
+		#Unless lazy is set, then defer the call until server data is first accessed
 
 		# successful creation
 		>>> clc.v2.Server("CA3BTDICNTRLM01")
@@ -166,6 +326,13 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 		>>> clc.v2.Server(alias='BTDI',id='WA1BTDIKRT01')
 		clc.CLCException: Server does not exist
 
+		# lazy handle.  No API call until an attribute needing server data is read
+		>>> s = clc.v2.Server(alias='BTDI',id='WA1BTDIKRT02',lazy=True)
+		>>> s.PowerOn().WaitUntilComplete()
+		0
+		>>> s.power_state
+		u'started'
+
 		"""
 
 		self.id = id
@@ -174,18 +341,25 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 		self.public_ips = None
 		self.dirty = False
 		self.session = session
-		self.data = None
+		self.lazy = lazy
 
 		if alias:  self.alias = alias
 		else:  self.alias = clc.v2.Account.GetAlias(session=self.session)
 
 		if server_obj:  self.data = server_obj
-		else:
-			try:
-				self.Refresh()
-			except clc.APIFailedResponse as e:
-				if e.response_status_code==404:  raise(clc.CLCException("Server does not exist"))
-				else: raise(clc.CLCException("HTTP error: %s" % e.response_status_code))
+		elif not lazy:  self._Load()
+
+
+	def _Load(self):
+		"""Fetch server data, translating API failures into CLCExceptions."""
+
+		try:
+			self.Refresh()
+		except clc.APIFailedResponse as e:
+			if e.response_status_code==404:  raise(clc.CLCException("Server does not exist"))
+			else: raise(clc.CLCException("HTTP error: %s" % e.response_status_code))
+
+		return(self.data)
 
 
 	def Refresh(self):
@@ -196,17 +370,24 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 		"""
 
 		self.dirty = False
-		self.data = clc.v2.API.Call('GET','servers/%s/%s' % (self.alias,self.id),{},session=self.session)
+		self.data = Server._Normalize(clc.v2.API.Call('GET','servers/%s/%s' % (self.alias,self.id),{},session=self.session))
+
+
+	@staticmethod
+	def _Normalize(data):
+		"""Convert raw server details into the units exposed by the Server object."""
 
 		try:
-			self.data['changeInfo']['createdDate'] = clc.v2.time_utils.ZuluTSToSeconds(self.data['changeInfo']['createdDate'])
-			self.data['changeInfo']['modifiedDate'] = clc.v2.time_utils.ZuluTSToSeconds(self.data['changeInfo']['modifiedDate'])
+			data['changeInfo']['createdDate'] = clc.v2.time_utils.ZuluTSToSeconds(data['changeInfo']['createdDate'])
+			data['changeInfo']['modifiedDate'] = clc.v2.time_utils.ZuluTSToSeconds(data['changeInfo']['modifiedDate'])
 
 			# API call switches between GB and MB.  Change to all references are in GB and we drop the units
-			self.data['details']['memoryGB'] = self.data['details']['memoryMB'] // 1024
+			data['details']['memoryGB'] = data['details']['memoryMB'] // 1024
 		except:
 			pass
 
+		return(data)
+
 
 	def _Capabilities(self,cached=True):
 		if not self.capabilities or not cached:
@@ -216,11 +397,15 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 
 
 	def __getattr__(self,var):
-		if var in ('memory','storage'):  key = var+'GB'
-		elif var == 'secondary_ip_addresses':  key = 'secondaryIPAddresses'
-		else:  key = re.sub("_(.)",lambda pat: pat.group(1).upper(),var)
+		if var.startswith('__'):  raise(AttributeError(var))
 
+		# Lazy handles load on first access to anything beyond id, alias and session
 		data = self.__dict__.get('data', None)
+		if data is None and self.__dict__.get('lazy'):  data = self._Load()
+		if var == 'data':  return(data)
+
+		key = Server._Key(var)
+
 		if data is None:  raise AttributeError('Server object has no info loaded')
 		elif key in data:  return(data[key])
 		elif 'details' in data and key in data['details']:  return(data['details'][key])
@@ -229,9 +414,11 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 		else:  raise(AttributeError("'%s' instance has no attribute '%s'" % (self.__class__.__name__,key)))
 
 
-	def Account(self):
+	def Account(self,cached=True):
 		"""Return account object for account containing this server.
 
+		The object is shared through the session's IdentityMap unless cached is False.
+
 		>>> clc.v2.Server("CA3BTDICNTRLM01").Account()
 		<clc.APIv2.account.Account instance at 0x108789878>
 		>>> print _
@@ -239,12 +426,15 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 
 		"""
 
-		return(clc.v2.Account(alias=self.alias,session=self.session))
+		return(clc.v2.IdentityMap.For(self.session).Resolve(clc.v2.Account,self.alias,self.alias,
+		                                                     lambda: clc.v2.Account(alias=self.alias,session=self.session),cached))
 
 
-	def Group(self):
+	def Group(self,cached=True):
 		"""Return group object for group containing this server.
 
+		The object is shared through the session's IdentityMap unless cached is False.
+
 		>>> clc.v2.Server("CA3BTDICNTRLM01").Group()
 		<clc.APIv2.group.Group object at 0x10b07b7d0>
 		>>> print _
@@ -252,7 +442,8 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 
 		"""
 
-		return(clc.v2.Group(id=self.groupId,alias=self.alias,session=self.session))
+		return(clc.v2.IdentityMap.For(self.session).Resolve(clc.v2.Group,self.alias,self.groupId,
+		                                                     lambda: clc.v2.Group(id=self.groupId,alias=self.alias,session=self.session),cached))
 
 
 	def Disks(self):
@@ -516,7 +707,7 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 					alias=self.alias,
 					session=self.session))
 
-		return(sum(requests_lst))
+		return(clc.v2.RequestSet(requests_lst,alias=self.alias,session=self.session))
 
 
 	def RestoreSnapshot(self,name=None):
@@ -638,6 +829,9 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 		    the clone process will touch them
 		* - no change to the disk layout we will clone all
 		* - clone will not replicate managed OS setting from self so this must be explicitly set
+		* - creates are submitted concurrently.  The Requests for the clones queued are returned and
+		    creates which failed are reported in its errors attribute, a list of exceptions.  An
+		    exception is raised only if no clone could be queued
 
 		>>> d = clc.v2.Datacenter()
 		>>> clc.v2.Server(alias='BTDI',id='WA1BTDIAPI207').Clone(network_id=d.Networks().networks[0].id,count=2)
@@ -662,18 +856,24 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 		# TODO - #if not anti_affinity_policy_id:  anti_affinity_policy_id =
 		# TODO - need to get network_id of self, not currently exposed via API :(
 
-		requests_lst = []
-		for _ in range(0,count):
-			requests_lst.append(Server.Create( \
+		# Creates are submitted concurrently.  Use clc.v2.ProvisioningPipeline to also follow each build
+		results = clc.v2.parallel.Map(lambda _: Server.Create( \
 			            name=name,cpu=cpu,memory=memory,group_id=group_id,network_id=network_id,alias=self.alias,
 						password=password,ip_address=ip_address,storage_type=storage_type,type=type,
 						primary_dns=primary_dns,secondary_dns=secondary_dns,
 						custom_fields=custom_fields,ttl=ttl,managed_os=managed_os,description=description,
                         source_server_password=source_server_password,cpu_autoscale_policy_id=cpu_autoscale_policy_id,
 						anti_affinity_policy_id=anti_affinity_policy_id,packages=packages,
-						template=self.id,session=self.session))
+						template=self.id,session=self.session),range(0,count))
+
+		# Creates which were queued keep building, so hand back their requests rather than raising
+		errors = [e for _,e in results if e is not None]
+		if errors and len(errors) == count:  raise(errors[0])
 
-		return(sum(requests_lst))
+		requests = clc.v2.RequestSet([requests for requests,e in results if e is None],alias=self.alias,session=self.session)
+		requests.errors = errors
+
+		return(requests)
 
 
 
@@ -700,32 +900,43 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 
 
 
-	def Change(self,cpu=None,memory=None,description=None,group_id=None):  # pylint: disable=unused-argument
-		"""Change existing server object.
+	@staticmethod
+	def _ChangeOperations(cpu=None,memory=None,description=None,group_id=None):
+		"""Return the PATCH operations setting each given field."""
 
-		One more more fields can be set and method will return with a requests
-		object for all queued activities.  This is a convenience function - all
-		each of these changes requires a seperate API call.  Some API calls are synchronous
-		(e.g. changing group ID or password) while others are async.
+		return([{"op": "set", "member": key, "value": value}
+		        for key,value in (("cpu",cpu),("memory",memory),("description",description),("groupId",group_id)) if value])
 
-		"""
 
-		if group_id:  groupId = group_id  # pylint: disable=unused-variable
-		else:  groupId = None
+	def _Patch(self,operations):
+		"""Send operations as a single PATCH and return the queued Requests."""
+
+		self.dirty = True
+		return(clc.v2.Requests(clc.v2.API.Call('PATCH','servers/%s/%s' % (self.alias,self.id),
+		                                       json.dumps(operations),
+											   session=self.session),
+							   alias=self.alias,
+							   session=self.session))
 
-		requests = []
 
-		for key in ("cpu","memory","description","groupId"):
-			if locals()[key]:
-				requests.append(clc.v2.Requests(clc.v2.API.Call('PATCH','servers/%s/%s' % (self.alias,self.id),
-				                                                json.dumps([{"op": "set", "member": key, "value": locals()[key]}]),
-																session=self.session),
-								alias=self.alias,
-								session=self.session))
+	def Change(self,cpu=None,memory=None,description=None,group_id=None):
+		"""Change existing server object.
+
+		One more more fields can be set and method will return with a requests
+		object for all queued activities.  All changes are sent as one API call so
+		a resize of cpu and memory is a single queued job.  Some changes are synchronous
+		(e.g. changing group ID or password) and queue no request, batching them with
+		others or through Edit() does not change that.
+
+		>>> clc.v2.Server("WA1BTDIX01").Change(cpu=4,memory=8).WaitUntilComplete()
+		0
+
+		"""
 
-		if len(requests):  self.dirty = True
+		operations = Server._ChangeOperations(cpu,memory,description,group_id)
+		if not operations:  return(0)
 
-		return(sum(requests))
+		return(self._Patch(operations))
 
 
 	def SetCPU(self,value):  return(self.Change(cpu=value))
@@ -734,6 +945,24 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 	def SetGroup(self,group_id):  return(self.Change(group_id=group_id))
 
 
+	def Edit(self):
+		"""Returns a ServerChanges object collecting changes to send in a single API call.
+
+		Used as a context manager the changes are committed when the block exits and
+		discarded if it raises.  The queued requests are then in edit.requests.
+
+		>>> with clc.v2.Server("WA1BTDIX01").Edit() as edit:
+		...     edit.SetCPU(4)
+		...     edit.SetMemory(8)
+		...     edit.SetDescription("resized")
+		>>> edit.requests.WaitUntilComplete()
+		0
+
+		"""
+
+		return(ServerChanges(self))
+
+
 	def SetPassword(self,password):
 		"""Request change of password.
 
@@ -768,4 +997,6 @@ class Server(object):  # pylint: disable=too-many-instance-attributes
 
 
 	def __str__(self):
+		# Don't force a lazy handle to load just to print it
+		if self.lazy and 'data' not in self.__dict__:  return(self.id)
 		return(self.data['name'])
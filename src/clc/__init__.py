@@ -19,6 +19,7 @@ API Documentaton v2: https://t3n.zendesk.com/categories/20067994-API-v2-0-Beta-
 from . import defaults
 from . import APIv1 as v1
 from . import APIv2 as v2
+from .token_cache import TokenCache
 import requests
 
 
@@ -36,13 +37,26 @@ args = False
 _SSL_VERIFY = True
 
 _LOGIN_COOKIE_V1 = False
-_LOGIN_TOKEN_V2 = False
 
 _V1_ENABLED = False
 _V2_ENABLED = False
 _LOGINS = 0
 _BLUEPRINT_FTP_URL = False
-_REQUESTS_SESSION = requests.Session()
+_REQUESTS_POOL_SIZE = 32	# keep-alive connections per host, size to the number of threads issuing API calls
+
+
+def _NewRequestsSession():
+	"""Return a requests session whose connection pool is shared safely between threads."""
+	session = requests.Session()
+	adapter = requests.adapters.HTTPAdapter(pool_maxsize=_REQUESTS_POOL_SIZE)
+	session.mount('https://',adapter)
+	session.mount('http://',adapter)
+
+	return(session)
+
+
+_REQUESTS_SESSION = _NewRequestsSession()
+_TOKEN_CACHE = None
 
 _GROUP_MAPPING = {}
 
@@ -54,6 +68,12 @@ def SetRequestsSession(session):
 	_REQUESTS_SESSION = session
 
 
+def SetTokenCache(cache):
+	"""Provide a TokenCache used to persist v1 and v2 logins between processes.  None disables it."""
+	global _TOKEN_CACHE
+	_TOKEN_CACHE = cache
+
+
 class CLCException(Exception):
 	pass
 class APIV1NotEnabled(CLCException):
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Encrypted on-disk cache of API logins.
+
+Saves the v1 session cookie and the v2 bearer token (with account alias and location)
+so later processes reuse them rather than logging in again.  Entries are keyed on
+endpoint and username and encrypted with a key derived from the password, so only a
+process which already holds the credentials can read them.  Files are created owner
+read/write only and are ignored if their permissions have been loosened.
+
+Requires the optional cryptography package (pip install clc-sdk[cache]).
+
+>>> clc.SetTokenCache(clc.TokenCache())
+
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import json
+import time
+import base64
+import hashlib
+
+try:
+	from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+	Fernet = None
+
+import clc
+
+
+def _DefaultPath():
+	if os.name == 'nt':  base = os.environ.get('LOCALAPPDATA',os.path.expanduser('~'))
+	else:  base = os.environ.get('XDG_CACHE_HOME',os.path.join(os.path.expanduser('~'),'.cache'))
+
+	return(os.path.join(base,'clc','tokens'))
+
+
+class TokenCache(object):
+
+	# PBKDF2 rounds deriving the encryption key from the password.  Still far cheaper than a login
+	ITERATIONS = 100000
+
+
+	def __init__(self,path=None):
+		"""Create TokenCache object.
+
+		path - directory holding cache files, defaults to clc/tokens in the user cache directory
+
+		"""
+
+		if Fernet is None:  raise(clc.CLCException("TokenCache requires the cryptography package"))
+
+		self.path = path or _DefaultPath()
+		if not os.path.isdir(self.path):  os.makedirs(self.path,0o700)
+
+
+	def _File(self,endpoint,username):
+		return(os.path.join(self.path,"%s.json" % hashlib.sha256(("%s\0%s" % (endpoint,username)).encode('utf-8')).hexdigest()))
+
+
+	@staticmethod
+	def _Fernet(password,salt):
+		key = hashlib.pbkdf2_hmac('sha256',password.encode('utf-8'),salt,TokenCache.ITERATIONS)
+		return(Fernet(base64.urlsafe_b64encode(key)))
+
+
+	@staticmethod
+	def _Secure(path):
+		"""Returns True if path is owned by this user and not readable or writable by anyone else."""
+		if os.name == 'nt':  return(True)
+
+		st = os.stat(path)
+		return(st.st_uid == os.getuid() and not st.st_mode & 0o077)
+
+
+	def Load(self,endpoint,username,password):
+		"""Return the unexpired login data saved for username at endpoint, or None.
+
+		>>> clc._TOKEN_CACHE.Load(clc.defaults.ENDPOINT_URL_V2,'user','passwd')
+		{u'bearerToken': u'...', u'accountAlias': u'BTDI', u'locationAlias': u'WA1', u'expires': 1444339200}
+
+		"""
+
+		path = self._File(endpoint,username)
+
+		try:
+			if not TokenCache._Secure(path):  return(None)
+			with open(path,'rb') as f:
+				entry = json.loads(f.read().decode('utf-8'))
+			data = json.loads(TokenCache._Fernet(password,base64.b64decode(entry['salt'])).decrypt(entry['data'].encode('ascii')).decode('utf-8'))
+		except (OSError,IOError,ValueError,KeyError,TypeError,InvalidToken):
+			# Missing, corrupt or saved under a different password
+			return(None)
+
+		if data.get('expires',0) <= time.time():  return(None)
+
+		return(data)
+
+
+	def Save(self,endpoint,username,password,data,expires):
+		"""Encrypt and save login data for username at endpoint until expires (POSIX time)."""
+
+		salt = os.urandom(16)
+		token = TokenCache._Fernet(password,salt).encrypt(json.dumps(dict(data,expires=expires)).encode('utf-8'))
+		entry = json.dumps({'salt': base64.b64encode(salt).decode('ascii'), 'data': token.decode('ascii')})
+
+		path = self._File(endpoint,username)
+		tmp = "%s.%s.tmp" % (path,os.getpid())
+		fd = os.open(tmp,os.O_WRONLY|os.O_CREAT|os.O_TRUNC,0o600)
+		try:
+			os.write(fd,entry.encode('utf-8'))
+		finally:
+			os.close(fd)
+
+		# Write then rename so concurrent readers never see a partial file
+		if os.name == 'nt' and os.path.exists(path):  os.remove(path)
+		os.rename(tmp,path)
+
+
+	def Delete(self,endpoint,username):
+		"""Discard the saved login for username at endpoint, e.g. after the API rejects it."""
+
+		try:
+			os.remove(self._File(endpoint,username))
+		except OSError:
+			pass
+
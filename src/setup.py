@@ -14,7 +14,13 @@ setup(
 	version = "2.51",
 	packages = find_packages("."),
 
-	install_requires = ['prettytable','clint','argparse','requests'],
+	install_requires = ['prettytable','clint','argparse','requests','futures; python_version < "3"'],
+
+	extras_require = {
+		'aio': ['aiohttp'],	# clc.v2.aio, Python 3.5+ only
+		'cache': ['cryptography'],	# clc.TokenCache
+		'fleet': ['numpy'],	# faster clc.v2.FleetTable
+	},
 
 	entry_points = {
 		'console_scripts': [
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+
+import asyncio
+import mock
+import unittest
+import clc as clc_sdk
+import clc.APIv2.aio
+from clc.APIv2 import aio
+
+
+class TestClcAio(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def testServerLoadsWhenAwaited(self):
+        data = {"name": "WA1BTDIX01", "details": {"cpu": 2, "memoryMB": 4096},
+                "changeInfo": {"createdDate": "2015-01-10T02:10:38Z", "modifiedDate": "2015-01-10T02:10:38Z"}}
+        with mock.patch.object(aio.API, 'Call', mock.AsyncMock(return_value=data)) as call:
+            server = aio.Server(id="WA1BTDIX01", alias="BTDI")
+            self.assertEqual(call.call_count, 0)
+            self.run_async(server)
+
+        call.assert_called_once_with('GET', 'servers/BTDI/WA1BTDIX01', {}, session=None)
+        self.assertEqual(server.cpu, 2)
+        self.assertEqual(server.memory, 4)
+        self.assertEqual(server.created_date, 1420855838)
+        self.assertEqual(str(server), "WA1BTDIX01")
+
+    def testServerNotLoadedRaisesAttributeError(self):
+        with self.assertRaises(AttributeError):
+            aio.Server(id="WA1BTDIX01", alias="BTDI").cpu
+
+    def testServerDoesNotExist(self):
+        e = clc_sdk.APIFailedResponse("Fake message")
+        e.response_status_code = 404
+        with mock.patch.object(aio.API, 'Call', mock.AsyncMock(side_effect=e)):
+            with self.assertRaises(clc_sdk.CLCException) as ex:
+                self.run_async(aio.Server(id="WA1BTDIX01", alias="BTDI"))
+        self.assertEqual(str(ex.exception), "Server does not exist")
+
+    def testServersFetchedConcurrently(self):
+        in_flight = []
+        peak = []
+
+        async def fake_call(method, url, payload=None, session=None):
+            in_flight.append(url)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0)
+            in_flight.remove(url)
+            return {"name": url.split('/')[-1], "details": {}}
+
+        with mock.patch.object(aio.API, 'Call', side_effect=fake_call):
+            servers = self.run_async(aio.Servers(["A", "B", "C"], alias="BTDI").Servers())
+
+        self.assertEqual([str(s) for s in servers], ["A", "B", "C"])
+        self.assertEqual(max(peak), 3)
+
+    def testServersOperationReturnsAsyncRequests(self):
+        response = [{"server": "WA1BTDIX01", "isQueued": True,
+                     "links": [{"rel": "status", "id": "wa1-123", "href": "/v2/operations/btdi/status/wa1-123"}]}]
+        with mock.patch.object(aio.API, 'Call', mock.AsyncMock(return_value=response)) as call:
+            requests = self.run_async(aio.Servers(["WA1BTDIX01"], alias="BTDI").PowerOn())
+
+        call.assert_called_once_with('POST', 'operations/BTDI/servers/powerOn', '["WA1BTDIX01"]', session=None)
+        self.assertIsInstance(requests, aio.Requests)
+        self.assertIsInstance(requests.requests[0], aio.Request)
+        self.assertEqual(requests.requests[0].uri, 'operations/BTDI/status/wa1-123')
+
+    def testRequestsWaitUntilComplete(self):
+        requests = aio.Requests([], alias="BTDI")
+        requests.requests = [aio.Request("a", alias="BTDI"), aio.Request("b", alias="BTDI")]
+        statuses = {"operations/BTDI/status/a": ["executing", "succeeded"],
+                    "operations/BTDI/status/b": ["failed"]}
+
+        async def fake_call(method, url, payload=None, session=None):
+            return {"status": statuses[url].pop(0)}
+
+        with mock.patch.object(aio.API, 'Call', side_effect=fake_call):
+            self.assertEqual(self.run_async(requests.WaitUntilComplete(poll_freq=0)), 1)
+
+        self.assertEqual([r.id for r in requests.success_requests], ["a"])
+        self.assertEqual([r.id for r in requests.error_requests], ["b"])
+
+    def testAddedRequestsStayAsync(self):
+        first = aio.Requests([], alias="BTDI")
+        first.requests = [aio.Request("a", alias="BTDI")]
+        second = aio.Requests([], alias="BTDI")
+        second.requests = [aio.Request("b", alias="BTDI")]
+
+        requests = sum([first, second])
+        self.assertIsInstance(requests, aio.Requests)
+        self.assertEqual(sorted(r.id for r in requests.requests), ["a", "b"])
+        with self.assertRaises(ArithmeticError):
+            clc.APIv2.queue.Requests([], alias="BTDI") + first
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/python
+
+import json
+import time
+import base64
+import threading
+import mock
+import requests
+import unittest
+import clc as clc_sdk
+from clc.APIv2.api import API, Credentials
+
+
+class TestClcAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.http_session = mock.MagicMock()
+        self.http_session.headers = {}
+        self.http_session.request.return_value = mock.MagicMock(status_code=200, json=mock.MagicMock(return_value={'a': 1}))
+        self.session = {'http_session': self.http_session, 'token': 'abc', 'alias': 'BTDI', 'location': 'WA1'}
+
+    def testCallPassesHeadersPerRequest(self):
+        self.assertEqual(API.Call('GET', 'servers/BTDI', {'x': 1}, session=self.session), {'a': 1})
+        self.assertEqual(self.http_session.headers, {})
+        kwargs = self.http_session.request.call_args[1]
+        self.assertEqual(kwargs['headers'], {'Authorization': 'Bearer abc', 'content-type': 'application/x-www-form-urlencoded'})
+        self.assertEqual(kwargs['params'], {'x': 1})
+
+    def testCallWithStringPayloadUsesJsonContentType(self):
+        API.Call('POST', 'operations/BTDI/servers/powerOn', '["X"]', session=self.session)
+        kwargs = self.http_session.request.call_args[1]
+        self.assertEqual(kwargs['headers']['content-type'], 'Application/json')
+        self.assertEqual(kwargs['data'], '["X"]')
+
+    def testCallRaisesAPIFailedResponse(self):
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=404, text='{"message": "nope"}', json=mock.MagicMock(return_value={'message': 'nope'}))
+        with self.assertRaises(clc_sdk.APIFailedResponse) as ex:
+            API.Call('GET', 'servers/BTDI/X', session=self.session)
+        self.assertEqual(ex.exception.response_status_code, 404)
+        self.assertEqual(ex.exception.response_json, {'message': 'nope'})
+
+    def testCallRetriesOnceAfter401(self):
+        credentials = API._Credentials(self.session)
+        credentials.Login = mock.MagicMock(side_effect=lambda: setattr(credentials, 'token', 'new'))
+        credentials.username, credentials.password = 'user', 'pass'
+        unauthorized = mock.MagicMock(status_code=401, text='', json=mock.MagicMock(side_effect=ValueError))
+        ok = mock.MagicMock(status_code=200, json=mock.MagicMock(return_value={'a': 1}))
+        self.http_session.request.side_effect = [unauthorized, ok]
+
+        self.assertEqual(API.Call('GET', 'servers/BTDI', session=self.session), {'a': 1})
+        self.assertEqual(credentials.Login.call_count, 1)
+        self.assertEqual(self.http_session.request.call_args[1]['headers']['Authorization'], 'Bearer new')
+
+    def testCallDoesNotRetry401Twice(self):
+        credentials = API._Credentials(self.session)
+        credentials.Login = mock.MagicMock(side_effect=lambda: setattr(credentials, 'token', 'new'))
+        credentials.username, credentials.password = 'user', 'pass'
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=401, text='', json=mock.MagicMock(side_effect=ValueError))
+
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            API.Call('GET', 'servers/BTDI', session=self.session)
+        self.assertEqual(self.http_session.request.call_count, 2)
+
+    def testCallDoesNotRetry401WithoutPassword(self):
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=401, text='', json=mock.MagicMock(side_effect=ValueError))
+
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            API.Call('GET', 'servers/BTDI', session=self.session)
+        self.assertEqual(self.http_session.request.call_count, 1)
+
+    def testCallRetriesServiceUnavailable(self):
+        unavailable = mock.MagicMock(status_code=503, text='', headers={'Retry-After': '1'},
+                                     json=mock.MagicMock(side_effect=ValueError))
+        ok = mock.MagicMock(status_code=200, json=mock.MagicMock(return_value={'a': 1}))
+        self.http_session.request.side_effect = [unavailable, ok]
+
+        with mock.patch('time.sleep') as sleep:
+            self.assertEqual(API.Call('GET', 'servers/BTDI', session=self.session), {'a': 1})
+        sleep.assert_called_once_with(1)
+
+    def testCallDoesNotRetryNonIdempotentMethod(self):
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=503, text='', headers={}, json=mock.MagicMock(side_effect=ValueError))
+
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            API.Call('POST', 'servers/BTDI', session=self.session)
+        self.assertEqual(self.http_session.request.call_count, 1)
+
+    def testCallRetriesConnectionErrors(self):
+        ok = mock.MagicMock(status_code=200, json=mock.MagicMock(return_value={'a': 1}))
+        self.http_session.request.side_effect = [requests.exceptions.ConnectionError(), ok]
+
+        with mock.patch('time.sleep'):
+            self.assertEqual(API.Call('GET', 'servers/BTDI', session=self.session), {'a': 1})
+
+    def testCallRateLimited(self):
+        limiter = mock.MagicMock()
+        with mock.patch.object(API, '_rate_limiter', limiter):
+            API.Call('GET', 'servers/BTDI', session=self.session)
+        limiter.Acquire.assert_called_once_with('servers/BTDI')
+
+    def testConcurrentIdenticalGetsCoalesced(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_request(method, url, **kwargs):
+            calls.append(url)
+            release.wait(5)
+            return mock.MagicMock(status_code=200, json=mock.MagicMock(return_value={'a': [1]}))
+
+        self.http_session.request.side_effect = slow_request
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(API.Call('GET', 'groups/BTDI/x', session=self.session)))
+                   for _ in range(8)]
+        for t in threads:  t.start()
+        while not API._in_flight or list(API._in_flight.values())[0].waiters < 7:  time.sleep(0.01)
+        release.set()
+        for t in threads:  t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'a': [1]}] * 8)
+        results[0]['a'].append(2)
+        self.assertEqual(results[1], {'a': [1]})
+
+    def testCoalescedGetSharesError(self):
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=404, text='{"message": "nope"}', headers={}, json=mock.MagicMock(return_value={'message': 'nope'}))
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            API.Call('GET', 'groups/BTDI/x', session=self.session)
+        self.assertEqual(API._in_flight, {})
+
+    def testSessionCredentialsCreatedOnce(self):
+        credentials = API._Credentials(self.session)
+        self.assertIsInstance(credentials, Credentials)
+        self.assertEqual(credentials.token, 'abc')
+        self.assertIs(API._Credentials(self.session), credentials)
+
+
+class TestClcCredentials(unittest.TestCase):
+
+    def setUp(self):
+        self.http_session = mock.MagicMock()
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=200,
+            json=mock.MagicMock(return_value={'bearerToken': 'tok', 'accountAlias': 'BTDI', 'locationAlias': 'WA1'}))
+        self.credentials = Credentials(username='user', password='pass', http_session=self.http_session)
+
+    def testTokenLogsInOnce(self):
+        self.assertEqual(self.credentials.Token(), 'tok')
+        self.assertEqual(self.credentials.Token(), 'tok')
+        self.assertEqual(self.http_session.request.call_count, 1)
+        self.assertEqual(self.credentials.alias, 'BTDI')
+        self.assertEqual(self.credentials.location, 'WA1')
+
+    def testConcurrentTokenRequestsShareOneLogin(self):
+        threads = [threading.Thread(target=self.credentials.Token) for _ in range(16)]
+        for t in threads:  t.start()
+        for t in threads:  t.join()
+        self.assertEqual(self.http_session.request.call_count, 1)
+
+    def testInvalidateForcesLogin(self):
+        self.credentials.Token()
+        self.credentials.Invalidate()
+        self.credentials.Token()
+        self.assertEqual(self.http_session.request.call_count, 2)
+
+    def testTokenExpiryReadFromJWT(self):
+        claims = base64.urlsafe_b64encode(json.dumps({'exp': 1500000000}).encode('ascii')).decode('ascii').rstrip('=')
+        self.assertEqual(Credentials._TokenExpiry('header.%s.signature' % claims), 1500000000)
+
+    def testTokenExpiryDefaultsToLifetime(self):
+        self.assertAlmostEqual(Credentials._TokenExpiry('opaque'), time.time()+Credentials.TOKEN_LIFETIME, delta=5)
+
+    def testTokenRefreshedBeforeExpiry(self):
+        self.credentials.Token()
+        self.credentials.expires = time.time()+Credentials.REFRESH_MARGIN-1
+        self.credentials.Token()
+        self.assertEqual(self.http_session.request.call_count, 2)
+
+    def testInvalidateIgnoresStaleToken(self):
+        self.credentials.Token()
+        self.assertTrue(self.credentials.Invalidate('old'))
+        self.assertEqual(self.credentials.token, 'tok')
+        self.credentials.Token()
+        self.assertEqual(self.http_session.request.call_count, 1)
+
+    def testMissingCredentialsRaises(self):
+        with mock.patch('clc.v1.output.Status'):
+            with self.assertRaises(clc_sdk.APIV2NotEnabled):
+                Credentials(http_session=self.http_session).Token()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/python
+
+import time
+import mock
+import unittest
+import clc as clc_sdk
+from clc.APIv2.api import API
+from clc.APIv2.cache import ResponseCache
+
+
+URL = 'https://api.ctl.io/v2/servers/BTDI/WA1BTDIX01'
+
+
+class TestClcResponseCache(unittest.TestCase):
+
+    def testKeyNormalizesUrlAndParams(self):
+        self.assertEqual(ResponseCache.Key(URL, {'b': 1, 'a': 2}),
+                         ResponseCache.Key('https://api.ctl.io/v2/servers/btdi/wa1btdix01/', {'a': 2, 'b': 1}))
+        self.assertNotEqual(ResponseCache.Key(URL, {}, session={'username': 'x', 'alias': 'BTDI'}),
+                            ResponseCache.Key(URL, {}))
+
+    def testStoreReturnsCopies(self):
+        cache = ResponseCache()
+        key = cache.Key(URL)
+        cache.Store(key, URL, {'details': {'cpu': 1}})
+        cache.Value(cache.Get(key))['details']['cpu'] = 99
+        self.assertEqual(cache.Value(cache.Get(key)), {'details': {'cpu': 1}})
+
+    def testPerEndpointTTL(self):
+        cache = ResponseCache(ttl=30, ttls={'datacenters': 3600})
+        self.assertEqual(cache.TTL('https://api.ctl.io/v2/datacenters/BTDI/WA1'), 3600)
+        self.assertEqual(cache.TTL(URL), 30)
+        self.assertEqual(cache.TTL('https://api.ctl.io/v2/operations/BTDI/status/wa1-1'), 0)
+
+        key = cache.Key('https://api.ctl.io/v2/operations/BTDI/status/wa1-1')
+        cache.Store(key, 'https://api.ctl.io/v2/operations/BTDI/status/wa1-1', {'status': 'executing'})
+        self.assertIsNone(cache.Get(key))
+
+    def testExpiredEntryWithoutValidatorsDropped(self):
+        cache = ResponseCache()
+        key = cache.Key(URL)
+        cache.Store(key, URL, {})
+        cache.entries[key].expires = time.time() - 1
+        self.assertIsNone(cache.Get(key))
+        self.assertEqual(len(cache.entries), 0)
+
+    def testLRUEviction(self):
+        cache = ResponseCache(max_entries=2)
+        keys = [cache.Key('%s%s' % (URL, i)) for i in range(3)]
+        cache.Store(keys[0], URL, 0)
+        cache.Store(keys[1], URL, 1)
+        cache.Get(keys[0])
+        cache.Store(keys[2], URL, 2)
+        self.assertEqual(list(cache.entries), [keys[0], keys[2]])
+
+    def testInvalidateResourceSubresourcesAndCollection(self):
+        cache = ResponseCache()
+        for url in (URL, URL + '/capabilities', 'https://api.ctl.io/v2/servers/BTDI',
+                    'https://api.ctl.io/v2/servers/BTDI/WA1BTDIX02'):
+            cache.Store(cache.Key(url), url, {})
+        cache.Invalidate(URL)
+        self.assertEqual([entry.path for entry in cache.entries.values()], ['/v2/servers/btdi/wa1btdix02'])
+
+    def testInvalidateServerOperationTargets(self):
+        cache = ResponseCache()
+        cache.Store(cache.Key(URL), URL, {})
+        cache.Invalidate('https://api.ctl.io/v2/operations/BTDI/servers/powerOn', '["WA1BTDIX01"]')
+        self.assertEqual(len(cache.entries), 0)
+
+
+class TestClcAPICallCache(unittest.TestCase):
+
+    def setUp(self):
+        self.http_session = mock.MagicMock()
+        self.http_session.request.return_value = mock.MagicMock(
+            status_code=200, headers={'ETag': '"v1"'}, json=mock.MagicMock(return_value={'a': 1}))
+        self.session = {'http_session': self.http_session, 'token': 'abc', 'alias': 'BTDI', 'location': 'WA1'}
+        self.cache = ResponseCache()
+        patcher = mock.patch.object(API, '_response_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def testRepeatedGetServedFromCache(self):
+        self.assertEqual(API.Call('GET', 'servers/BTDI/X', session=self.session), {'a': 1})
+        self.assertEqual(API.Call('GET', 'servers/BTDI/X', session=self.session), {'a': 1})
+        self.assertEqual(self.http_session.request.call_count, 1)
+
+    def testExpiredEntryRevalidated(self):
+        API.Call('GET', 'servers/BTDI/X', session=self.session)
+        for entry in self.cache.entries.values():
+            entry.expires = time.time() - 1
+        self.http_session.request.return_value = mock.MagicMock(status_code=304, headers={})
+
+        self.assertEqual(API.Call('GET', 'servers/BTDI/X', session=self.session), {'a': 1})
+        self.assertEqual(self.http_session.request.call_args[1]['headers']['If-None-Match'], '"v1"')
+        self.assertTrue(list(self.cache.entries.values())[0].Fresh())
+
+    def testWriteInvalidates(self):
+        API.Call('GET', 'servers/BTDI/X', session=self.session)
+        API.Call('PATCH', 'servers/BTDI/X', '[]', session=self.session)
+        API.Call('GET', 'servers/BTDI/X', session=self.session)
+        self.assertEqual(self.http_session.request.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/python
+
+import os
+import time
+import shutil
+import tempfile
+import mock
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import Datacenter
+from clc.APIv2.capability_cache import CapabilityCache
+
+
+class TestClcCapabilityCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'clc', 'capabilities.sqlite')
+        self.cache = CapabilityCache(path=self.path, max_age=100, refresh_age=10)
+        self.fetch = mock.MagicMock(return_value={'templates': ['centos']})
+
+    def age(self, key, seconds):
+        db = self.cache._Connect()
+        with db:
+            db.execute("UPDATE capabilities SET fetched = ? WHERE key = ?", (time.time() - seconds, key))
+        db.close()
+
+    def testGetFetchesOnceAndSharesAcrossInstances(self):
+        self.assertEqual(self.cache.Get('BTDI/WA1/x', self.fetch), {'templates': ['centos']})
+        other = CapabilityCache(path=self.path)
+        self.assertEqual(other.Get('BTDI/WA1/x', self.fetch), {'templates': ['centos']})
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def testStaleEntryServedAndRefreshedInBackground(self):
+        self.cache.Get('k', self.fetch)
+        self.age('k', 20)
+        self.fetch.return_value = {'templates': ['ubuntu']}
+        self.assertEqual(self.cache.Get('k', self.fetch), {'templates': ['centos']})
+        for _ in range(500):
+            if self.cache.Read('k')[0] == {'templates': ['ubuntu']}:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.cache.Read('k')[0], {'templates': ['ubuntu']})
+
+    def testExpiredEntryRefetched(self):
+        self.cache.Get('k', self.fetch)
+        self.age('k', 200)
+        self.fetch.return_value = {'templates': []}
+        self.assertEqual(self.cache.Get('k', self.fetch), {'templates': []})
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def testBackgroundRefreshFailureKeepsStaleCopy(self):
+        self.cache.Write('k', {'a': 1})
+        self.cache._Refresh('k', mock.MagicMock(side_effect=clc_sdk.APIFailedResponse("Fake message")))
+        self.assertEqual(self.cache.Read('k')[0], {'a': 1})
+        self.assertEqual(self.cache._refreshing, set())
+
+    def testDatacenterCapabilitiesUseCache(self):
+        dc = Datacenter.__new__(Datacenter)
+        dc.alias, dc.location, dc.session = 'btdi', 'wa1', None
+        dc.deployment_capabilities = None
+        with mock.patch.object(Datacenter, '_capability_cache', self.cache), \
+                mock.patch.object(clc_sdk.v2.API, 'Call', return_value={'templates': []}) as call:
+            dc._DeploymentCapabilities()
+            dc.deployment_capabilities = None
+            dc._DeploymentCapabilities()
+        call.assert_called_once_with('GET', 'datacenters/btdi/wa1/deploymentCapabilities', session=None)
+        self.assertEqual(self.cache.Read('BTDI/WA1/deploymentCapabilities')[0], {'templates': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
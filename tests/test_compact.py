@@ -0,0 +1,82 @@
+#!/usr/bin/python
+
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import Server, Group
+from clc.APIv2 import compact
+from clc.APIv2.compact import Compact, CompactServer, CompactPublicIP
+
+
+SERVER = {'id': 'WA1BTDIX01', 'name': 'WA1BTDIX01', 'groupId': 'wa1-1', 'locationId': 'WA1',
+          'os': 'ubuntu14_64Bit', 'status': 'active',
+          'details': {'powerState': 'started', 'memoryGB': 4, 'cpu': 2,
+                      'ipAddresses': [{'internal': '10.0.0.1', 'public': '1.2.3.4'}, {'internal': '10.0.0.2'}],
+                      'disks': [{'id': '0:0', 'sizeGB': 2, 'partitionPaths': ['/boot']}]}}
+
+
+class TestClcCompact(unittest.TestCase):
+
+    def server(self, id='WA1BTDIX01'):
+        return Server(id=id, alias='BTDI', server_obj=dict(SERVER, id=id))
+
+    def testServerRecord(self):
+        record = Compact(self.server())
+        self.assertEqual((record.id, record.alias, record.power_state, record.memory), ('WA1BTDIX01', 'BTDI', 'started', 4))
+        self.assertEqual(record.ip_addresses, ('10.0.0.1', '10.0.0.2'))
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.unknown = 1
+
+    def testRepeatedStringsShared(self):
+        a = Compact(self.server())
+        b = CompactServer.From(dict(SERVER, os=''.join(['ubuntu14', '_64Bit'])))
+        self.assertIs(a.os, b.os)
+        self.assertIs(a.status, b.status)
+
+    def testInternTableBounded(self):
+        with patch.object(compact, '_STRINGS', {}), patch.object(compact, '_MAX_STRINGS', 2):
+            CompactServer.From(dict(SERVER, groupId=''.join(['wa1', '-1'])))
+            self.assertEqual(sorted(compact._STRINGS), ['WA1', 'ubuntu14_64Bit'])
+            record = CompactServer.From(SERVER)
+            self.assertEqual(record.status, 'active')
+            self.assertEqual(len(compact._STRINGS), 2)
+
+    def testRawOnlyWhenKept(self):
+        self.assertRaises(clc_sdk.CLCException, lambda: Compact(self.server()).raw)
+        self.assertEqual(Compact(self.server(), keep_raw=True).raw['id'], 'WA1BTDIX01')
+
+    def testDisksAndPublicIPs(self):
+        server = self.server()
+        disk = Compact(server.Disks().disks[0])
+        self.assertEqual((disk.server_id, disk.id, disk.size, disk.partition_paths), ('WA1BTDIX01', '0:0', 2, ('/boot',)))
+        public_ip = Compact(server.PublicIPs().public_ips[0])
+        self.assertEqual((public_ip.id, public_ip.internal, public_ip.ports), ('1.2.3.4', '10.0.0.1', ()))
+
+    def testPublicIPFromPayload(self):
+        record = CompactPublicIP.From({'internalIPAddress': '10.0.0.1',
+                                       'ports': [{'protocol': 'TCP', 'port': 80, 'portTo': 81}],
+                                       'sourceRestrictions': [{'cidr': '10.0.0.0/24'}]}, id='1.2.3.4')
+        self.assertEqual([str(p) for p in record.ports], ['80-81/TCP'])
+        self.assertEqual(record.source_restrictions, ('10.0.0.0/24',))
+
+    def testGroupRecord(self):
+        group = Group(id='wa1-1', alias='BTDI', group_obj={'id': 'wa1-1', 'name': 'Default Group', 'groups': [{'id': 'wa1-2'}],
+                                                           'links': [{'rel': 'parentGroup', 'id': 'wa1-0'},
+                                                                     {'rel': 'server', 'id': 'X01'}]})
+        record = Compact(group)
+        self.assertEqual((record.parent_id, record.server_ids, record.group_ids), ('wa1-0', ('X01',), ('wa1-2',)))
+
+    def testHandleIsLazy(self):
+        with patch.object(clc_sdk.v2.API, 'Call') as call:
+            handle = Compact(self.server()).Handle()
+            self.assertEqual((handle.id, handle.alias), ('WA1BTDIX01', 'BTDI'))
+            self.assertFalse(call.called)
+
+    def testUnsupportedObject(self):
+        self.assertRaises(clc_sdk.CLCException, Compact, object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+#!/usr/bin/python
+
+import json
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import Server, Servers, DiskPlan
+
+
+DISKS = [{'id': '0:0', 'sizeGB': 1, 'partitionPaths': []},
+         {'id': '0:1', 'sizeGB': 2, 'partitionPaths': ['/boot']},
+         {'id': '0:2', 'sizeGB': 14, 'partitionPaths': ['/']}]
+
+
+def server(id='WA1BTDIX01'):
+    return Server(id=id, alias='BTDI', server_obj={'name': id, 'details': {'disks': [dict(d) for d in DISKS]}})
+
+
+class TestClcDiskPlan(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (patch.object(clc_sdk.v2.API, 'Call'), patch.object(clc_sdk.v2, 'Requests')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def patched_disk_sets(self):
+        return dict((args[1], json.loads(args[2])[0]['value']) for args, kwargs in clc_sdk.v2.API.Call.call_args_list)
+
+    def testPlanSendsOnePatch(self):
+        disks = server().Disks()
+        with disks.Plan() as plan:
+            plan.Add(100, '/data1').Add(50, type='raw').Grow('/', 60).Delete('0:0')
+            self.assertFalse(clc_sdk.v2.API.Call.called)
+
+        self.assertEqual(self.patched_disk_sets(), {'servers/BTDI/WA1BTDIX01': [
+            {'diskId': '0:1', 'sizeGB': 2},
+            {'diskId': '0:2', 'sizeGB': 60},
+            {'sizeGB': 100, 'type': 'partitioned', 'path': '/data1'},
+            {'sizeGB': 50, 'type': 'raw', 'path': None}]})
+        self.assertEqual([d.size for d in disks.disks], [2, 60, 100, 50])
+        self.assertIs(plan.requests, clc_sdk.v2.Requests.return_value)
+
+    def testValidatedLocally(self):
+        plan = server().Disks().Plan()
+        self.assertRaises(clc_sdk.CLCException, plan.Add, 100)
+        self.assertRaises(clc_sdk.CLCException, plan.Add, 2000, '/big')
+        self.assertRaises(clc_sdk.CLCException, plan.Grow, '/', 10)
+        self.assertRaises(clc_sdk.CLCException, plan.Grow, '/missing', 100)
+        for path in ('/a', '/b', '/c'):
+            plan.Add(1024, path)
+        self.assertRaises(clc_sdk.CLCException, plan.Add, 1024, '/d')
+        plan.Delete('0:0')
+        self.assertRaises(clc_sdk.CLCException, plan.Grow, '0:0', 10)
+
+    def testUnchangedOrFailedPlanNotSent(self):
+        self.assertIsNone(server().Disks().Plan().Commit())
+        with self.assertRaises(ValueError):
+            with server().Disks().Plan() as plan:
+                plan.Add(10, '/data')
+                raise ValueError()
+        self.assertFalse(clc_sdk.v2.API.Call.called)
+
+    def testDiskMethodsUsePlan(self):
+        disks = server().Disks()
+        disks.disks[2].Grow(20)
+        disks.disks[0].Delete()
+        self.assertEqual(clc_sdk.v2.API.Call.call_count, 2)
+        self.assertEqual(json.loads(clc_sdk.v2.API.Call.call_args[0][2])[0]['value'],
+                         [{'diskId': '0:1', 'sizeGB': 2}, {'diskId': '0:2', 'sizeGB': 20}])
+
+    def testAddedDisksReloadedBeforeNextPlan(self):
+        def fake_refresh(s):
+            s.data = {'name': s.id, 'details': {'disks': [dict(d) for d in DISKS] + [{'id': '0:3', 'sizeGB': 20, 'partitionPaths': ['/data1']}]}}
+
+        disks = server().Disks()
+        disks.Add(20, '/data1')
+        self.assertEqual([d.id for d in disks.disks], ['0:0', '0:1', '0:2', None])
+        with patch.object(Server, 'Refresh', new=fake_refresh):
+            disks.Add(20, '/data2')
+
+        self.assertEqual(json.loads(clc_sdk.v2.API.Call.call_args[0][2])[0]['value'], [
+            {'diskId': '0:0', 'sizeGB': 1}, {'diskId': '0:1', 'sizeGB': 2}, {'diskId': '0:2', 'sizeGB': 14},
+            {'diskId': '0:3', 'sizeGB': 20}, {'sizeGB': 20, 'type': 'partitioned', 'path': '/data2'}])
+        self.assertEqual(disks.Search('0:3')[0].size, 20)
+
+    def testAddedDiskNotYetReportedRaises(self):
+        def fake_refresh(s):
+            s.data = {'name': s.id, 'details': {'disks': [dict(d) for d in DISKS]}}
+
+        disks = server().Disks()
+        disks.Add(20, '/data1')
+        with patch.object(Server, 'Refresh', new=fake_refresh):
+            self.assertRaises(clc_sdk.CLCException, disks.Add, 20, '/data2')
+
+        self.assertEqual(clc_sdk.v2.API.Call.call_count, 1)
+        self.assertEqual([d.id for d in disks.disks], ['0:0', '0:1', '0:2', None])
+
+    def testCommitAllAcrossServers(self):
+        def fake_refresh(s):
+            s.data = {'name': s.id, 'details': {'disks': [dict(d) for d in DISKS]}}
+
+        with patch.object(Server, 'Refresh', new=fake_refresh):
+            plans = Servers(['WA1BTDIX01', 'WA1BTDIX02'], alias='BTDI').DiskPlans()
+        for plan in plans:
+            plan.Grow('/', 30)
+        DiskPlan.CommitAll(plans)
+
+        disk_sets = self.patched_disk_sets()
+        self.assertEqual(sorted(disk_sets), ['servers/BTDI/WA1BTDIX01', 'servers/BTDI/WA1BTDIX02'])
+        self.assertEqual(disk_sets['servers/BTDI/WA1BTDIX02'][2], {'diskId': '0:2', 'sizeGB': 30})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import FleetTable, Server, Servers
+from clc.APIv2 import fleet
+from clc.APIv2.compact import Compact, CompactServer
+
+
+def server(id, location, power_state, cpu, memory, group_id='wa1-1', storage=None):
+    return {'id': id, 'locationId': location, 'groupId': group_id, 'status': 'active',
+            'details': {'powerState': power_state, 'cpu': cpu, 'memoryGB': memory, 'storageGB': storage},
+            'changeInfo': {'createdDate': 1420855838, 'modifiedDate': 1420855838}}
+
+
+SERVERS = [server('X01', 'WA1', 'started', 2, 4, storage=50),
+           server('X02', 'WA1', 'stopped', 4, 8, storage=100),
+           server('X03', 'CA3', 'started', 8, 16, group_id='ca3-1')]
+
+
+class FleetTableTests(object):
+
+    def setUp(self):
+        self.fleet = FleetTable.FromServers(SERVERS)
+
+    def testColumns(self):
+        self.assertEqual(len(self.fleet), 3)
+        self.assertEqual(list(self.fleet['id']), ['X01', 'X02', 'X03'])
+        self.assertEqual(self.fleet['location'], ['WA1', 'WA1', 'CA3'])
+        self.assertEqual(list(self.fleet['cpu']), [2.0, 4.0, 8.0])
+
+    def testWhere(self):
+        started = self.fleet.Where(power_state='started')
+        self.assertEqual(list(started['id']), ['X01', 'X03'])
+        self.assertEqual(list(self.fleet.Where(location='WA1', cpu__gt=2)['id']), ['X02'])
+        self.assertEqual(list(self.fleet.Where(location__in=('CA3', 'UC1'))['id']), ['X03'])
+        self.assertEqual(len(self.fleet.Where(location='UC1')), 0)
+        self.assertEqual(list(self.fleet.Where(storage__ge=0)['id']), ['X01', 'X02'])
+
+    def testSumSkipsUnknown(self):
+        self.assertEqual(self.fleet.Sum('memory'), 28.0)
+        self.assertEqual(self.fleet.Sum('storage'), 150.0)
+        self.assertEqual(self.fleet.Where(location='UC1').Sum('cpu'), 0.0)
+
+    def testGroupBy(self):
+        self.assertEqual(self.fleet.GroupBy('location', columns=('cpu', 'memory')),
+                         {'WA1': {'count': 2, 'cpu': 6.0, 'memory': 12.0},
+                          'CA3': {'count': 1, 'cpu': 8.0, 'memory': 16.0}})
+        self.assertEqual(self.fleet.Where(location='CA3').GroupBy('power_state', columns=()),
+                         {'started': {'count': 1}})
+
+    def testApiTimestamps(self):
+        payload = server('X04', 'WA1', 'started', 2, 4)
+        payload['changeInfo'] = {'createdDate': '2015-01-10T01:10:38Z', 'modifiedDate': '2015-01-10T01:10:38Z'}
+        for source in (payload, CompactServer.From(payload, alias='BTDI')):
+            table = FleetTable.FromServers([source])
+            self.assertEqual(list(table['created_date']), [1420852238.0])
+            self.assertEqual(list(table.Where(modified_date__gt=1420852237)['id']), ['X04'])
+
+    def testInvalidColumns(self):
+        self.assertRaises(clc_sdk.CLCException, self.fleet.Where, nothing=1)
+        self.assertRaises(clc_sdk.CLCException, self.fleet.Where, location__gt='A')
+        self.assertRaises(clc_sdk.CLCException, self.fleet.Sum, 'location')
+        self.assertRaises(clc_sdk.CLCException, self.fleet.GroupBy, 'cpu')
+
+    def testFromServerObjectsAndRecords(self):
+        servers = [Server(id=s['id'], alias='BTDI', server_obj=s) for s in SERVERS]
+        for source in (servers, [Compact(s) for s in servers]):
+            table = FleetTable.FromServers(source)
+            self.assertEqual(table.GroupBy('group_id', columns=('memory',)),
+                             {'wa1-1': {'count': 2, 'memory': 12.0}, 'ca3-1': {'count': 1, 'memory': 16.0}})
+
+
+class TestClcFleetTablePython(FleetTableTests, unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(fleet, 'numpy', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        FleetTableTests.setUp(self)
+
+
+@unittest.skipIf(fleet.numpy is None, 'numpy not installed')
+class TestClcFleetTableNumpy(FleetTableTests, unittest.TestCase):
+    pass
+
+
+class TestClcServersFleet(unittest.TestCase):
+
+    def testServersFleetSkipsFailures(self):
+        def fake_refresh(s):
+            if s.id == 'X02':
+                raise clc_sdk.APIFailedResponse("Fake message")
+            s.data = [o for o in SERVERS if o['id'] == s.id][0]
+
+        with patch.object(Server, 'Refresh', new=fake_refresh):
+            servers = Servers(['X01', 'X02', 'X03'], alias='BTDI')
+            table = servers.Fleet()
+
+        self.assertEqual(list(table['id']), ['X01', 'X03'])
+        self.assertEqual(list(servers.errors), ['X02'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+
+import threading
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import Group
+
+
+TREE = {
+    'root': ['a', 'b'],
+    'a': ['a1', 'a2'],
+    'b': [],
+    'a1': ['a1x'],
+    'a2': [],
+    'a1x': [],
+}
+
+
+def group_obj(id):
+    return {'id': id, 'name': id, 'groups': [{'id': child} for child in TREE[id]],
+            'links': [{'rel': 'server', 'id': '%s-server' % id}]}
+
+
+class TestClcGroupWalk(unittest.TestCase):
+
+    def setUp(self):
+        self.fetched = []
+        self.lock = threading.Lock()
+
+        def fake_refresh(group):
+            with self.lock:
+                self.fetched.append(group.id)
+            if group.id == 'broken':
+                raise clc_sdk.APIFailedResponse("Fake message")
+            group.data = group_obj(group.id)
+
+        patcher = patch.object(Group, 'Refresh', new=fake_refresh)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.root = Group(id='root', alias='007', group_obj=group_obj('root'))
+
+    def testWalkVisitsEveryGroup(self):
+        results = list(self.root.Walk(workers=4))
+        depths = dict((group.id, depth) for depth, group, servers in results)
+        self.assertEqual(depths, {'root': 0, 'a': 1, 'b': 1, 'a1': 2, 'a2': 2, 'a1x': 3})
+        self.assertEqual(sorted(self.fetched), ['a', 'a1', 'a1x', 'a2', 'b'])
+
+    def testWalkSingleWorkerIsLevelOrder(self):
+        results = list(self.root.Walk(workers=1))
+        self.assertEqual([group.id for depth, group, servers in results], ['root', 'a', 'b', 'a1', 'a2', 'a1x'])
+
+    def testWalkYieldsServers(self):
+        for depth, group, servers in self.root.Walk(workers=2):
+            self.assertEqual(servers.servers_lst, ['%s-server' % group.id])
+
+    def testWalkMaxDepth(self):
+        results = list(self.root.Walk(max_depth=1))
+        self.assertEqual(sorted(group.id for depth, group, servers in results), ['a', 'b', 'root'])
+        self.assertNotIn('a1', self.fetched)
+
+    def testWalkStopsEarly(self):
+        walk = self.root.Walk(workers=1)
+        self.assertEqual(next(walk)[1].id, 'root')
+        walk.close()
+        self.assertTrue(len(self.fetched) <= 1)
+
+    def testWalkRaisesFetchErrors(self):
+        root = Group(id='root', alias='007', group_obj={'id': 'root', 'groups': [{'id': 'broken'}], 'links': []})
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            list(root.Walk())
+
+
+if __name__ == '__main__':
+    unittest.main()
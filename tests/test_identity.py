@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+import gc
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import IdentityMap, Server, Group
+
+
+class Thing(object):
+
+    def __init__(self, id):
+        self.id = id
+        self.refreshed = 0
+
+    def Refresh(self):
+        self.refreshed += 1
+
+
+class TestClcIdentityMap(unittest.TestCase):
+
+    def setUp(self):
+        self.map = IdentityMap()
+
+    def testGetCreatesOnce(self):
+        create = mock.MagicMock(side_effect=lambda: Thing('a'))
+        first = self.map.Get(Thing, 'btdi', 'A', create)
+        self.assertIs(self.map.Get(Thing, 'BTDI', 'a', create), first)
+        self.assertEqual(create.call_count, 1)
+
+    def testUnusedObjectsCollected(self):
+        self.map.Get(Thing, 'BTDI', 'a', lambda: Thing('a'))
+        gc.collect()
+        self.assertEqual(len(self.map.objects), 0)
+
+    def testResolveUncachedReplaces(self):
+        first = self.map.Resolve(Thing, 'BTDI', 'a', lambda: Thing('a'))
+        second = self.map.Resolve(Thing, 'BTDI', 'a', lambda: Thing('a'), cached=False)
+        self.assertIsNot(first, second)
+        self.assertIs(self.map.Get(Thing, 'BTDI', 'a', lambda: Thing('a')), second)
+
+    def testInvalidateAndRefresh(self):
+        a = self.map.Get(Thing, 'BTDI', 'a', lambda: Thing('a'))
+        b = self.map.Get(Thing, 'BTDI', 'b', lambda: Thing('b'))
+        self.map.Refresh(Thing, id='a')
+        self.assertEqual((a.refreshed, b.refreshed), (1, 0))
+        self.map.Invalidate(Thing, alias='btdi', id='b')
+        self.assertIsNot(self.map.Get(Thing, 'BTDI', 'b', lambda: Thing('b')), b)
+        self.assertIs(self.map.Get(Thing, 'BTDI', 'a', lambda: Thing('a')), a)
+
+    def testPerSessionMaps(self):
+        session = {}
+        self.assertIs(IdentityMap.For(session), IdentityMap.For(session))
+        self.assertIsNot(IdentityMap.For(session), IdentityMap.For({}))
+        self.assertIs(IdentityMap.For(), IdentityMap.For(None))
+
+
+class TestClcNavigationSharesObjects(unittest.TestCase):
+
+    def testServersShareGroupAndAccount(self):
+        session = {'alias': 'BTDI'}
+        servers = [Server(id=id, alias='BTDI', server_obj={'groupId': 'wa1-1'}, session=session) for id in ('X01', 'X02')]
+        groups = []
+
+        def fake_group_refresh(group):
+            groups.append(group.id)
+            group.data = {'id': group.id}
+
+        with patch.object(Group, 'Refresh', new=fake_group_refresh), \
+                patch.object(clc_sdk.v2.API, 'Call', return_value={'accountAlias': 'BTDI'}) as call:
+            self.assertIs(servers[0].Group(), servers[1].Group())
+            account = servers[0].Account()
+            self.assertIs(servers[1].Account(), account)
+            fresh = servers[0].Account(cached=False)
+            self.assertIsNot(fresh, account)
+            self.assertIs(servers[1].Account(), fresh)
+
+        self.assertEqual(groups, ['wa1-1'])
+        self.assertEqual(call.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python
+
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import Inventory, Server
+from clc.APIv2.network import Networks
+
+
+CHANGE_INFO = {'createdDate': '2015-01-10T02:10:38Z', 'modifiedDate': '2015-01-10T02:10:38Z'}
+
+GROUPS = {
+    'wa1-root': {'id': 'wa1-root', 'name': 'WA1 Hardware', 'groups': [{'id': 'wa1-default'}], 'links': []},
+    'wa1-default': {'id': 'wa1-default', 'name': 'Default Group', 'groups': [],
+                    'links': [{'rel': 'server', 'id': 'WA1X01'}, {'rel': 'server', 'id': 'WA1X02'}]},
+    'ca3-root': {'id': 'ca3-root', 'name': 'CA3 Hardware', 'groups': [],
+                 'links': [{'rel': 'server', 'id': 'CA3X01'}]},
+}
+
+
+def fake_call(method, url, payload=None, session=None):
+    parts = url.strip('/').split('/')
+    if url == 'datacenters/007':
+        return [{'id': 'WA1'}, {'id': 'CA3'}]
+    elif parts[0] == 'datacenters':
+        if parts[2] == 'BAD':
+            raise clc_sdk.APIFailedResponse("Fake message")
+        return {'name': parts[2], 'links': [{'rel': 'group', 'id': '%s-root' % parts[2].lower(), 'name': 'root'}]}
+    elif parts[0] == 'groups':
+        return dict(GROUPS[parts[2]], changeInfo=dict(CHANGE_INFO))
+    elif parts[0] == 'v2-experimental':
+        return [{'id': 'net-%s' % parts[3], 'name': 'vlan'}]
+    raise AssertionError(url)
+
+
+def fake_refresh(server):
+    if server.id == 'WA1X02':
+        e = clc_sdk.APIFailedResponse("Fake message")
+        e.response_status_code = 404
+        raise e
+    server.data = {'name': server.id, 'details': {'disks': [{'id': '0:0', 'sizeGB': 2}],
+                                                  'ipAddresses': [{'internal': '10.0.0.1', 'public': '1.2.3.4'}]}}
+
+
+class TestClcInventory(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (patch.object(clc_sdk.v2.API, 'Call', side_effect=fake_call),
+                        patch.object(Server, 'Refresh', new=fake_refresh),
+                        patch.object(clc_sdk.v2, 'Networks', Networks)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def testSnapshotIndexesAllDatacenters(self):
+        inventory = Inventory.Snapshot(alias='007')
+        self.assertEqual(sorted(inventory.datacenters), ['CA3', 'WA1'])
+        self.assertEqual(sorted(inventory.groups), ['ca3-root', 'wa1-default', 'wa1-root'])
+        self.assertEqual(sorted(inventory.servers), ['CA3X01', 'WA1X01'])
+        self.assertEqual(sorted(inventory.networks), ['net-CA3', 'net-WA1'])
+        self.assertEqual(inventory.group_servers['wa1-default'], ['WA1X01', 'WA1X02'])
+        self.assertEqual(inventory.server_group['CA3X01'], 'ca3-root')
+        self.assertEqual(inventory.group_parent, {'wa1-root': None, 'wa1-default': 'wa1-root', 'ca3-root': None})
+        self.assertEqual(inventory.group_datacenter['wa1-default'], 'WA1')
+        self.assertIn(('WA1X01', '0:0'), inventory.disks)
+        self.assertIn('1.2.3.4', inventory.public_ips)
+
+    def testSnapshotRecordsErrors(self):
+        inventory = Inventory.Snapshot(alias='007', locations=['WA1', 'BAD'])
+        self.assertEqual(sorted(inventory.errors), ['BAD', 'WA1X02'])
+        self.assertEqual(str(inventory.errors['WA1X02']), 'Server does not exist')
+        self.assertEqual(list(inventory.datacenters), ['WA1'])
+
+    def testGroupAndDatacenterServers(self):
+        inventory = Inventory.Snapshot(alias='007')
+        self.assertEqual(inventory.Group('default group', 'wa1').id, 'wa1-default')
+        self.assertEqual([s.id for s in inventory.DatacenterServers('WA1')], ['WA1X01'])
+        with self.assertRaises(clc_sdk.CLCException):
+            inventory.Group('Default Group', 'CA3')
+
+    def testCompactSnapshot(self):
+        inventory = Inventory.Snapshot(alias='007', compact=True)
+        self.assertEqual(inventory.servers['WA1X01'].__class__.__name__, 'CompactServer')
+        self.assertEqual(inventory.disks[('WA1X01', '0:0')].size, 2)
+        self.assertEqual(inventory.public_ips['1.2.3.4'].internal, '10.0.0.1')
+        self.assertEqual(inventory.Group('default group', 'wa1').server_ids, ('WA1X01', 'WA1X02'))
+        self.assertEqual([s.id for s in inventory.DatacenterServers('WA1')], ['WA1X01'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+import os
+import shutil
+import tempfile
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2.journal import Journal
+from clc.APIv2.queue import Requests, RequestSet
+
+
+def queued(server):
+    return {'server': server, 'isQueued': True,
+            'links': [{'rel': 'status', 'id': 'wa1-%s' % server, 'href': '/v2/operations/BTDI/status/wa1-%s' % server}]}
+
+
+class TestClcJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'clc', 'operations.sqlite')
+        self.journal = Journal(path=self.path)
+        self.statuses = {}
+
+        def fake_call(method, url, payload=None, session=None):
+            return {'status': self.statuses.get(url.split('/')[-1], 'executing')}
+
+        for patcher in (patch.object(clc_sdk.v2.API, 'Call', side_effect=fake_call),
+                        patch.object(Requests, '_journal', self.journal)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def testQueuedRequestsRecorded(self):
+        Requests([queued('WA1BTDIX01'), queued('WA1BTDIX02')], alias='BTDI')
+
+        entries = self.journal.Entries()
+        self.assertEqual([(e['id'], e['alias'], e['context_key'], e['context_val'], e['status']) for e in entries],
+                         [('wa1-WA1BTDIX01', 'BTDI', 'server', 'WA1BTDIX01', None),
+                          ('wa1-WA1BTDIX02', 'BTDI', 'server', 'WA1BTDIX02', None)])
+        self.assertEqual([e['id'] for e in Journal(path=self.path).Entries(pending=True)], ['wa1-WA1BTDIX01', 'wa1-WA1BTDIX02'])
+
+    def testStatusChangesRecorded(self):
+        request = Requests([queued('WA1BTDIX01')], alias='BTDI').requests[0]
+        request.Status()
+        self.assertEqual(self.journal.Entries()[0]['status'], 'executing')
+
+        self.statuses['wa1-WA1BTDIX01'] = 'succeeded'
+        request.Status()
+        entry = self.journal.Entries()[0]
+        self.assertEqual(entry['status'], 'succeeded')
+        self.assertIsNotNone(entry['time_completed'])
+        self.assertEqual(self.journal.Entries(pending=True), [])
+        self.journal.Purge()
+        self.assertEqual(self.journal.Entries(), [])
+
+    def testResumePollsOnlyUnfinished(self):
+        Requests([queued('WA1BTDIX01'), queued('WA1BTDIX02'), queued('WA1BTDIX03')], alias='BTDI')
+        self.statuses['wa1-WA1BTDIX01'] = 'succeeded'
+        Requests.Resume(self.journal).requests[0].Status()
+        clc_sdk.v2.API.Call.reset_mock()
+
+        self.statuses.update({'wa1-WA1BTDIX02': 'succeeded', 'wa1-WA1BTDIX03': 'failed'})
+        requests = Requests.Resume(Journal(path=self.path))
+        self.assertIsInstance(requests, RequestSet)
+        self.assertEqual([r.id for r in requests], ['wa1-WA1BTDIX02', 'wa1-WA1BTDIX03'])
+        self.assertEqual(requests.WaitUntilComplete(poll_freq=0.01), 1)
+
+        self.assertEqual(sorted(args[1] for args, _ in clc_sdk.v2.API.Call.call_args_list),
+                         ['operations/BTDI/status/wa1-WA1BTDIX02', 'operations/BTDI/status/wa1-WA1BTDIX03'])
+        self.assertEqual(self.journal.Entries(pending=True), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+#!/usr/bin/python
+
+import unittest
+from clc.APIv2 import Server, Account, PublicIP
+from clc.APIv2.naming import AttributeResolver, CamelCase
+
+
+class TestClcAttributeResolver(unittest.TestCase):
+
+    def testCamelCase(self):
+        self.assertEqual(CamelCase('power_state'), 'powerState')
+        self.assertEqual(CamelCase('in_maintenance_mode'), 'inMaintenanceMode')
+        self.assertEqual(CamelCase('name'), 'name')
+
+    def testResolvedOnceAndRemembered(self):
+        resolver = AttributeResolver({'memory': 'memoryGB'})
+        self.assertEqual(resolver('memory'), 'memoryGB')
+        self.assertEqual(resolver('power_state'), 'powerState')
+        self.assertEqual(resolver.keys['power_state'], 'powerState')
+
+    def testModelOverrides(self):
+        self.assertEqual(Server._Key('storage'), 'storageGB')
+        self.assertEqual(Server._Key('secondary_ip_addresses'), 'secondaryIPAddresses')
+        self.assertEqual(Account._Key('primary_datacenter'), 'primaryDataCenter')
+        self.assertEqual(PublicIP._Key('source_restrictions'), 'source_restrictions')
+
+    def testServerAttributes(self):
+        server = Server(id='WA1BTDIX01', alias='BTDI', server_obj={
+            'powerState': 'started', 'details': {'memoryGB': 4, 'secondaryIPAddresses': []},
+            'changeInfo': {'createdBy': 'user'}})
+        self.assertEqual(server.power_state, 'started')
+        self.assertEqual(server.memory, 4)
+        self.assertEqual(server.secondary_ip_addresses, [])
+        self.assertEqual(server.created_by, 'user')
+        self.assertRaises(AttributeError, getattr, server, 'no_such_field')
+
+
+if __name__ == '__main__':
+    unittest.main()
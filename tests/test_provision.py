@@ -0,0 +1,91 @@
+#!/usr/bin/python
+
+import threading
+import concurrent.futures
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import ProvisioningPipeline, Server
+from clc.APIv2.template import Templates
+
+
+DEFAULTS = {'cpu': 2, 'memoryGB': 4, 'networkId': 'net-1', 'templateName': None}
+
+
+class FakeRequest(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.future = concurrent.futures.Future()
+
+    def AsFuture(self):
+        return self.future
+
+    def Server(self, lazy=False):
+        return 'WA1BTDI%s' % self.name.upper()
+
+
+class TestClcProvisioningPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+        self.lock = threading.Lock()
+
+        def fake_create(**kwargs):
+            if kwargs['name'] == 'bad':
+                raise clc_sdk.CLCException("Invalid name")
+            request = FakeRequest(kwargs['name'])
+            if kwargs['name'] == 'fail':
+                request.future.set_exception(clc_sdk.CLCException("newserver execution failed"))
+            else:
+                request.future.set_result(request)
+            with self.lock:
+                self.created.append(kwargs)
+            return mock.MagicMock(requests=[request])
+
+        group = mock.MagicMock(location_id='WA1')
+        group.Defaults.side_effect = lambda key: DEFAULTS.get(key)
+        datacenter = mock.MagicMock()
+        datacenter.Templates.return_value = Templates([{'name': 'UBUNTU-14-64-TEMPLATE'}, {'name': 'CENTOS-6-64-TEMPLATE'}])
+
+        for patcher in (patch.object(Server, 'Create', new=staticmethod(fake_create)),
+                        patch.object(clc_sdk.v2, 'Group', return_value=group),
+                        patch.object(clc_sdk.v2, 'Datacenter', return_value=datacenter)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def testResolvedOnceAndApplied(self):
+        pipeline = ProvisioningPipeline(name='web', template='centos', group_id='wa1-1', memory=8, alias='BTDI')
+        results = list(pipeline.Run(count=5))
+
+        self.assertEqual(sorted(index for index, _, _ in results), [0, 1, 2, 3, 4])
+        self.assertEqual(set(server for _, server, _ in results), set(['WA1BTDIWEB']))
+        self.assertEqual(clc_sdk.v2.Group.call_count, 1)
+        self.assertEqual(len(self.created), 5)
+        for args in self.created:
+            self.assertEqual((args['cpu'], args['memory'], args['network_id'], args['template']),
+                             (2, 8, 'net-1', 'CENTOS-6-64-TEMPLATE'))
+
+    def testFailuresReportedPerServer(self):
+        pipeline = ProvisioningPipeline(template='UBUNTU-14-64-TEMPLATE', group_id='wa1-1', alias='BTDI', max_in_flight=2)
+        results = dict((index, (server, error)) for index, server, error in
+                       pipeline.Run(servers=[{'name': 'ok'}, {'name': 'bad'}, {'name': 'fail'}, {'name': 'ok2'}]))
+
+        self.assertEqual(results[0], ('WA1BTDIOK', None))
+        self.assertEqual(results[3], ('WA1BTDIOK2', None))
+        self.assertEqual(str(results[1][1]), 'Invalid name')
+        self.assertEqual(str(results[2][1]), 'newserver execution failed')
+
+    def testZeroCountBuildsNothing(self):
+        pipeline = ProvisioningPipeline(template='UBUNTU-14-64-TEMPLATE', group_id='wa1-1', alias='BTDI')
+        self.assertEqual(list(pipeline.Run(count=0)), [])
+        self.assertEqual(self.created, [])
+
+    def testMissingTemplateRaises(self):
+        with self.assertRaises(clc_sdk.CLCException):
+            ProvisioningPipeline(name='web', template='windows', group_id='wa1-1', alias='BTDI')
+
+
+if __name__ == '__main__':
+    unittest.main()
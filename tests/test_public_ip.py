@@ -0,0 +1,111 @@
+#!/usr/bin/python
+
+import json
+import mock
+from mock import patch
+import unittest
+import clc as clc_sdk
+from clc.APIv2 import PublicIPs
+
+
+RULES = {
+    '1.1.1.1': {'ports': [{'protocol': 'TCP', 'port': 21}, {'protocol': 'TCP', 'port': 80}], 'sourceRestrictions': []},
+    '2.2.2.2': {'ports': [{'protocol': 'TCP', 'port': 443}], 'sourceRestrictions': [{'cidr': '10.0.0.0/24'}]},
+}
+
+
+class TestClcPublicIPEdit(unittest.TestCase):
+
+    def setUp(self):
+        self.puts = []
+        self.failing = []
+        self.failing_loads = []
+
+        def fake_call(method, url, payload=None, session=None):
+            public_ip = url.split('/')[-1]
+            if method == 'GET':
+                if public_ip in self.failing_loads:
+                    raise clc_sdk.APIFailedResponse("Response code 503")
+                return json.loads(json.dumps(RULES[public_ip]))
+            if public_ip in self.failing:
+                raise clc_sdk.APIFailedResponse("Response code 500")
+            self.puts.append((public_ip, json.loads(payload)))
+            return {'href': '/v2/operations/BTDI/status/%s' % public_ip}
+
+        for patcher in (patch.object(clc_sdk.v2.API, 'Call', side_effect=fake_call),
+                        patch.object(clc_sdk.v2, 'Requests')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        server = mock.MagicMock(alias='BTDI', id='WA1BTDIX01')
+        self.public_ips = PublicIPs(server, [{'internal': '10.0.0.1', 'public': '1.1.1.1'},
+                                             {'internal': '10.0.0.2', 'public': '2.2.2.2'}])
+
+    def testUpdateOutsideEditPutsImmediately(self):
+        self.public_ips.public_ips[0].AddPort('TCP', 22)
+        self.public_ips.public_ips[0].AddSourceRestriction('10.1.0.0/16')
+        self.assertEqual(len(self.puts), 2)
+
+    def testEditSendsOnePutPerChangedIP(self):
+        with self.public_ips.Edit() as edit:
+            first = edit.public_ips[0]
+            for port in first.ports:
+                if port.port == 21:
+                    port.Delete()
+            first.AddPorts([{'protocol': 'TCP', 'port': 22}, {'protocol': 'UDP', 'port': 53}])
+            first.AddSourceRestriction('10.1.0.0/16')
+            self.assertEqual(self.puts, [])
+
+        self.assertEqual(self.puts, [('1.1.1.1', {'ports': [{'protocol': 'TCP', 'port': 80},
+                                                            {'protocol': 'TCP', 'port': 22},
+                                                            {'protocol': 'UDP', 'port': 53}],
+                                                  'sourceRestrictions': [{'cidr': '10.1.0.0/16'}]})])
+        self.assertIsNotNone(edit.requests)
+        self.assertIsNone(first.changes)
+
+    def testEditSkipsUnchangedRules(self):
+        with self.public_ips.public_ips[1].Edit() as edit:
+            public_ip = edit.public_ips[0]
+            public_ip.source_restrictions[0].Delete()
+            public_ip.AddSourceRestriction('10.0.0.0/24')
+        self.assertEqual(self.puts, [])
+        self.assertIsNone(edit.requests)
+
+    def testEditRolledBackOnError(self):
+        public_ip = self.public_ips.public_ips[0]
+        with self.assertRaises(ValueError):
+            with public_ip.Edit():
+                public_ip.AddPort('TCP', 22)
+                raise ValueError()
+        self.assertEqual(self.puts, [])
+        self.assertEqual([str(p) for p in public_ip.ports], ['21/TCP', '80/TCP'])
+
+    def testPartialCommitKeepsQueuedRequests(self):
+        self.failing.append('2.2.2.2')
+        edit = self.public_ips.Edit()
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            with edit:
+                edit.public_ips[0].AddPort('TCP', 22)
+                edit.public_ips[1].AddPort('TCP', 22)
+
+        self.assertEqual([ip for ip, _ in self.puts], ['1.1.1.1'])
+        self.assertEqual(edit.requests.requests, [clc_sdk.v2.Requests.return_value])
+
+    def testFailedLoadLeavesNoIPInEdit(self):
+        self.failing_loads.append('2.2.2.2')
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            with self.public_ips.Edit():
+                pass
+
+        first = self.public_ips.public_ips[0]
+        self.assertIsNone(first.changes)
+        first.AddPort('TCP', 22)
+        self.assertEqual([ip for ip, _ in self.puts], ['1.1.1.1'])
+
+    def testNestedEditRejected(self):
+        with self.public_ips.public_ips[0].Edit():
+            self.assertRaises(clc_sdk.CLCException, self.public_ips.Edit().Begin)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+#!/usr/bin/python
+
+import time
+import threading
+import mock
+import unittest
+import clc as clc_sdk
+import concurrent.futures
+from clc.APIv2.queue import Requests, RequestSet, Request, Poller
+
+
+class FakeRequest(object):
+
+    def __init__(self, id, statuses, delay=0):
+        self.id = id
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.polls = []
+        self.data = {'status': None}
+
+    def Status(self):
+        self.polls.append(time.time())
+        time.sleep(self.delay)
+        self.data['status'] = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return self.data['status']
+
+
+class TestClcRequestsWaitUntilComplete(unittest.TestCase):
+
+    def makeRequests(self, fakes):
+        requests = Requests([], alias='BTDI')
+        requests.requests = list(fakes)
+        return requests
+
+    def testClassifiesResults(self):
+        ok = FakeRequest('ok', ['executing', 'succeeded'])
+        bad = FakeRequest('bad', ['failed'])
+        requests = self.makeRequests([ok, bad])
+
+        self.assertEqual(requests.WaitUntilComplete(poll_freq=0.01), 1)
+        self.assertEqual(requests.success_requests, [ok])
+        self.assertEqual(requests.error_requests, [bad])
+        self.assertEqual(requests.requests, [])
+
+    def testPollsConcurrently(self):
+        fakes = [FakeRequest(str(i), ['succeeded'], delay=0.2) for i in range(8)]
+        requests = self.makeRequests(fakes)
+
+        start = time.time()
+        requests.WaitUntilComplete(poll_freq=0.01, workers=8)
+        self.assertTrue(time.time() - start < 1)
+
+    def testReturnsWithoutTrailingSleep(self):
+        requests = self.makeRequests([FakeRequest('a', ['succeeded'])])
+
+        start = time.time()
+        requests.WaitUntilComplete(poll_freq=5)
+        self.assertTrue(time.time() - start < 1)
+
+    def testTimeoutLeavesPendingRequests(self):
+        pending = FakeRequest('slow', ['executing'])
+        done = FakeRequest('fast', ['succeeded'])
+        requests = self.makeRequests([pending, done])
+
+        with self.assertRaises(clc_sdk.RequestTimeoutException) as ex:
+            requests.WaitUntilComplete(poll_freq=0.01, timeout=0.1)
+        self.assertEqual(ex.exception.status, 'executing')
+        self.assertEqual(requests.requests, [pending])
+        self.assertEqual(requests.success_requests, [done])
+
+    def testStatusErrorPropagates(self):
+        broken = FakeRequest('broken', ['x'])
+        broken.Status = mock.MagicMock(side_effect=clc_sdk.APIFailedResponse("boom"))
+        requests = self.makeRequests([broken])
+
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            requests.WaitUntilComplete(poll_freq=0.01)
+
+
+class TestClcPoller(unittest.TestCase):
+
+    def testIntervalsBackOff(self):
+        request = FakeRequest('a', ['executing'] * 4 + ['succeeded'])
+        poller = Poller(poll_freq=0.02, max_poll_freq=0.08, backoff=2)
+        poller.Add(request, lambda r, status, error: None)
+        poller.Run()
+
+        gaps = [b - a for a, b in zip(request.polls, request.polls[1:])]
+        self.assertEqual(len(gaps), 4)
+        self.assertTrue(gaps[0] < gaps[2])
+        self.assertTrue(gaps[3] < 0.15)
+
+    def testCallbackReceivesStatus(self):
+        results = []
+        poller = Poller(poll_freq=0.01)
+        poller.Add(FakeRequest('a', ['queued', 'succeeded']), lambda r, status, error: results.append((r.id, status)))
+        poller.Run()
+        self.assertEqual(results, [('a', 'succeeded')])
+
+    def testSaturatedPoolBlocksInsteadOfSpinning(self):
+        requests = [FakeRequest(str(i), ['succeeded'], delay=0.1) for i in range(4)]
+        poller = Poller(workers=2, poll_freq=0)
+        for request in requests:
+            poller.Add(request, lambda r, status, error: None)
+
+        with mock.patch('concurrent.futures.wait', wraps=concurrent.futures.wait) as wait:
+            poller.Run(timeout=5)
+        self.assertTrue(all(r.data['status'] == 'succeeded' for r in requests))
+        self.assertTrue(wait.call_count < 10)
+
+    def testFailingCallbackDoesNotStopForeverPoller(self):
+        results = []
+        done = threading.Event()
+
+        def callback(r, status, error):
+            if r.id == 'bad':
+                raise ValueError()
+            results.append(r.id)
+            done.set()
+
+        poller = Poller(poll_freq=0.01)
+        thread = threading.Thread(target=poller.Run, kwargs={'forever': True})
+        thread.daemon = True
+        thread.start()
+        poller.Add(FakeRequest('bad', ['succeeded']), callback)
+        time.sleep(0.05)
+        poller.Add(FakeRequest('a', ['succeeded']), callback)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(results, ['a'])
+        self.assertTrue(thread.is_alive())
+
+    def testCancelledRequestsDropped(self):
+        request = FakeRequest('a', ['executing'])
+        poller = Poller(poll_freq=0.01, max_poll_freq=0.01)
+        poller.Add(request, lambda r, status, error: None, cancelled=lambda: len(request.polls) >= 2)
+        poller.Run(timeout=5)
+        self.assertEqual(len(request.polls), 2)
+
+    def testSharedPollerReplacedWhenThreadDies(self):
+        dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        with mock.patch.object(Poller, '_shared', Poller()), mock.patch.object(Poller, '_shared_thread', dead):
+            stale = Poller._shared
+            self.assertIsNot(Poller.Shared(), stale)
+            self.assertTrue(Poller._shared_thread.is_alive())
+
+
+class TestClcFutures(unittest.TestCase):
+
+    def makeRequest(self, id, status):
+        request = Request(id, alias='BTDI', request_obj={'context_key': 'server', 'context_val': id})
+        request.Status = mock.MagicMock(return_value=status)
+        return request
+
+    def testAsFutureSucceeds(self):
+        request = self.makeRequest('a', 'succeeded')
+        self.assertIs(request.AsFuture().result(timeout=5), request)
+        self.assertNotEqual(request.time_completed, None)
+
+    def testAsFutureFails(self):
+        future = self.makeRequest('a', 'failed').AsFuture()
+        with self.assertRaises(clc_sdk.CLCException) as ex:
+            future.result(timeout=5)
+        self.assertEqual(str(ex.exception), "server a execution failed")
+
+    def testAsFuturesShareOnePoller(self):
+        requests = Requests([], alias='BTDI')
+        requests.requests = [self.makeRequest('a', 'succeeded'), self.makeRequest('b', 'succeeded')]
+        other = self.makeRequest('c', 'succeeded')
+
+        futures = requests.AsFutures() + [other.AsFuture()]
+        done, not_done = concurrent.futures.wait(futures, timeout=5)
+        self.assertEqual(len(done), 3)
+        self.assertIs(Poller.Shared(), Poller.Shared())
+
+    def testCallbacksInvoked(self):
+        results = []
+        called = threading.Event()
+        future = self.makeRequest('a', 'succeeded').AsFuture()
+        future.add_done_callback(lambda f: (results.append(f.result().id), called.set()))
+        self.assertTrue(called.wait(5))
+        self.assertEqual(results, ['a'])
+
+
+class TestClcRequestSet(unittest.TestCase):
+
+    def makeRequests(self, alias, ids, status='notStarted'):
+        requests = Requests([], alias=alias)
+        requests.requests = [Request(id, alias=alias, request_obj={'context_key': 'server', 'context_val': 'WA1%sX%s' % (alias, id),
+                                                                   'status': status})
+                             for id in ids]
+        return requests
+
+    def testAddInPlaceWithoutDuplicates(self):
+        first = self.makeRequests('BTDI', ['a', 'b'])
+        requests = RequestSet([first])
+        merged = requests.Add(self.makeRequests('BTDI', ['c']))
+        requests += first
+        requests += first.requests[0]
+
+        self.assertIs(merged, requests)
+        self.assertEqual([r.id for r in requests], ['a', 'b', 'c'])
+        self.assertEqual(requests.alias, 'BTDI')
+        self.assertIs(requests.Get('b'), first.requests[1])
+        self.assertIsNone(requests.Get('z'))
+
+    def testAddAcrossAliases(self):
+        requests = self.makeRequests('BTDI', ['a']) + self.makeRequests('KRAP', ['b'])
+
+        self.assertIsInstance(requests, RequestSet)
+        self.assertIsNone(requests.alias)
+        self.assertEqual(requests.aliases, set(['BTDI', 'KRAP']))
+        by_alias = requests.ByAlias()
+        self.assertEqual(sorted(by_alias), ['BTDI', 'KRAP'])
+        self.assertEqual(by_alias['KRAP'].alias, 'KRAP')
+        self.assertEqual([r.id for r in by_alias['KRAP']], ['b'])
+
+    def testSumStillSupported(self):
+        requests = sum([self.makeRequests('BTDI', ['a']), self.makeRequests('BTDI', ['b']), self.makeRequests('BTDI', ['a'])])
+        self.assertEqual(sorted(r.id for r in requests), ['a', 'b'])
+
+    def testIndexes(self):
+        requests = RequestSet([self.makeRequests('BTDI', ['a', 'b']), self.makeRequests('BTDI', ['c'], status='succeeded')])
+
+        by_status = requests.ByStatus()
+        self.assertEqual(sorted(by_status), ['notStarted', 'succeeded'])
+        self.assertEqual([r.id for r in by_status['notStarted']], ['a', 'b'])
+        self.assertEqual([r.id for r in requests.ByContext()[('server', 'WA1BTDIXc')]], ['c'])
+
+    def testCompletedRequestsKeepTheirList(self):
+        done = self.makeRequests('BTDI', ['a'])
+        done.success_requests, done.requests = done.requests, []
+        requests = RequestSet([done, self.makeRequests('BTDI', ['a', 'b'])])
+
+        self.assertEqual([r.id for r in requests.success_requests], ['a'])
+        self.assertEqual([r.id for r in requests.requests], ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
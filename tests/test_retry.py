@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+import time
+import mock
+import unittest
+from clc.APIv2.retry import RetryPolicy, TokenBucket, RateLimiter
+
+
+class TestClcRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(retries=3, backoff=1, max_backoff=5)
+
+    def testIdempotentMethodRetried(self):
+        delay = self.policy.Delay('GET', 0, status=503)
+        self.assertTrue(0 <= delay <= 1)
+
+    def testNonIdempotentMethodNotRetried(self):
+        self.assertEqual(self.policy.Delay('POST', 0, status=503), None)
+        self.assertEqual(self.policy.Delay('PATCH', 0, connection_error=True), None)
+
+    def testTooManyRequestsRetriedForAnyMethod(self):
+        self.assertNotEqual(self.policy.Delay('POST', 0, status=429), None)
+
+    def testClientErrorsNotRetried(self):
+        self.assertEqual(self.policy.Delay('GET', 0, status=404), None)
+
+    def testRetriesExhausted(self):
+        self.assertEqual(self.policy.Delay('GET', 3, status=503), None)
+
+    def testBackoffCapped(self):
+        for _ in range(20):
+            self.assertTrue(self.policy.Delay('GET', 2, status=503) <= 4)
+
+    def testRetryAfterSeconds(self):
+        self.assertEqual(self.policy.Delay('GET', 0, status=503, retry_after='3'), 3)
+        self.assertEqual(self.policy.Delay('GET', 0, status=503, retry_after='60'), 5)
+
+    def testRetryAfterHttpDate(self):
+        retry_after = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time()+2))
+        self.assertTrue(0 < self.policy.Delay('GET', 0, status=429, retry_after=retry_after) <= 2)
+
+
+class TestClcRateLimiter(unittest.TestCase):
+
+    def testEndpoint(self):
+        self.assertEqual(RateLimiter.Endpoint('servers/BTDI/WA1BTDIX01'), 'servers')
+        self.assertEqual(RateLimiter.Endpoint('/v2/operations/btdi/status/123'), 'operations')
+        self.assertEqual(RateLimiter.Endpoint('/v2-experimental/networks/BTDI/WA1'), 'networks')
+
+    def testBucketsPerEndpoint(self):
+        limiter = RateLimiter(rate=5, endpoints={'operations': (1, 2)})
+        self.assertIs(limiter._Bucket('servers/A'), limiter._Bucket('servers/B'))
+        self.assertEqual(limiter._Bucket('servers/A').rate, 5)
+        self.assertEqual(limiter._Bucket('operations/A').capacity, 2)
+
+    def testBurstThenThrottle(self):
+        bucket = TokenBucket(rate=1, burst=2)
+        with mock.patch('time.sleep') as sleep:
+            sleep.side_effect = lambda s: setattr(bucket, 'timestamp', bucket.timestamp - s)
+            bucket.Acquire()
+            bucket.Acquire()
+            self.assertEqual(sleep.call_count, 0)
+            bucket.Acquire()
+            self.assertEqual(sleep.call_count, 1)
+
+    def testPauseBlocksCallers(self):
+        bucket = TokenBucket(rate=100)
+        bucket.Pause(10)
+        with mock.patch('time.sleep', side_effect=StopIteration) as sleep:
+            with self.assertRaises(StopIteration):
+                bucket.Acquire()
+        self.assertTrue(sleep.call_args[0][0] > 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
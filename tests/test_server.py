@@ -6,6 +6,7 @@ from mock import patch, create_autospec
 import unittest
 import clc as clc_sdk
 from clc.APIv2 import Servers, Server
+from clc.APIv2.queue import Requests
 
 
 # Python is not my primary language, so if this looks laughably simple,
@@ -212,5 +213,207 @@ class TestClcServer(unittest.TestCase):
             e.response_json = fail_json
         return e
 
+class TestClcServers(unittest.TestCase):
+
+    # Server.Refresh is patched with a plain function so it binds as a method
+    def setUp(self):
+        self.refreshed = []
+
+        def fake_refresh(server):
+            self.refreshed.append(server.id)
+            if server.id == 'missing':
+                e = clc_sdk.APIFailedResponse("Fake message")
+                e.response_status_code = 404
+                raise e
+            server.data = {'name': server.id}
+
+        patcher = patch.object(Server, 'Refresh', new=fake_refresh)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def testServersPreservesOrder(self):
+        servers = Servers(['a', 'b', 'c'], alias='007').Servers(workers=3)
+        self.assertEqual([s.id for s in servers], ['a', 'b', 'c'])
+
+    def testServersRaisesFirstError(self):
+        with self.assertRaises(clc_sdk.CLCException) as ex:
+            Servers(['a', 'missing'], alias='007').Servers()
+        self.assertEqual(str(ex.exception), "Server does not exist")
+
+    def testServersReportsPartialFailure(self):
+        servers = Servers(['a', 'missing', 'c'], alias='007')
+        result = servers.Servers(raise_errors=False)
+        self.assertEqual([s.id for s in result], ['a', 'c'])
+        self.assertEqual(list(servers.errors.keys()), ['missing'])
+
+    def testServersCached(self):
+        servers = Servers(['a', 'b'], alias='007')
+        servers.Servers()
+        servers.Servers()
+        self.assertEqual(sorted(self.refreshed), ['a', 'b'])
+
+    def testLazyServerOperationDoesNotLoad(self):
+        server = Server(id='a', alias='007', lazy=True)
+        with patch.object(clc_sdk.v2.API, 'Call', return_value=[]) as call, \
+                patch.object(clc_sdk.v2, 'Requests'):
+            server.PowerOn()
+        call.assert_called_once_with('POST', 'operations/007/servers/powerOn', '["a"]', session=None)
+        self.assertEqual(str(server), 'a')
+        self.assertEqual(self.refreshed, [])
+
+    def testLazyServerLoadsOnAttributeAccess(self):
+        server = Server(id='a', alias='007', lazy=True)
+        self.assertEqual(server.name, 'a')
+        self.assertEqual(server.data, {'name': 'a'})
+        self.assertEqual(self.refreshed, ['a'])
+
+    def testLazyServerMissingRaisesOnAccess(self):
+        server = Server(id='missing', alias='007', lazy=True)
+        with self.assertRaises(clc_sdk.CLCException):
+            server.name
+
+    def testServersLazyMakesNoCalls(self):
+        servers = Servers(['a', 'b'], alias='007').Servers(lazy=True)
+        self.assertEqual([s.id for s in servers], ['a', 'b'])
+        self.assertEqual(self.refreshed, [])
+
+
+class TestClcServersOperation(unittest.TestCase):
+
+    def setUp(self):
+        self.chunks = []
+
+        def fake_call(method, url, payload=None, session=None):
+            chunk = json.loads(payload)
+            self.chunks.append(chunk)
+            if 'WA1BTDIBOOM' in chunk:
+                raise clc_sdk.CLCException("connection reset")
+            if 'WA1BTDIHTML' in chunk:
+                e = clc_sdk.APIFailedResponse("Response code 502.  <html>Bad Gateway</html>")
+                e.response_json = {}
+                raise e
+            return [{'server': id, 'isQueued': False, 'errorMessage': 'Server is locked'} if id == 'WA1BTDIBAD' else
+                    {'server': id, 'isQueued': True, 'links': [{'rel': 'status', 'id': 'op-%s' % id}]} for id in chunk]
+
+        for patcher in (patch.object(clc_sdk.v2.API, 'Call', side_effect=fake_call),
+                        patch.object(clc_sdk.v2, 'Requests', Requests)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def testChunkedAndDeduplicated(self):
+        servers = Servers(['WA1BTDIX%02d' % i for i in range(7)] + ['WA1BTDIX01', 'wa1btdix02'], alias='BTDI')
+        requests = servers.PowerOn(chunk_size=3, workers=2)
+        self.assertEqual(sorted(len(c) for c in self.chunks), [1, 3, 3])
+        self.assertEqual(sorted(r.id for r in requests.requests), ['op-WA1BTDIX%02d' % i for i in range(7)])
+        self.assertEqual(servers.operation_errors, {})
+
+    def testFailuresIsolated(self):
+        servers = Servers(['WA1BTDIX01', 'WA1BTDIBAD', 'WA1BTDIX02', 'WA1BTDIBOOM', 'WA1BTDIX03'], alias='BTDI')
+        requests = servers.Reboot(chunk_size=2)
+        self.assertEqual(sorted(r.id for r in requests.requests), ['op-WA1BTDIX01', 'op-WA1BTDIX03'])
+        self.assertEqual(sorted(servers.operation_errors), ['WA1BTDIBAD', 'WA1BTDIBOOM', 'WA1BTDIX02'])
+        self.assertIn('Server is locked', str(servers.operation_errors['WA1BTDIBAD']))
+
+    def testUnparsedChunkFailureReported(self):
+        servers = Servers(['WA1BTDIX01', 'WA1BTDIHTML', 'WA1BTDIX02'], alias='BTDI')
+        servers.errors = {'WA1BTDIGONE': clc_sdk.CLCException("Server does not exist")}
+        requests = servers.Reboot(chunk_size=2)
+        self.assertEqual([r.id for r in requests.requests], ['op-WA1BTDIX02'])
+        self.assertEqual(sorted(servers.operation_errors), ['WA1BTDIHTML', 'WA1BTDIX01'])
+        self.assertEqual(list(servers.errors), ['WA1BTDIGONE'])
+
+        with self.assertRaises(clc_sdk.APIFailedResponse):
+            Servers(['WA1BTDIHTML'], alias='BTDI').Reboot()
+
+    def testRaisesWhenNothingQueued(self):
+        with self.assertRaises(clc_sdk.CLCException):
+            Servers(['WA1BTDIBAD'], alias='BTDI').PowerOff()
+
+
+class TestClcServerClone(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(id='WA1BTDIWEB01', alias='BTDI', server_obj={
+            'name': 'WA1BTDIWEB01', 'groupId': 'wa1-1', 'storageType': 'standard', 'type': 'standard',
+            'description': '', 'details': {'cpu': 2, 'memoryGB': 4, 'customFields': []}})
+        self.names = []
+
+        def fake_create(**kwargs):
+            self.names.append(kwargs['name'])
+            if len(self.names) == 2:
+                raise clc_sdk.CLCException("Server limit reached")
+            requests = Requests([], alias='BTDI')
+            requests.requests = [mock.MagicMock(id='op-%d' % len(self.names), alias='BTDI')]
+            return requests
+
+        for patcher in (patch.object(Server, 'Create', new=staticmethod(fake_create)),
+                        patch.object(Server, 'Credentials', new=lambda s: {'password': 'secret'})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def testQueuedClonesReturnedDespiteFailure(self):
+        requests = self.server.Clone(network_id='net-1', count=3)
+        self.assertEqual(len(self.names), 3)
+        self.assertEqual(len(requests.requests), 2)
+        self.assertEqual([str(e) for e in requests.errors], ['Server limit reached'])
+        self.assertFalse(hasattr(self.server, 'clone_errors'))
+
+    def testZeroCountClonesNothing(self):
+        requests = self.server.Clone(network_id='net-1', count=0)
+        self.assertEqual((self.names, requests.requests, requests.errors), ([], [], []))
+
+    def testRaisesWhenNoCloneQueued(self):
+        self.names.append('already')
+        with self.assertRaises(clc_sdk.CLCException):
+            self.server.Clone(network_id='net-1', count=1)
+
+
+class TestClcServerChange(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(id='WA1BTDIX01', alias='BTDI', server_obj={'name': 'WA1BTDIX01'})
+        for patcher in (patch.object(clc_sdk.v2.API, 'Call'), patch.object(clc_sdk.v2, 'Requests')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def patched_operations(self):
+        self.assertEqual(clc_sdk.v2.API.Call.call_count, 1)
+        method, url, payload = clc_sdk.v2.API.Call.call_args[0]
+        self.assertEqual((method, url), ('PATCH', 'servers/BTDI/WA1BTDIX01'))
+        return json.loads(payload)
+
+    def testChangeSendsOnePatch(self):
+        self.server.Change(cpu=4, memory=8, group_id='wa1-2')
+        self.assertEqual(self.patched_operations(),
+                         [{'op': 'set', 'member': 'cpu', 'value': 4},
+                          {'op': 'set', 'member': 'memory', 'value': 8},
+                          {'op': 'set', 'member': 'groupId', 'value': 'wa1-2'}])
+        self.assertEqual(clc_sdk.v2.Requests.call_count, 1)
+        self.assertTrue(self.server.dirty)
+
+    def testChangeNothing(self):
+        self.assertEqual(self.server.Change(), 0)
+        self.assertFalse(clc_sdk.v2.API.Call.called)
+
+    def testEditCommitsOnExit(self):
+        with self.server.Edit() as edit:
+            edit.SetCPU(2)
+            edit.SetMemory(8)
+            edit.SetCPU(4)
+            self.assertFalse(clc_sdk.v2.API.Call.called)
+        self.assertEqual(self.patched_operations(),
+                         [{'op': 'set', 'member': 'memory', 'value': 8},
+                          {'op': 'set', 'member': 'cpu', 'value': 4}])
+        self.assertIs(edit.requests, clc_sdk.v2.Requests.return_value)
+
+    def testEditDiscardedOnError(self):
+        with self.assertRaises(ValueError):
+            with self.server.Edit() as edit:
+                edit.SetDescription('new')
+                raise ValueError()
+        self.assertFalse(clc_sdk.v2.API.Call.called)
+        self.assertIsNone(edit.Commit())
+
+
 if __name__ == '__main__':
     unittest.main()
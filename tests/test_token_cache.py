@@ -0,0 +1,122 @@
+#!/usr/bin/python
+
+import os
+import stat
+import time
+import shutil
+import tempfile
+import mock
+import unittest
+import clc as clc_sdk
+from clc.APIv2.api import Credentials, GlobalCredentials
+from clc.APIv2.account import Account
+from clc.token_cache import TokenCache
+
+
+ENDPOINT = 'https://api.ctl.io'
+LOGIN = {'bearerToken': 'tok', 'accountAlias': 'BTDI', 'locationAlias': 'WA1'}
+# Other tests replace Account.GetAlias with a mock, keep the real one
+GET_ALIAS = Account.__dict__['GetAlias']
+
+
+class TestClcTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        patcher = mock.patch.object(TokenCache, 'ITERATIONS', 1000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = TokenCache(path=os.path.join(self.dir, 'tokens'))
+
+    def testSaveAndLoad(self):
+        self.cache.Save(ENDPOINT, 'user', 'pass', LOGIN, time.time() + 60)
+        data = self.cache.Load(ENDPOINT, 'user', 'pass')
+        self.assertEqual(data['bearerToken'], 'tok')
+        self.assertEqual(data['accountAlias'], 'BTDI')
+
+    def testFileEncryptedAndPrivate(self):
+        self.cache.Save(ENDPOINT, 'user', 'pass', LOGIN, time.time() + 60)
+        path = self.cache._File(ENDPOINT, 'user')
+        with open(path) as f:
+            self.assertNotIn('tok', f.read())
+        if os.name != 'nt':
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def testWrongPasswordOrEndpointMisses(self):
+        self.cache.Save(ENDPOINT, 'user', 'pass', LOGIN, time.time() + 60)
+        self.assertIsNone(self.cache.Load(ENDPOINT, 'user', 'other'))
+        self.assertIsNone(self.cache.Load('https://api.example.com', 'user', 'pass'))
+
+    def testExpiredMisses(self):
+        self.cache.Save(ENDPOINT, 'user', 'pass', LOGIN, time.time() - 1)
+        self.assertIsNone(self.cache.Load(ENDPOINT, 'user', 'pass'))
+
+    @unittest.skipIf(os.name == 'nt', 'POSIX permissions')
+    def testLoosenedPermissionsIgnored(self):
+        self.cache.Save(ENDPOINT, 'user', 'pass', LOGIN, time.time() + 60)
+        os.chmod(self.cache._File(ENDPOINT, 'user'), 0o644)
+        self.assertIsNone(self.cache.Load(ENDPOINT, 'user', 'pass'))
+
+    def testDelete(self):
+        self.cache.Save(ENDPOINT, 'user', 'pass', LOGIN, time.time() + 60)
+        self.cache.Delete(ENDPOINT, 'user')
+        self.cache.Delete(ENDPOINT, 'user')
+        self.assertIsNone(self.cache.Load(ENDPOINT, 'user', 'pass'))
+
+
+class TestClcCredentialsTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.cache = TokenCache(path=self.dir)
+        for patcher in (mock.patch.object(TokenCache, 'ITERATIONS', 1000),
+                        mock.patch.object(clc_sdk, '_TOKEN_CACHE', self.cache),
+                        mock.patch.object(clc_sdk.defaults, 'ENDPOINT_URL_V2', ENDPOINT)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.http_session = mock.MagicMock()
+        self.http_session.request.return_value = mock.MagicMock(status_code=200, json=mock.MagicMock(return_value=LOGIN))
+
+    def credentials(self):
+        return Credentials(username='user', password='pass', http_session=self.http_session)
+
+    def testLoginSavedAndReusedByNewCredentials(self):
+        self.assertEqual(self.credentials().Token(), 'tok')
+        other = self.credentials()
+        self.assertEqual(other.Token(), 'tok')
+        self.assertEqual(other.alias, 'BTDI')
+        self.assertEqual(self.http_session.request.call_count, 1)
+
+    def testRejectedTokenDroppedFromCache(self):
+        credentials = self.credentials()
+        credentials.Token()
+        credentials.Invalidate('tok')
+        self.assertIsNone(self.cache.Load(ENDPOINT, 'user', 'pass'))
+        credentials.Token()
+        self.assertEqual(self.http_session.request.call_count, 2)
+
+    def testGetAliasUsesCachedToken(self):
+        self.credentials().Token()
+        self.http_session.request.reset_mock()
+
+        for patcher in (mock.patch.object(clc_sdk.v2, '_CREDENTIALS', GlobalCredentials()),
+                        mock.patch.object(Account, 'GetAlias', GET_ALIAS),
+                        mock.patch.object(clc_sdk.v2, 'V2_API_USERNAME', 'user'),
+                        mock.patch.object(clc_sdk.v2, 'V2_API_PASSWD', 'pass'),
+                        mock.patch.object(clc_sdk, 'ALIAS', None),
+                        mock.patch.object(clc_sdk, 'LOCATION', None),
+                        mock.patch.object(clc_sdk, '_REQUESTS_SESSION', self.http_session)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.assertEqual(Account.GetAlias(), 'BTDI')
+        self.assertEqual(clc_sdk.LOCATION, 'WA1')
+        self.assertEqual(clc_sdk.v2._CREDENTIALS.token, 'tok')
+        self.assertFalse(self.http_session.request.called)
+
+
+if __name__ == '__main__':
+    unittest.main()